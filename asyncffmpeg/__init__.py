@@ -1,18 +1,123 @@
-"""Top-level package for Asynchronous FFmpeg."""
+"""Top-level package for Asynchronous FFmpeg.
 
-from asyncffmpeg.exceptions import *  # noqa: F403
-from asyncffmpeg.ffmpeg_coroutine import *  # noqa: F403
-from asyncffmpeg.ffmpeg_coroutine_factory import *  # noqa: F403
-from asyncffmpeg.ffmpegprocess.interface import *  # noqa: F403
-from asyncffmpeg.type_alias import *  # noqa: F403
+Public names are imported on first access so that workers of process pool don't import ffmpeg-python, livesubprocess,
+asyncio and so on until they use them.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+from typing import Any
+
+if TYPE_CHECKING:
+    from asyncffmpeg.audio import *  # noqa: F403
+    from asyncffmpeg.broadcaster import *  # noqa: F403
+    from asyncffmpeg.coalescer import *  # noqa: F403
+    from asyncffmpeg.daemon import *  # noqa: F403
+    from asyncffmpeg.exceptions import *  # noqa: F403
+    from asyncffmpeg.ffmpeg_coroutine import *  # noqa: F403
+    from asyncffmpeg.ffmpeg_coroutine_factory import *  # noqa: F403
+    from asyncffmpeg.ffmpegprocess.chain import *  # noqa: F403
+    from asyncffmpeg.ffmpegprocess.interface import *  # noqa: F403
+    from asyncffmpeg.ffmpegprocess.spawn import *  # noqa: F403
+    from asyncffmpeg.frame_extractor import *  # noqa: F403
+    from asyncffmpeg.io_channel import *  # noqa: F403
+    from asyncffmpeg.job import *  # noqa: F403
+    from asyncffmpeg.keyframe_index import *  # noqa: F403
+    from asyncffmpeg.prefetcher import *  # noqa: F403
+    from asyncffmpeg.preflight import *  # noqa: F403
+    from asyncffmpeg.result import *  # noqa: F403
+    from asyncffmpeg.resumable import *  # noqa: F403
+    from asyncffmpeg.sampler import *  # noqa: F403
+    from asyncffmpeg.scheduler import *  # noqa: F403
+    from asyncffmpeg.single_flight import *  # noqa: F403
+    from asyncffmpeg.smart_cut import *  # noqa: F403
+    from asyncffmpeg.two_pass import *  # noqa: F403
+    from asyncffmpeg.type_alias import *  # noqa: F403
+    from asyncffmpeg.watchdog import *  # noqa: F403
 
 __author__ = """Yukihiko Shinoda"""
 __email__ = "yuk.hik.future@gmail.com"
 __version__ = "1.4.0"
 
-__all__: list[str] = []
-__all__ += exceptions.__all__  # type: ignore[name-defined]  # noqa: F405 pylint: disable=undefined-variable
-__all__ += ffmpeg_coroutine.__all__  # type: ignore[name-defined]  # noqa: F405 pylint: disable=undefined-variable
-__all__ += ffmpeg_coroutine_factory.__all__  # type: ignore[name-defined]  # noqa: F405 pylint: disable=undefined-variable
-__all__ += ffmpegprocess.interface.__all__  # type: ignore[name-defined]  # noqa: F405 pylint: disable=undefined-variable
-__all__ += type_alias.__all__  # type: ignore[name-defined]  # noqa: F405 pylint: disable=undefined-variable
+# Module which defines each public name. Keep in sync with __all__ of each module.
+MODULES = {
+    "AudioReader": "asyncffmpeg.audio",
+    "PeaksReducer": "asyncffmpeg.audio",
+    "SampleFormat": "asyncffmpeg.audio",
+    "OverflowPolicy": "asyncffmpeg.broadcaster",
+    "StdoutBroadcaster": "asyncffmpeg.broadcaster",
+    "StdoutSubscriber": "asyncffmpeg.broadcaster",
+    "FFmpegCoalescer": "asyncffmpeg.coalescer",
+    "FFmpegDaemon": "asyncffmpeg.daemon",
+    "FFmpegDaemonClient": "asyncffmpeg.daemon",
+    "FFmpegDaemonError": "asyncffmpeg.exceptions",
+    "FFmpegDeadlineExceededError": "asyncffmpeg.exceptions",
+    "FFmpegDiskFullError": "asyncffmpeg.exceptions",
+    "FFmpegEncoderNotFoundError": "asyncffmpeg.exceptions",
+    "FFmpegInputNotFoundError": "asyncffmpeg.exceptions",
+    "FFmpegInvalidFilterGraphError": "asyncffmpeg.exceptions",
+    "FFmpegInvalidOptionError": "asyncffmpeg.exceptions",
+    "FFmpegOutputExistsError": "asyncffmpeg.exceptions",
+    "FFmpegProcessError": "asyncffmpeg.exceptions",
+    "FFmpegResourceLimitError": "asyncffmpeg.exceptions",
+    "FFmpegStalledError": "asyncffmpeg.exceptions",
+    "FFmpegWatchdogError": "asyncffmpeg.exceptions",
+    "StdoutSubscriberDroppedError": "asyncffmpeg.exceptions",
+    "FFmpegCoroutine": "asyncffmpeg.ffmpeg_coroutine",
+    "FFmpegCoroutineFactory": "asyncffmpeg.ffmpeg_coroutine_factory",
+    "FFmpegProcessChain": "asyncffmpeg.ffmpegprocess.chain",
+    "FFmpegProcess": "asyncffmpeg.ffmpegprocess.interface",
+    "ResourceLimits": "asyncffmpeg.ffmpegprocess.spawn",
+    "SpawnMode": "asyncffmpeg.ffmpegprocess.spawn",
+    "SpawnOptions": "asyncffmpeg.ffmpegprocess.spawn",
+    "FrameExtractor": "asyncffmpeg.frame_extractor",
+    "IntervalSelection": "asyncffmpeg.frame_extractor",
+    "SceneChangeSelection": "asyncffmpeg.frame_extractor",
+    "SeekStrategy": "asyncffmpeg.frame_extractor",
+    "TimestampSelection": "asyncffmpeg.frame_extractor",
+    "FifoInput": "asyncffmpeg.io_channel",
+    "FifoOutput": "asyncffmpeg.io_channel",
+    "IOChannel": "asyncffmpeg.io_channel",
+    "StagedOutput": "asyncffmpeg.io_channel",
+    "UnixSocketInput": "asyncffmpeg.io_channel",
+    "UnixSocketOutput": "asyncffmpeg.io_channel",
+    "FFmpegJob": "asyncffmpeg.job",
+    "KeyframeIndex": "asyncffmpeg.keyframe_index",
+    "KeyframeIndexer": "asyncffmpeg.keyframe_index",
+    "InputPrefetcher": "asyncffmpeg.prefetcher",
+    "PrefetchStatistics": "asyncffmpeg.prefetcher",
+    "PreflightValidator": "asyncffmpeg.preflight",
+    "FFmpegResult": "asyncffmpeg.result",
+    "ResumableEncoder": "asyncffmpeg.resumable",
+    "ResourceSampler": "asyncffmpeg.sampler",
+    "ResourceSeries": "asyncffmpeg.sampler",
+    "ResourceUsage": "asyncffmpeg.sampler",
+    "PriorityScheduler": "asyncffmpeg.scheduler",
+    "FFmpegSingleFlight": "asyncffmpeg.single_flight",
+    "SmartCutter": "asyncffmpeg.smart_cut",
+    "TwoPassEncoder": "asyncffmpeg.two_pass",
+    "TwoPassJob": "asyncffmpeg.two_pass",
+    "StreamSpec": "asyncffmpeg.type_alias",
+    "Watchdog": "asyncffmpeg.watchdog",
+}
+
+__all__ = list(MODULES)
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Import the module which defines the public name on first access."""
+    try:
+        module = MODULES[name]
+    except KeyError:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg) from None
+    value = getattr(import_module(module), name)
+    # Cache so that __getattr__ isn't called again for the name.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,209 @@
+"""Streaming decode of audio into NumPy blocks and reduction into waveform peaks (requires NumPy).
+
+NumPy is imported on first use, so that the package can be imported without the extra.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from enum import Enum
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+
+import ffmpeg
+
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+from asyncffmpeg.job import FFmpegJob
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import numpy as np
+    import numpy.typing as npt
+
+    from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
+    from asyncffmpeg.result import FFmpegResult
+
+__all__ = ["AudioReader", "PeaksReducer", "SampleFormat"]
+
+FRAMES_PER_BLOCK = 64 * 1024
+# Scale of s16le to normalize samples into [-1.0, 1.0) as same as f32le.
+SCALE_S16 = 32768.0
+
+
+class SampleFormat(Enum):
+    """Format of PCM samples which FFmpeg writes into stdout."""
+
+    F32LE = "f32le"
+    S16LE = "s16le"
+
+    @property
+    def dtype(self) -> np.dtype[Any]:
+        import numpy as np  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+        return np.dtype("<f4") if self is SampleFormat.F32LE else np.dtype("<i2")
+
+
+class AudioReader:
+    """Decodes the first audio stream of an input and streams PCM into a NumPy block preallocated per read.
+
+    Stdout of FFmpeg is read by the event loop without threads directly into the block, so that many files can be
+    decoded concurrently without holding whole files in memory. Not supported on Windows.
+
+    Args:
+        path_file_input: Input file.
+        channels: Number of channels to downmix or upmix into.
+        sample_rate: Sample rate to resample into, the sample rate of the input by default.
+        sample_format: Format of samples.
+        frames_per_block: Number of frames (samples per channel) in a block.
+    """
+
+    def __init__(
+        self,
+        path_file_input: Path | str,
+        *,
+        channels: int = 1,
+        sample_rate: int | None = None,
+        sample_format: SampleFormat = SampleFormat.F32LE,
+        frames_per_block: int = FRAMES_PER_BLOCK,
+    ) -> None:
+        self.path_file_input = path_file_input
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_format = sample_format
+        self.frames_per_block = frames_per_block
+
+    async def read(self, consume: Callable[[np.ndarray[Any, Any]], None]) -> FFmpegResult:
+        """Decode and call consume with each block of shape (frames, channels).
+
+        The block is reused for the next block, so copy it if it has to be kept after consume returns. When consume
+        raises, FFmpeg quits and the error is raised.
+        """
+        import numpy as np  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+        format_sample = self.sample_format.value
+        options = {"ac": self.channels} if self.sample_rate is None else {"ac": self.channels, "ar": self.sample_rate}
+        stream = ffmpeg.input(str(self.path_file_input))["a:0"]
+        stream_spec = stream.output("pipe:", f=format_sample, acodec=f"pcm_{format_sample}", **options)
+        # Allocated per read so that concurrent reads of the same reader don't overwrite each other.
+        block = np.empty((self.frames_per_block, self.channels), dtype=self.sample_format.dtype)
+
+        async def read(ffmpeg_process: FFmpegProcess) -> int:
+            # Reason: Created with stdout pipe.
+            fd = ffmpeg_process.popen.stdout.fileno()  # type: ignore[union-attr]
+            return await read_blocks(fd, block, consume)
+
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(pipe_stdout=True)
+        job = FFmpegJob.from_stream_spec(stream_spec)
+        # When consume fails, FFmpeg quits instead of being blocked on writing into stdout which nobody reads.
+        result, _total = await ffmpeg_coroutine.execute_job_reading_stdout(job, read)
+        return result
+
+
+async def read_blocks(fd: int, block: np.ndarray[Any, Any], consume: Callable[[np.ndarray[Any, Any]], None]) -> int:
+    """Read PCM until EOF into the block; return total number of frames."""
+    os.set_blocking(fd, False)
+    view = block.data.cast("B")
+    size_frame = block.itemsize * block.shape[1]
+    total = 0
+    while size := await fill(fd, view):
+        number_of_frames = size // size_frame
+        consume(block[:number_of_frames])
+        total += number_of_frames
+    return total
+
+
+async def fill(fd: int, view: memoryview) -> int:
+    """Fill the view from non-blocking fd until the view is full or EOF; return the size filled."""
+    filled = 0
+    while filled < len(view):
+        try:
+            size = os.readv(fd, [view[filled:]])
+        except BlockingIOError:
+            await wait_readable(fd)
+            continue
+        if size == 0:
+            break
+        filled += size
+    return filled
+
+
+async def wait_readable(fd: int) -> None:
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[None] = loop.create_future()
+
+    def set_readable() -> None:
+        if not future.done():
+            future.set_result(None)
+
+    loop.add_reader(fd, set_readable)
+    try:
+        await future
+    finally:
+        loop.remove_reader(fd)
+
+
+class PeaksReducer:
+    """Reduces blocks of samples into minimum, maximum and RMS per bucket of frames for waveform previews.
+
+    Blocks are reduced by vectorized operations as they arrive, so memory is proportional to the number of buckets, not
+    to the length of the audio. Integer samples are normalized into [-1.0, 1.0).
+
+    Args:
+        frames_per_bucket: Number of frames reduced into a bucket, e.g. sample rate / buckets per second.
+    """
+
+    def __init__(self, frames_per_bucket: int) -> None:
+        self.frames_per_bucket = frames_per_bucket
+        self.minimums: list[npt.NDArray[np.float32]] = []
+        self.maximums: list[npt.NDArray[np.float32]] = []
+        self.rms: list[npt.NDArray[np.float32]] = []
+        # Frames of the last bucket which isn't full yet.
+        self.rest: npt.NDArray[np.float32] | None = None
+
+    def feed(self, block: np.ndarray[Any, Any]) -> None:
+        """Reduce block of shape (frames, channels), can be passed as consume of AudioReader.read()."""
+        import numpy as np  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+        samples = normalize(block)
+        if self.rest is not None:
+            samples = np.concatenate((self.rest, samples))
+        number_of_buckets = len(samples) // self.frames_per_bucket
+        size_full = number_of_buckets * self.frames_per_bucket
+        # Copied since the block is reused by the reader.
+        self.rest = samples[size_full:].copy()
+        if number_of_buckets:
+            self.reduce(samples[:size_full].reshape(number_of_buckets, self.frames_per_bucket, -1))
+
+    def finish(self) -> None:
+        """Reduce the last bucket which isn't full."""
+        if self.rest is not None and len(self.rest):
+            self.reduce(self.rest[None])
+        self.rest = None
+
+    def reduce(self, buckets: npt.NDArray[np.float32]) -> None:
+        import numpy as np  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+        self.minimums.append(buckets.min(axis=1))
+        self.maximums.append(buckets.max(axis=1))
+        self.rms.append(np.sqrt(np.square(buckets, dtype=np.float64).mean(axis=1)).astype(np.float32))
+
+    def peaks(self) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.float32], npt.NDArray[np.float32]]:
+        """Return minimums, maximums and RMS of shape (buckets, channels)."""
+        return concatenate(self.minimums), concatenate(self.maximums), concatenate(self.rms)
+
+
+def normalize(block: np.ndarray[Any, Any]) -> npt.NDArray[np.float32]:
+    import numpy as np  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+    if block.dtype.kind == "f":
+        return block.astype(np.float32, copy=False)
+    return block.astype(np.float32) / SCALE_S16
+
+
+def concatenate(arrays: list[npt.NDArray[np.float32]]) -> npt.NDArray[np.float32]:
+    import numpy as np  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+    return np.concatenate(arrays) if arrays else np.empty((0, 0), dtype=np.float32)
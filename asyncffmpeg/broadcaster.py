@@ -0,0 +1,139 @@
+"""Broadcaster of FFmpeg stdout to multiple consumers."""
+
+from __future__ import annotations
+
+import asyncio
+from enum import Enum
+from logging import getLogger
+from typing import TYPE_CHECKING
+from typing import Union
+
+from asyncffmpeg.exceptions import StdoutSubscriberDroppedError
+
+if TYPE_CHECKING:
+    from asyncffmpeg.ffmpegprocess.interface import BaseFFmpegProcess
+
+__all__ = ["OverflowPolicy", "StdoutBroadcaster", "StdoutSubscriber"]
+
+SIZE_CHUNK = 64 * 1024
+MAX_SIZE_QUEUE = 16
+
+
+class OverflowPolicy(Enum):
+    """What to do when queue of subscriber is full."""
+
+    # Waits for the subscriber, as a result, FFmpeg is blocked when the stdout pipe is full.
+    BACKPRESSURE = "backpressure"
+    # Drops the subscriber so that other subscribers and FFmpeg keep going.
+    DROP = "drop"
+
+
+class EndOfStream(Enum):
+    """Sentinel put into queue of subscriber at the end of stream."""
+
+    TOKEN = 0
+
+
+Item = Union[bytes, EndOfStream]
+
+
+class StdoutSubscriber:
+    """Bounded queue of chunks for a single consumer.
+
+    Chunks are shared among all subscribers without copy, they are released when the last subscriber consumes them.
+    """
+
+    def __init__(self, maxsize: int, policy: OverflowPolicy) -> None:
+        self.policy = policy
+        self.queue: asyncio.Queue[Item] = asyncio.Queue(maxsize)
+        self.is_dropped = False
+        self.reason_dropped = ""
+
+    def __aiter__(self) -> StdoutSubscriber:
+        return self
+
+    async def __anext__(self) -> bytes:
+        item = await self.queue.get()
+        if isinstance(item, bytes):
+            return item
+        if self.is_dropped:
+            raise StdoutSubscriberDroppedError(self.reason_dropped)
+        raise StopAsyncIteration
+
+    async def put(self, chunk: bytes) -> None:
+        if self.is_dropped:
+            return
+        if self.policy is OverflowPolicy.BACKPRESSURE:
+            await self.queue.put(chunk)
+            return
+        try:
+            self.queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            self.drop("Subscriber was dropped since queue was full")
+
+    def drop(self, reason: str) -> None:
+        """Discards queued chunks to release them and notifies the consumer."""
+        if self.is_dropped:
+            return
+        self.is_dropped = True
+        self.reason_dropped = reason
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(EndOfStream.TOKEN)
+
+    async def close(self) -> None:
+        if self.is_dropped:
+            return
+        # Reason: Even in case of DROP policy, the end of stream shouldn't be lost.
+        await self.queue.put(EndOfStream.TOKEN)
+
+
+class StdoutBroadcaster:
+    """Delivers the same chunks of FFmpeg stdout to multiple async consumers.
+
+    FFmpeg process has to leave stdout pipe to the caller, see: FFmpegCoroutineFactory.create(pipe_stdout=True).
+    """
+
+    def __init__(self, ffmpeg_process: BaseFFmpegProcess, *, size_chunk: int = SIZE_CHUNK) -> None:
+        if ffmpeg_process.popen.stdout is None:
+            msg = "FFmpeg process must have stdout pipe"
+            raise ValueError(msg)
+        self.stdout = ffmpeg_process.popen.stdout
+        self.size_chunk = size_chunk
+        self.subscribers: list[StdoutSubscriber] = []
+        self.logger = getLogger(__name__)
+
+    def subscribe(
+        self,
+        *,
+        maxsize: int = MAX_SIZE_QUEUE,
+        policy: OverflowPolicy = OverflowPolicy.BACKPRESSURE,
+    ) -> StdoutSubscriber:
+        """Subscribe stdout, call before run()."""
+        subscriber = StdoutSubscriber(maxsize, policy)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    async def run(self) -> int:
+        """Read stdout until EOF and deliver chunks to subscribers; return total bytes read."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=self.size_chunk)
+        transport, _protocol = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), self.stdout)
+        total = 0
+        try:
+            while chunk := await reader.read(self.size_chunk):
+                total += len(chunk)
+                await self.publish(chunk)
+        except BaseException:
+            # Consumers shouldn't wait forever for the end of stream which never comes.
+            for subscriber in self.subscribers:
+                subscriber.drop("Broadcast was aborted")
+            raise
+        finally:
+            transport.close()
+        await asyncio.gather(*(subscriber.close() for subscriber in self.subscribers))
+        self.logger.debug("Broadcast %d bytes", total)
+        return total
+
+    async def publish(self, chunk: bytes) -> None:
+        await asyncio.gather(*(subscriber.put(chunk) for subscriber in self.subscribers))
@@ -0,0 +1,209 @@
+"""Coalescer of tiny FFmpeg jobs into a single FFmpeg invocation."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+
+import ffmpeg
+
+# Reason: Maybe, requires to update ffmpeg-python side.
+from ffmpeg.nodes import GlobalNode  # type: ignore[import-untyped]
+from ffmpeg.nodes import InputNode
+from ffmpeg.nodes import MergeOutputsNode
+from ffmpeg.nodes import OutputStream
+
+from asyncffmpeg.ffmpeg_coroutine import TIME_TO_FORCE_TERMINATION
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from collections.abc import Hashable
+    from collections.abc import Iterable
+
+    from asyncffmpeg.ffmpegprocess.spawn import SpawnOptions
+    from asyncffmpeg.type_alias import StreamSpec
+
+__all__ = ["FFmpegCoalescer"]
+
+SECOND_WINDOW = 0.05
+MAX_JOBS = 32
+# Output which isn't a file, e.g. `pipe:`, `unix:/path` and `rtmp://host`.
+PATTERN_PROTOCOL = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]+:")
+
+
+class Job:
+    """Output stream of a job and the future to report its result."""
+
+    def __init__(self, output_stream: OutputStream, future: asyncio.Future[None]) -> None:
+        self.output_stream = output_stream
+        self.future = future
+
+    def report(self, error: Exception | None = None) -> None:
+        # The caller may have been cancelled.
+        if self.future.done():
+            return
+        if error is None:
+            self.future.set_result(None)
+        else:
+            self.future.set_exception(error)
+
+
+class FFmpegCoalescer:
+    """Coalesces tiny jobs submitted within a time window into a single multi-input / multi-output FFmpeg invocation.
+
+    When process startup and codec initialization cost more than the actual work, this amortizes them over the jobs.
+    Jobs are compatible when they have the same global args, e.g. `overwrite_output()`. Since FFmpeg selects streams
+    from all inputs for an output which takes an input without stream selector, such a job is run alone; use
+    `.audio` or `.video` of the input to make it coalescable. When a batch fails, output files which the batch created
+    are removed and its jobs are run one by one so that each job reports its own result.
+
+    Args:
+        second_window: Time (second) to wait for compatible jobs after the first job of a batch is submitted.
+        max_jobs: Maximum number of jobs in a batch. A full batch is run without waiting the window.
+    """
+
+    def __init__(
+        self,
+        *,
+        second_window: float = SECOND_WINDOW,
+        max_jobs: int = MAX_JOBS,
+        time_to_force_termination: int = TIME_TO_FORCE_TERMINATION,
+        spawn_options: SpawnOptions | None = None,
+    ) -> None:
+        self.second_window = second_window
+        self.max_jobs = max_jobs
+        self.time_to_force_termination = time_to_force_termination
+        self.spawn_options = spawn_options
+        self.pending: dict[Hashable, list[Job]] = {}
+        self.timers: dict[Hashable, asyncio.TimerHandle] = {}
+        self.tasks: set[asyncio.Task[None]] = set()
+        self.number_of_invocations = 0
+        self.logger = getLogger(__name__)
+
+    async def execute(self, create_stream_spec: Callable[[], Awaitable[StreamSpec]]) -> None:
+        """Execute FFmpeg job, possibly together with other compatible jobs.
+
+        Args:
+            create_stream_spec: Coroutine function to create stream spec of a single output or merged outputs.
+        """
+        stream_spec = await create_stream_spec()
+        if not isinstance(stream_spec, OutputStream):
+            msg = "Coalescer requires stream spec of output"
+            raise TypeError(msg)
+        global_args, output_stream = split_global_args(stream_spec)
+        key: Hashable = global_args if is_coalescable(output_stream) else object()
+        loop = asyncio.get_running_loop()
+        job = Job(output_stream, loop.create_future())
+        batch = self.pending.setdefault(key, [])
+        batch.append(job)
+        if len(batch) == 1:
+            self.timers[key] = loop.call_later(self.second_window, self.flush, key, global_args)
+        if len(batch) >= self.max_jobs:
+            self.flush(key, global_args)
+        await job.future
+
+    def flush(self, key: Hashable, global_args: tuple[str, ...]) -> None:
+        """Start the batch of the key."""
+        self.timers.pop(key).cancel()
+        jobs = self.pending.pop(key)
+        task = asyncio.ensure_future(self.run_batch(global_args, jobs))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def run_batch(self, global_args: tuple[str, ...], jobs: list[Job]) -> None:
+        jobs = [job for job in jobs if not job.future.done()]
+        try:
+            if len(jobs) > 1 and await self.try_batch(global_args, jobs):
+                return
+            await asyncio.gather(*(self.run(global_args, [job]) for job in jobs), return_exceptions=True)
+        except asyncio.CancelledError:
+            for job in jobs:
+                job.future.cancel()
+            raise
+
+    async def try_batch(self, global_args: tuple[str, ...], jobs: list[Job]) -> bool:
+        """Return whether the batch succeeded."""
+        paths = [path for job in jobs for path in list_output_files(job.output_stream)]
+        paths_existing = await asyncio.to_thread(list_existing, paths)
+        try:
+            await self.run(global_args, jobs)
+        except Exception:
+            self.logger.warning("Batch of %d jobs failed, run them one by one", len(jobs), exc_info=True)
+            # Otherwise, FFmpeg of the job which doesn't overwrite output prompts whether to overwrite partial output.
+            await asyncio.to_thread(remove, set(paths) - paths_existing)
+            return False
+        return True
+
+    async def run(self, global_args: tuple[str, ...], jobs: list[Job]) -> None:
+        """Run jobs in a single FFmpeg invocation and report the result to each job."""
+
+        async def create_stream_spec() -> StreamSpec:
+            return merge_outputs(global_args, [job.output_stream for job in jobs])
+
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(
+            time_to_force_termination=self.time_to_force_termination,
+            spawn_options=self.spawn_options,
+        )
+        self.number_of_invocations += 1
+        self.logger.debug("Run %d jobs in a single invocation", len(jobs))
+        try:
+            await ffmpeg_coroutine.execute(create_stream_spec)
+        except Exception as error:
+            if len(jobs) == 1:
+                jobs[0].report(error)
+            raise
+        for job in jobs:
+            job.report()
+
+
+def merge_outputs(global_args: tuple[str, ...], output_streams: list[OutputStream]) -> OutputStream:
+    stream_spec = ffmpeg.merge_outputs(*output_streams)
+    return stream_spec.global_args(*global_args) if global_args else stream_spec
+
+
+def split_global_args(stream_spec: OutputStream) -> tuple[tuple[str, ...], OutputStream]:
+    """Split global args from output stream so that they are set only once into merged outputs."""
+    global_args: tuple[str, ...] = ()
+    while isinstance(stream_spec.node, GlobalNode):
+        global_args = tuple(stream_spec.node.args) + global_args
+        edge = stream_spec.node.incoming_edges[0]
+        stream_spec = edge.upstream_node.stream(label=edge.upstream_label)
+    return global_args, stream_spec
+
+
+def list_output_nodes(output_stream: OutputStream) -> list[Any]:
+    node: Any = output_stream.node
+    return [edge.upstream_node for edge in node.incoming_edges] if isinstance(node, MergeOutputsNode) else [node]
+
+
+def list_output_files(output_stream: OutputStream) -> list[Path]:
+    filenames = (output_node.kwargs["filename"] for output_node in list_output_nodes(output_stream))
+    return [Path(filename) for filename in filenames if filename != "-" and not PATTERN_PROTOCOL.match(filename)]
+
+
+def list_existing(paths: Iterable[Path]) -> set[Path]:
+    return {path for path in paths if path.exists()}
+
+
+def remove(paths: Iterable[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def is_coalescable(output_stream: OutputStream) -> bool:
+    """Whether streams of each output are explicitly selected.
+
+    ffmpeg-python omits `-map` for an output which takes the first input without stream selector.
+    """
+    output_nodes = list_output_nodes(output_stream)
+    return not any(
+        isinstance(edge.upstream_node, InputNode) and edge.upstream_selector is None
+        for output_node in output_nodes
+        for edge in output_node.incoming_edges
+    )
@@ -0,0 +1,259 @@
+"""Resident daemon which executes FFmpeg jobs received over Unix domain socket, and its client.
+
+Protocol is JSON lines. Client sends a job as FFmpegJob JSON on a connection, then daemon sends progress messages
+while FFmpeg runs and a result or error message at last:
+
+- `{"type": "progress", "progress": {"frame": "120", "size": "256KiB", "time": "00:00:02.00"}}`
+- `{"type": "result", "result": {"return_code": 0, "frames": 449, ...}}`
+- `{"type": "error", "error": "FFmpegInputNotFoundError", "message": "...", "exit_code": 254}`
+
+When client closes the connection before the result, FFmpeg is quitted. The executable in the arguments of the job is
+replaced with the one which the daemon is configured with.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import os
+import stat
+import tempfile
+from contextlib import suppress
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+
+from asyncffmpeg import exceptions
+from asyncffmpeg.exceptions import FFmpegDaemonError
+from asyncffmpeg.exceptions import FFmpegProcessError
+from asyncffmpeg.exceptions import FFmpegWatchdogError
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+from asyncffmpeg.job import NAME_EXECUTABLE
+from asyncffmpeg.job import FFmpegJob
+from asyncffmpeg.result import FFmpegResult
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from asyncffmpeg.ffmpeg_coroutine import FFmpegCoroutine
+    from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
+
+__all__ = ["FFmpegDaemon", "FFmpegDaemonClient"]
+
+SECOND_PROGRESS = 1.0
+# Error message of FFmpeg is truncated into its tail, since it can be as long as whole stderr.
+LIMIT_MESSAGE = 64 * 1024
+# Escaped error message can exceed the default limit (64 KiB) of StreamReader.
+LIMIT_LINE = 16 * 1024 * 1024
+PREFIX_DIRECTORY = "asyncffmpeg-daemon-"
+Message = dict[str, Any]
+OnProgress = Callable[[dict[str, str]], None]
+
+
+class FFmpegDaemon:
+    """Executes FFmpeg jobs received over Unix domain socket under concurrency budget shared by all clients.
+
+    Args:
+        path_socket: Path of Unix domain socket to listen. Only the owner can connect to it.
+        max_jobs: Maximum number of FFmpeg processes running at the same time. When None, the number of CPUs.
+        second_progress: Interval (second) to send progress to client.
+        create_ffmpeg_coroutine: Function to create FFmpeg coroutine for each job.
+        executable: FFmpeg executable to execute jobs with, which replaces the executable sent by client.
+    """
+
+    def __init__(
+        self,
+        path_socket: Path | str,
+        *,
+        max_jobs: int | None = None,
+        second_progress: float = SECOND_PROGRESS,
+        create_ffmpeg_coroutine: Callable[[], FFmpegCoroutine[Any]] = FFmpegCoroutineFactory.create,
+        executable: str = NAME_EXECUTABLE,
+    ) -> None:
+        self.path_socket = Path(path_socket)
+        self.max_jobs = max_jobs if max_jobs is not None else os.cpu_count() or 1
+        self.second_progress = second_progress
+        self.create_ffmpeg_coroutine = create_ffmpeg_coroutine
+        self.executable = executable
+        self.server: asyncio.AbstractServer | None = None
+        # Created in start() since semaphore binds event loop on instantiation in Python 3.9.
+        self.semaphore: asyncio.Semaphore | None = None
+        self.logger = getLogger(__name__)
+
+    async def start(self) -> None:
+        self.semaphore = asyncio.Semaphore(self.max_jobs)
+        if await asyncio.to_thread(is_other_than_socket, self.path_socket):
+            msg = f"Path of socket is used by other than socket: {self.path_socket}"
+            raise FileExistsError(msg)
+        # Socket is connectable by anyone as soon as it's bound, so it's bound in a directory which only the owner can
+        # enter, and then moved into the path after chmod.
+        with tempfile.TemporaryDirectory(prefix=PREFIX_DIRECTORY, dir=self.path_socket.parent) as directory:
+            path_bound = Path(directory) / self.path_socket.name
+            self.server = await asyncio.start_unix_server(self.handle, path=str(path_bound), limit=LIMIT_LINE)
+            await asyncio.to_thread(path_bound.chmod, 0o600)
+            await asyncio.to_thread(os.replace, path_bound, self.path_socket)
+        self.logger.info("Listening on %s", self.path_socket)
+
+    async def serve_forever(self) -> None:
+        """Start and serve until cancelled."""
+        await self.start()
+        try:
+            # Reason: Set in start().
+            await self.server.serve_forever()  # type: ignore[union-attr]
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        with suppress(FileNotFoundError):
+            await asyncio.to_thread(self.path_socket.unlink)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # Reason: Client may close connection at any time, and then there is nothing to report.
+            with suppress(ConnectionError):
+                await self.handle_job(reader, writer)
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def handle_job(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Execute the job; quit FFmpeg when client closes the connection."""
+        try:
+            job = FFmpegJob.from_json((await reader.readline()).decode())
+        except ValueError as error:
+            await send(writer, create_error_message(error))
+            return
+        # Reason: Client mustn't choose which program the daemon runs.
+        job = FFmpegJob((self.executable, *job.arguments[1:]))
+        task_execute = asyncio.ensure_future(self.execute(job, writer))
+        # Client sends nothing after the job, so reading returns only when the connection is closed.
+        task_closed = asyncio.ensure_future(reader.read())
+        try:
+            await asyncio.wait([task_execute, task_closed], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            task_closed.cancel()
+            task_execute.cancel()
+        if task_execute.done() and not task_execute.cancelled():
+            await send(writer, task_execute.result())
+            return
+        self.logger.info("Client closed connection, quit job")
+        with suppress(asyncio.CancelledError):
+            await task_execute
+
+    async def execute(self, job: FFmpegJob, writer: asyncio.StreamWriter) -> Message:
+        tasks: list[asyncio.Future[None]] = []
+
+        async def after_start(ffmpeg_process: FFmpegProcess) -> None:
+            tasks.append(asyncio.ensure_future(self.report(ffmpeg_process, writer)))
+
+        # Reason: Set in start().
+        async with self.semaphore:  # type: ignore[union-attr]
+            try:
+                result = await self.create_ffmpeg_coroutine().execute_job(job, after_start=after_start)
+            # Reason: Any error has to be reported to client instead of closing connection silently.
+            except Exception as error:  # noqa: BLE001 pylint: disable=broad-exception-caught
+                return create_error_message(error)
+            finally:
+                for task in tasks:
+                    task.cancel()
+        return {"type": "result", "result": dataclasses.asdict(result)}
+
+    async def report(self, ffmpeg_process: FFmpegProcess, writer: asyncio.StreamWriter) -> None:
+        values: dict[str, str] = {}
+        while True:
+            await asyncio.sleep(self.second_progress)
+            if ffmpeg_process.progress.values != values:
+                values = ffmpeg_process.progress.values
+                # Reason: Closed connection is handled by handle_job().
+                with suppress(ConnectionError):
+                    await send(writer, {"type": "progress", "progress": values})
+
+
+class FFmpegDaemonClient:
+    """Client of FFmpegDaemon.
+
+    Args:
+        path_socket: Path of Unix domain socket which the daemon listens.
+    """
+
+    def __init__(self, path_socket: Path | str) -> None:
+        self.path_socket = Path(path_socket)
+
+    async def execute(self, job: FFmpegJob, *, on_progress: OnProgress | None = None) -> FFmpegResult:
+        """Execute the job by the daemon; return result with statistics.
+
+        Raises the same error as FFmpegCoroutine when FFmpeg fails, or FFmpegDaemonError when the daemon can't execute
+        the job. Cancellation closes the connection so that the daemon quits FFmpeg.
+
+        Args:
+            job: FFmpeg job to execute.
+            on_progress: Function called with frame, size and time of progress while FFmpeg runs.
+        """
+        reader, writer = await asyncio.open_unix_connection(str(self.path_socket), limit=LIMIT_LINE)
+        try:
+            writer.write(job.to_json().encode() + b"\n")
+            await writer.drain()
+            async for line in read_lines(reader):
+                message = json.loads(line)
+                if message["type"] == "progress":
+                    if on_progress is not None:
+                        on_progress(message["progress"])
+                    continue
+                if message["type"] == "result":
+                    return FFmpegResult(**message["result"])
+                raise create_error(message)
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+        msg = "Daemon closed connection before result"
+        raise FFmpegDaemonError(msg)
+
+
+def is_other_than_socket(path: Path) -> bool:
+    try:
+        return not stat.S_ISSOCK(path.lstat().st_mode)
+    except FileNotFoundError:
+        return False
+
+
+async def send(writer: asyncio.StreamWriter, message: Message) -> None:
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def read_lines(reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    try:
+        async for line in reader:
+            yield line
+    # Reason: StreamReader raises ValueError when a line exceeds the limit.
+    except ValueError as error:
+        msg = f"Daemon sent too long message: {error}"
+        raise FFmpegDaemonError(msg) from error
+
+
+def create_error_message(error: Exception) -> Message:
+    message = str(error.args[0] if error.args else error)[-LIMIT_MESSAGE:]
+    return {"type": "error", "error": type(error).__name__, "message": message, **error_detail(error)}
+
+
+def error_detail(error: Exception) -> Message:
+    return {"exit_code": error.exit_code} if isinstance(error, FFmpegProcessError) else {}
+
+
+def create_error(message: Message) -> Exception:
+    """Restore error of this package by its name, otherwise FFmpegDaemonError."""
+    class_error = getattr(exceptions, message["error"], None) if message["error"] in exceptions.__all__ else None
+    if isinstance(class_error, type) and issubclass(class_error, FFmpegProcessError):
+        return class_error(message["message"], message["exit_code"])
+    if isinstance(class_error, type) and issubclass(class_error, FFmpegWatchdogError):
+        return class_error(message["message"])
+    return FFmpegDaemonError(f"{message['error']}: {message['message']}")
@@ -1,6 +1,20 @@
 """This module implements exceptions for this package."""
 
-__all__ = ["FFmpegProcessError"]
+__all__ = [
+    "FFmpegDaemonError",
+    "FFmpegDeadlineExceededError",
+    "FFmpegDiskFullError",
+    "FFmpegEncoderNotFoundError",
+    "FFmpegInputNotFoundError",
+    "FFmpegInvalidFilterGraphError",
+    "FFmpegInvalidOptionError",
+    "FFmpegOutputExistsError",
+    "FFmpegProcessError",
+    "FFmpegResourceLimitError",
+    "FFmpegStalledError",
+    "FFmpegWatchdogError",
+    "StdoutSubscriberDroppedError",
+]
 
 
 class Error(Exception):
@@ -16,3 +30,51 @@ class FFmpegProcessError(Error):
     def __init__(self, message: str, exit_code: int) -> None:
         super().__init__(message, exit_code)
         self.exit_code = exit_code
+
+
+class FFmpegInputNotFoundError(FFmpegProcessError):
+    """Input of FFmpeg doesn't exist."""
+
+
+class FFmpegOutputExistsError(FFmpegProcessError):
+    """Output of FFmpeg already exists and FFmpeg didn't overwrite it."""
+
+
+class FFmpegEncoderNotFoundError(FFmpegProcessError):
+    """Encoder isn't available in FFmpeg."""
+
+
+class FFmpegInvalidFilterGraphError(FFmpegProcessError):
+    """Filter graph is invalid, e.g. unknown filter or invalid option."""
+
+
+class FFmpegInvalidOptionError(FFmpegProcessError):
+    """Option is unknown or its value is invalid, e.g. unknown preset of encoder."""
+
+
+class FFmpegDiskFullError(FFmpegProcessError):
+    """No space left on device to write output."""
+
+
+class FFmpegResourceLimitError(FFmpegProcessError):
+    """FFmpeg exceeded resource limit, e.g. CPU time, memory or file size, see: ResourceLimits."""
+
+
+class StdoutSubscriberDroppedError(Error):
+    """Subscriber of stdout was dropped before the end of stream."""
+
+
+class FFmpegWatchdogError(Error):
+    """FFmpeg process was quitted by watchdog."""
+
+
+class FFmpegStalledError(FFmpegWatchdogError):
+    """FFmpeg process didn't advance its progress for a while."""
+
+
+class FFmpegDeadlineExceededError(FFmpegWatchdogError):
+    """FFmpeg process didn't finish by its deadline."""
+
+
+class FFmpegDaemonError(Error):
+    """FFmpeg daemon couldn't execute job, e.g. job is invalid or connection is closed."""
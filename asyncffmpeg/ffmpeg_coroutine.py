@@ -14,11 +14,20 @@ from typing import Generic
 from typing import TypeVar
 
 from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
+from asyncffmpeg.ffmpegprocess.interface import FFmpegRunnable
+from asyncffmpeg.ffmpegprocess.posix import FFmpegProcessPosix
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable
+    from collections.abc import Sequence
 
+    from asyncffmpeg.ffmpegprocess.chain import FFmpegProcessChain
+    from asyncffmpeg.ffmpegprocess.spawn import SpawnOptions
+    from asyncffmpeg.io_channel import IOChannel
+    from asyncffmpeg.job import FFmpegJob
+    from asyncffmpeg.result import FFmpegResult
     from asyncffmpeg.type_alias import StreamSpec
+    from asyncffmpeg.watchdog import Watchdog
 
 
 __all__ = ["FFmpegCoroutine"]
@@ -27,6 +36,8 @@ __all__ = ["FFmpegCoroutine"]
 # see: https://docs.docker.com/engine/reference/commandline/stop/
 TIME_TO_FORCE_TERMINATION = 8
 TypeVarFFmpegProcess = TypeVar("TypeVarFFmpegProcess", bound=FFmpegProcess)
+TypeVarFFmpegRunnable = TypeVar("TypeVarFFmpegRunnable", bound=FFmpegRunnable)
+TypeVarRead = TypeVar("TypeVarRead")
 
 
 class FFmpegCoroutine(Generic[TypeVarFFmpegProcess]):
@@ -37,9 +48,13 @@ class FFmpegCoroutine(Generic[TypeVarFFmpegProcess]):
         class_ffmpeg_process: type[TypeVarFFmpegProcess],
         *,
         time_to_force_termination: int = TIME_TO_FORCE_TERMINATION,
+        spawn_options: SpawnOptions | None = None,
+        watchdog: Watchdog | None = None,
     ) -> None:
         self.class_ffmpeg_process = class_ffmpeg_process
         self.time_to_force_termination = time_to_force_termination
+        self.spawn_options = spawn_options
+        self.watchdog = watchdog
         self.ffmpeg_process: TypeVarFFmpegProcess | None = None
         self.logger = getLogger(__name__)
 
@@ -48,35 +63,162 @@ class FFmpegCoroutine(Generic[TypeVarFFmpegProcess]):
         create_stream_spec: Callable[[], Awaitable[StreamSpec]],
         *,
         after_start: Callable[[TypeVarFFmpegProcess], Awaitable[Any]] | None = None,
-    ) -> None:
-        """Execute FFmpeg process.
+        io_channels: Sequence[IOChannel] = (),
+    ) -> FFmpegResult:
+        """Execute FFmpeg process; return result with statistics.
 
         This method defines workflow including interruption and logging.
+
+        Args:
+            create_stream_spec: Coroutine function to create stream spec.
+            after_start: Coroutine function to execute after start FFmpeg process.
+            io_channels: Named pipes, Unix domain sockets or staged outputs referred by stream spec. They are created
+                before FFmpeg starts, fed or drained while FFmpeg runs, and removed after FFmpeg finishes.
+        """
+
+        async def create() -> TypeVarFFmpegProcess:
+            return self.create_ffmpeg_process(await create_stream_spec())
+
+        return await self.run(create, after_start, io_channels)
+
+    async def execute_job(
+        self,
+        job: FFmpegJob,
+        *,
+        after_start: Callable[[TypeVarFFmpegProcess], Awaitable[Any]] | None = None,
+        io_channels: Sequence[IOChannel] = (),
+    ) -> FFmpegResult:
+        """Execute FFmpeg job which has precompiled arguments; return result with statistics.
+
+        Same as execute() except that the job is passed instead of the coroutine function to create stream spec.
         """
+
+        async def create() -> TypeVarFFmpegProcess:
+            return self.create_ffmpeg_process(job)
+
+        return await self.run(create, after_start, io_channels)
+
+    async def execute_job_reading_stdout(
+        self,
+        job: FFmpegJob,
+        read: Callable[[TypeVarFFmpegProcess], Awaitable[TypeVarRead]],
+    ) -> tuple[FFmpegResult, TypeVarRead]:
+        """Execute FFmpeg job while reading its stdout; return result and what read returns.
+
+        Requires the coroutine created with `pipe_stdout=True`. When read fails, FFmpeg quits and the error is raised,
+        since FFmpeg would be blocked forever on writing into stdout which nobody reads.
+
+        Args:
+            job: FFmpeg job.
+            read: Coroutine function which reads stdout of started FFmpeg process until EOF.
+        """
+        started: asyncio.Future[TypeVarFFmpegProcess] = asyncio.get_running_loop().create_future()
+
+        async def after_start(ffmpeg_process: TypeVarFFmpegProcess) -> None:
+            started.set_result(ffmpeg_process)
+
+        async def read_started() -> TypeVarRead:
+            return await read(await started)
+
+        task_ffmpeg = asyncio.ensure_future(self.execute_job(job, after_start=after_start))
+        task_read = asyncio.ensure_future(read_started())
+        try:
+            await asyncio.wait([task_ffmpeg, task_read], return_when=asyncio.FIRST_EXCEPTION)
+            if not task_ffmpeg.done():
+                # Read failed.
+                await cancel(task_ffmpeg)
+                task_read.result()
+            return task_ffmpeg.result(), await task_read
+        finally:
+            await cancel(task_read)
+            await cancel(task_ffmpeg)
+
+    def create_ffmpeg_process(self, stream_spec: StreamSpec | FFmpegJob) -> TypeVarFFmpegProcess:
+        self.ffmpeg_process = self.class_ffmpeg_process(
+            self.time_to_force_termination,
+            stream_spec,
+            self.spawn_options,
+        )
+        return self.ffmpeg_process
+
+    async def execute_chain(
+        self,
+        create_stream_specs: Callable[[], Awaitable[Sequence[StreamSpec]]],
+        *,
+        after_start: Callable[[FFmpegProcessChain], Awaitable[Any]] | None = None,
+        io_channels: Sequence[IOChannel] = (),
+    ) -> FFmpegResult:
+        """Execute FFmpeg processes chained by OS pipes; return result of the last stage.
+
+        Stdout of each stage becomes stdin of the next stage directly. The last stage is instance of the class of this
+        coroutine. Interruption quits the whole chain and failure of any stage quits the other stages.
+        """
+        # Reason: Most coroutines don't chain processes, so the chain is imported when used.
+        from asyncffmpeg.ffmpegprocess.chain import FFmpegProcessChain  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+        if not issubclass(self.class_ffmpeg_process, FFmpegProcessPosix):
+            msg = "Chain is supported only on POSIX"
+            raise NotImplementedError(msg)
+        class_ffmpeg_process = self.class_ffmpeg_process
+
+        async def create() -> FFmpegProcessChain:
+            stream_specs = await create_stream_specs()
+            return FFmpegProcessChain(
+                self.time_to_force_termination,
+                stream_specs,
+                class_ffmpeg_process,
+                self.spawn_options,
+            )
+
+        return await self.run(create, after_start, io_channels)
+
+    async def run(
+        self,
+        create: Callable[[], Awaitable[TypeVarFFmpegRunnable]],
+        after_start: Callable[[TypeVarFFmpegRunnable], Awaitable[Any]] | None,
+        io_channels: Sequence[IOChannel] = (),
+    ) -> FFmpegResult:
+        """Run workflow including interruption and logging."""
+        # Reason: io_channel imports socket and tempfile which most coroutines don't use.
+        from asyncffmpeg.io_channel import IOChannels  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+        ffmpeg_runnable: TypeVarFFmpegRunnable | None = None
+        managed_io_channels = IOChannels(io_channels)
         try:
             self.logger.debug("FFmpeg coroutine start")
             signal(SIGTERM, self.sigterm_handler)
-            self.ffmpeg_process = self.class_ffmpeg_process(self.time_to_force_termination, await create_stream_spec())
+            await managed_io_channels.open()
+            ffmpeg_runnable = await create()
             self.logger.debug("Instantiate FFmpeg process finish")
+            managed_io_channels.start()
             if after_start:
                 self.logger.debug("Await after_start coroutine start")
-                await after_start(self.ffmpeg_process)
+                await after_start(ffmpeg_runnable)
             self.logger.debug("Await FFmpeg process start")
-            await self.ffmpeg_process.wait()
+            result = await self.wait(ffmpeg_runnable)
             self.logger.debug("Await FFmpeg process finish")
+            await managed_io_channels.join(result)
+            await managed_io_channels.commit()
         except (KeyboardInterrupt, asyncio.CancelledError) as error:
             self.logger.info("Process cancelled")
             self.logger.debug(type(error).__name__)
-            if self.ffmpeg_process is not None:
+            if ffmpeg_runnable is not None:
                 self.logger.info("FFmpeg process quit start")
-                await self.ffmpeg_process.quit(self.time_to_force_termination)
+                await ffmpeg_runnable.quit(self.time_to_force_termination)
                 self.logger.info("FFmpeg process quit finish")
             raise
         except Exception:
             self.logger.exception("Unexpected error occurred")
             raise
         finally:
+            managed_io_channels.close()
             self.logger.debug("FFmpeg coroutine finish")
+        return result
+
+    async def wait(self, ffmpeg_runnable: FFmpegRunnable) -> FFmpegResult:
+        if self.watchdog is None:
+            return await ffmpeg_runnable.wait()
+        return await self.watchdog.wait(ffmpeg_runnable, self.time_to_force_termination)
 
     # Reason:
     #   ANN401: To follow the specification of Python.
@@ -93,3 +235,9 @@ class FFmpegCoroutine(Generic[TypeVarFFmpegProcess]):
                 task.cancel()
         except RuntimeError:
             raise CancelledError from None  # No event loop running; raise directly
+
+
+async def cancel(task: asyncio.Future[Any]) -> None:
+    """Cancel the task and wait it to finish, e.g. FFmpeg to quit."""
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
@@ -1,24 +1,57 @@
 """FFmpeg coroutine Factory."""
 
+from __future__ import annotations
+
 import os
+from typing import TYPE_CHECKING
 
 from asyncffmpeg.ffmpeg_coroutine import TIME_TO_FORCE_TERMINATION
 from asyncffmpeg.ffmpeg_coroutine import FFmpegCoroutine
-from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
 from asyncffmpeg.ffmpegprocess.posix import FFmpegProcessPosix
+from asyncffmpeg.ffmpegprocess.posix import FFmpegProcessPosixStdout
 
 if os.name == "nt":
     from asyncffmpeg.ffmpegprocess.windows_wrapper import FFmpegProcessWindowsWrapper  # pragma: no cover
 
+if TYPE_CHECKING:
+    from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
+    from asyncffmpeg.ffmpegprocess.spawn import SpawnOptions
+    from asyncffmpeg.watchdog import Watchdog
+
 
 __all__ = ["FFmpegCoroutineFactory"]
 
 
 class FFmpegCoroutineFactory:
     @staticmethod
-    def create(*, time_to_force_termination: int = TIME_TO_FORCE_TERMINATION) -> FFmpegCoroutine[FFmpegProcess]:
-        return (
-            FFmpegCoroutine(FFmpegProcessWindowsWrapper, time_to_force_termination=time_to_force_termination)
-            if os.name == "nt"
-            else FFmpegCoroutine(FFmpegProcessPosix, time_to_force_termination=time_to_force_termination)
+    def create(
+        *,
+        time_to_force_termination: int = TIME_TO_FORCE_TERMINATION,
+        pipe_stdout: bool = False,
+        spawn_options: SpawnOptions | None = None,
+        watchdog: Watchdog | None = None,
+    ) -> FFmpegCoroutine[FFmpegProcess]:
+        """Create FFmpeg coroutine.
+
+        Args:
+            time_to_force_termination: The time limit (second) to wait stopping FFmpeg process gracefully.
+            pipe_stdout: Leaves stdout pipe of FFmpeg process to the caller, e.g. StdoutBroadcaster.
+            spawn_options: Options to spawn FFmpeg process.
+            watchdog: Quits FFmpeg process when its progress stalls or its deadline passes.
+        """
+        if os.name == "nt":  # pragma: no cover
+            if pipe_stdout or watchdog is not None:
+                msg = "Piping stdout and watchdog are not supported on Windows"
+                raise NotImplementedError(msg)
+            return FFmpegCoroutine(
+                FFmpegProcessWindowsWrapper,
+                time_to_force_termination=time_to_force_termination,
+                spawn_options=spawn_options,
+            )
+        class_ffmpeg_process = FFmpegProcessPosixStdout if pipe_stdout else FFmpegProcessPosix
+        return FFmpegCoroutine(
+            class_ffmpeg_process,
+            time_to_force_termination=time_to_force_termination,
+            spawn_options=spawn_options,
+            watchdog=watchdog,
         )
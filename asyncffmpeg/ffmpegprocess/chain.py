@@ -0,0 +1,109 @@
+"""FFmpeg processes chained by OS pipes."""
+
+from __future__ import annotations
+
+import asyncio
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from asyncffmpeg.ffmpegprocess.posix import FFmpegProcessPosix
+from asyncffmpeg.ffmpegprocess.posix import FFmpegProcessPosixStdout
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from asyncffmpeg.ffmpegprocess.progress import Progress
+    from asyncffmpeg.ffmpegprocess.spawn import SpawnOptions
+    from asyncffmpeg.result import FFmpegResult
+    from asyncffmpeg.type_alias import StreamSpec
+
+__all__ = ["FFmpegProcessChain"]
+
+
+class FFmpegProcessChain:
+    """FFmpeg processes chained by OS pipes.
+
+    The stdout file descriptor of each stage becomes the stdin of the next stage directly, so bytes between stages
+    never go through Python. The stream spec of each stage except for the last one has to output into `pipe:` and the
+    one of each stage except for the first one has to input from `pipe:`.
+
+    Args:
+        class_ffmpeg_process: The class of the last stage.
+    """
+
+    def __init__(
+        self,
+        time_to_force_termination: float,
+        stream_specs: Sequence[StreamSpec],
+        class_ffmpeg_process: type[FFmpegProcessPosix] = FFmpegProcessPosix,
+        spawn_options: SpawnOptions | None = None,
+    ) -> None:
+        minimum_stages = 2
+        if len(stream_specs) < minimum_stages:
+            msg = f"Chain requires at least {minimum_stages} stream specs"
+            raise ValueError(msg)
+        self.time_to_force_termination = time_to_force_termination
+        self.spawn_options = spawn_options
+        self.logger = getLogger(__name__)
+        self.ffmpeg_processes: list[FFmpegProcessPosix] = []
+        try:
+            for stream_spec in stream_specs[:-1]:
+                self.append(FFmpegProcessPosixStdout, stream_spec)
+            self.append(class_ffmpeg_process, stream_specs[-1])
+        except BaseException:
+            for ffmpeg_process in self.ffmpeg_processes:
+                ffmpeg_process.popen.kill()
+            raise
+
+    def append(self, class_ffmpeg_process: type[FFmpegProcessPosix], stream_spec: StreamSpec) -> None:
+        stdin = self.ffmpeg_processes[-1].popen.stdout if self.ffmpeg_processes else None
+        self.ffmpeg_processes.append(
+            class_ffmpeg_process(self.time_to_force_termination, stream_spec, self.spawn_options, stdin=stdin),
+        )
+        if stdin is not None:
+            # Otherwise, upstream stage can't detect the exit of downstream stage by broken pipe.
+            stdin.close()
+
+    @property
+    def progress(self) -> Progress:
+        """Progress of the stage which advanced most recently, since the chain advances while any stage advances."""
+        progresses = [ffmpeg_process.progress for ffmpeg_process in self.ffmpeg_processes]
+        return max(progresses, key=lambda progress: progress.time_advanced)
+
+    async def wait(self) -> FFmpegResult:
+        """Wait for all stages to finish; return result of the last stage.
+
+        When a stage fails, the other stages are quitted and the error is raised.
+        """
+        tasks = [asyncio.ensure_future(ffmpeg_process.wait()) for ffmpeg_process in self.ffmpeg_processes]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        failed = next((task for task in tasks if task in done and task.exception() is not None), None)
+        if failed is None:
+            return tasks[-1].result()
+        for task in pending:
+            task.cancel()
+        self.logger.error("Stage %d failed", tasks.index(failed))
+        await self.quit()
+        # Reason: Checked by the condition of the next() above.
+        raise failed.exception()  # type: ignore[misc]
+
+    def suspend(self) -> None:
+        """Suspend all stages, see: FFmpegProcess.suspend()."""
+        for ffmpeg_process in self.ffmpeg_processes:
+            ffmpeg_process.suspend()
+
+    def resume(self) -> None:
+        """Resume all stages."""
+        for ffmpeg_process in self.ffmpeg_processes:
+            ffmpeg_process.resume()
+
+    async def quit(self, time_to_force_termination: float | None = None) -> None:
+        """Quits stages from upstream so that downstream stages finish by the end of stream."""
+        for ffmpeg_process in self.ffmpeg_processes:
+            if ffmpeg_process.popen.poll() is None:
+                await ffmpeg_process.quit(time_to_force_termination)
@@ -0,0 +1,164 @@
+"""Classifier of FFmpeg failure by signatures in stderr."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import signal
+
+from asyncffmpeg.exceptions import FFmpegDiskFullError
+from asyncffmpeg.exceptions import FFmpegEncoderNotFoundError
+from asyncffmpeg.exceptions import FFmpegInputNotFoundError
+from asyncffmpeg.exceptions import FFmpegInvalidFilterGraphError
+from asyncffmpeg.exceptions import FFmpegInvalidOptionError
+from asyncffmpeg.exceptions import FFmpegOutputExistsError
+from asyncffmpeg.exceptions import FFmpegProcessError
+from asyncffmpeg.exceptions import FFmpegResourceLimitError
+
+__all__ = ["ErrorClassifier"]
+
+# Components prefix their lines, e.g. "[vost#0:0/libx264 @ 0x55d0c0] " and "[libx264 @ 0x55d0c1] [Eval @ 0x55d0c2] ".
+PREFIX = r"^(?:\[[^]]+ @ 0x[0-9a-f]+\] )*"
+# Lines of banner, stream information and metadata, which may contain file names and metadata values as they are.
+PREFIXES_INFORMATION = (" ", "ffmpeg version ", "Input #", "Output #", "Stream mapping:", "Press [q]")
+# Signals sent when FFmpeg exceeds CPU time or file size limit, see: ResourceLimits. Not defined on Windows.
+SIGNALS_RESOURCE_LIMIT = [getattr(signal, name) for name in ("SIGXCPU", "SIGXFSZ") if hasattr(signal, name)]
+
+
+Signatures = list[tuple[re.Pattern[str], type[FFmpegProcessError]]]
+
+
+def create_pattern_errno(message: str) -> str:
+    """Create pattern of line which reports error of system call, e.g. "Error writing trailer: <message>".
+
+    Quotes aren't allowed before the message so that quoted file names don't match.
+    """
+    return rf"{PREFIX}[^'\"]*(?:: |\(){message}(?:\)|, .*)?$"
+
+
+# FFmpeg can't continue after these appear, so that it's aborted as soon as they appear.
+SIGNATURES_FATAL: Signatures = [
+    (re.compile(rf"{PREFIX}Error opening input: No such file or directory$"), FFmpegInputNotFoundError),
+    # FFmpeg 7.1+ returns 0 in this case.
+    (re.compile(r"^File '.*' already exists\. Exiting\.$|^Not overwriting - exiting$"), FFmpegOutputExistsError),
+    (
+        re.compile(rf"{PREFIX}Unknown encoder '[^']*'$|^Error opening output files: Encoder not found$"),
+        FFmpegEncoderNotFoundError,
+    ),
+    (
+        re.compile(
+            "|".join(
+                [
+                    rf"{PREFIX}No such filter: '[^']*'$",
+                    r"^Error applying option '[^']*' to filter '[^']*': .*$",
+                    rf"{PREFIX}Error (?:initializing|reinitializing|configuring) (?:a simple |a complex )?filter.*$",
+                ],
+            ),
+        ),
+        FFmpegInvalidFilterGraphError,
+    ),
+    (
+        re.compile(
+            "|".join(
+                [
+                    r"^Unrecognized option '[^']*'\.$",
+                    r"^Error [^':]+: Option not found$",
+                    rf"{PREFIX}Error (?:setting|parsing) (?:option|preset/tune) .*$",
+                    # Encoder reports invalid value of its option only when it opens.
+                    rf"{PREFIX}Error while opening encoder.*$",
+                ],
+            ),
+        ),
+        FFmpegInvalidOptionError,
+    ),
+]
+# FFmpeg may recover from these, e.g. transient error or failure of an output of tee muxer which has others, so that
+# they only classify failure when FFmpeg exits with error.
+SIGNATURES_AT_EXIT: Signatures = [
+    (re.compile(create_pattern_errno("No space left on device")), FFmpegDiskFullError),
+    (
+        re.compile(
+            "|".join(
+                [
+                    create_pattern_errno("(?:Cannot allocate memory|Too many open files|File too large)"),
+                    # FFmpeg catches SIGXCPU and exits by itself.
+                    *(rf"^Exiting normally, received signal {int(signum)}\.$" for signum in SIGNALS_RESOURCE_LIMIT),
+                ],
+            ),
+        ),
+        FFmpegResourceLimitError,
+    ),
+]
+# FFmpeg exits by itself without telling which signal it received repeatedly, e.g. SIGXCPU which repeats every second of
+# CPU time summed over threads faster than FFmpeg exits, or SIGINT which an operator repeats.
+PATTERN_HARD_EXIT = re.compile(r"^Received > 3 system signals, hard exiting$")
+
+
+class ErrorClassifier:
+    """Classifies failure of FFmpeg by the first line of stderr which matches a known signature.
+
+    Signatures are anchored to the whole line which FFmpeg writes, and lines of banner, stream information and metadata
+    are skipped, so that file names and metadata values don't match. Since lines are classified as they appear, FFmpeg
+    can be aborted without waiting for its exit when a fatal signature appears. Signatures which FFmpeg may recover
+    from, e.g. errors of system calls, only classify the failure when FFmpeg exits with error, and a fatal signature
+    which appears later takes precedence over them.
+
+    Args:
+        cpu_time_limited: Whether CPU time of FFmpeg is limited, then hard exit on repeated signals is classified as
+            exceeding the limit. Otherwise, it's classified as generic error since the signals may be sent by others.
+    """
+
+    def __init__(self, *, cpu_time_limited: bool = False) -> None:
+        self.cpu_time_limited = cpu_time_limited
+        self.hard_exited = False
+        self.error_class: type[FFmpegProcessError] | None = None
+        # Line which matched the signature.
+        self.line: str | None = None
+        self.fatal = False
+        self.event: asyncio.Event | None = None
+
+    def feed(self, line: str) -> None:
+        if self.fatal or line.startswith(PREFIXES_INFORMATION):
+            return
+        if PATTERN_HARD_EXIT.match(line):
+            self.hard_exited = True
+            return
+        error_class = match(SIGNATURES_FATAL, line)
+        if error_class is not None:
+            self.detect_fatal(error_class, line)
+        elif self.error_class is None:
+            self.error_class = match(SIGNATURES_AT_EXIT, line)
+            self.line = None if self.error_class is None else line
+
+    def detect_fatal(self, error_class: type[FFmpegProcessError], line: str) -> None:
+        self.error_class, self.line, self.fatal = error_class, line, True
+        if self.event is not None:
+            self.event.set()
+
+    async def wait_detected(self) -> None:
+        """Wait until a fatal signature appears."""
+        # Created lazily since asyncio.Event requires event loop in Python 3.9.
+        self.event = asyncio.Event()
+        if not self.fatal:
+            await self.event.wait()
+
+    def is_failed(self, return_code: int) -> bool:
+        """Whether FFmpeg failed; a signature doesn't override success except for output which exists.
+
+        FFmpeg 7.1+ returns 0 when it doesn't overwrite the output which exists.
+        """
+        return return_code != 0 or self.error_class is FFmpegOutputExistsError
+
+    def create_error(self, message: str, exit_code: int) -> FFmpegProcessError:
+        error_class = self.error_class
+        if error_class is None:
+            error_class = FFmpegResourceLimitError if self.is_resource_limit(exit_code) else FFmpegProcessError
+        return error_class(message, exit_code)
+
+    def is_resource_limit(self, exit_code: int) -> bool:
+        # Killed by signal which leaves no line in stderr, e.g. SIGXFSZ.
+        return -exit_code in SIGNALS_RESOURCE_LIMIT or (self.hard_exited and self.cpu_time_limited)
+
+
+def match(signatures: Signatures, line: str) -> type[FFmpegProcessError] | None:
+    return next((error for pattern, error in signatures if pattern.match(line)), None)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import os
+import signal
 from abc import abstractmethod
 from contextlib import suppress
 from logging import getLogger
@@ -10,17 +12,36 @@ from logging import getLogger
 from subprocess import Popen  # nosec
 from subprocess import TimeoutExpired  # nosec
 from typing import TYPE_CHECKING
+from typing import Protocol
 
 from livesubprocess import LiveSubProcessFactory
 
-from asyncffmpeg.exceptions import FFmpegProcessError
+from asyncffmpeg.ffmpegprocess.classifier import ErrorClassifier
+from asyncffmpeg.ffmpegprocess.progress import Progress
+from asyncffmpeg.ffmpegprocess.spawn import SpawnOptions
+from asyncffmpeg.job import FFmpegJob
+from asyncffmpeg.result import StatisticsParser
 
 if TYPE_CHECKING:
+    from livesubprocess import LivePopen
+
+    from asyncffmpeg.result import FFmpegResult
     from asyncffmpeg.type_alias import StreamSpec
 
 __all__ = ["FFmpegProcess"]
 
 
+class FFmpegRunnable(Protocol):
+    """Something to be awaited and quitted as FFmpeg process, e.g. FFmpegProcess, FFmpegProcessChain."""
+
+    @property
+    def progress(self) -> Progress: ...
+
+    async def wait(self) -> FFmpegResult: ...
+
+    async def quit(self, time_to_force_termination: float | None = None) -> None: ...
+
+
 class BaseFFmpegProcess:
     """FFmpeg process wrapping Popen object.
 
@@ -30,23 +51,79 @@ class BaseFFmpegProcess:
     def __init__(self, time_to_force_termination: float) -> None:
         self.time_to_force_termination = time_to_force_termination
         self.logger = getLogger(__name__)
+        # Updated only when the live popen notifies lines of stderr, see: FFmpegProcessPosix.
+        self.progress = Progress()
+        self.statistics_parser = StatisticsParser()
+        self.error_classifier = self.create_error_classifier()
+        # Whether FFmpeg was quit since fatal error appeared in stderr, see: FFmpegProcessPosix.
+        self.aborted = False
+        self.suspended = False
         self.popen = self.create_popen()
-        self.live_popen = LiveSubProcessFactory.create_popen(self.popen)
+        self.live_popen = self.create_live_popen()
 
     @abstractmethod
     def create_popen(self) -> Popen[bytes]:
         raise NotImplementedError  # pragma: no cover
 
-    async def wait(self) -> None:
-        """Wait for subprocess to finish."""
-        stdout, return_code = await self.live_popen.wait()
-        self.logger.info(stdout)
-        # Check for error conditions:
-        # 1. Non-zero return code (traditional error)
-        # 2. File already exists error (FFmpeg 7.1+ returns 0 but this is still an error condition)
-        if return_code != 0 or "already exists. Exiting" in stdout:
+    def create_error_classifier(self) -> ErrorClassifier:
+        return ErrorClassifier()
+
+    def create_live_popen(self) -> LivePopen:
+        return LiveSubProcessFactory.create_popen(self.popen)
+
+    async def wait(self) -> FFmpegResult:
+        """Wait for subprocess to finish; return result with statistics."""
+        stdout, return_code = await self.wait_live_popen()
+        self.consume(stdout)
+        # FFmpeg quit by abort() may return 0.
+        if self.aborted or self.error_classifier.is_failed(return_code):
             self.logger.error("return_code = %d", return_code)
-            raise FFmpegProcessError(stdout, return_code)
+            raise self.error_classifier.create_error(stdout, return_code)
+        return self.statistics_parser.create_result(return_code)
+
+    async def wait_live_popen(self) -> tuple[str, int]:
+        return await self.live_popen.wait()
+
+    def consume(self, stdout: str) -> None:
+        """Log output and parse statistics and errors from it after the process finished.
+
+        Override when the live popen notifies lines of stderr to the logger and parsers while the process runs.
+        """
+        self.logger.info(stdout)
+        for line in stdout.splitlines():
+            self.statistics_parser.feed(line)
+            self.error_classifier.feed(line)
+
+    def consume_rest(self, stderr: bytes) -> None:
+        """Log the rest of stderr which FFmpeg wrote until it quit.
+
+        Override as same as consume() when the live popen notifies lines of stderr.
+        """
+        self.logger.info(stderr.decode("utf-8").rstrip())
+
+    def suspend(self) -> None:
+        """Suspend FFmpeg process by SIGSTOP, e.g. to yield CPU cores to urgent jobs. Not supported on Windows."""
+        if self.suspended or self.popen.poll() is not None:
+            return
+        self.send_signal("SIGSTOP")
+        self.suspended = True
+        self.progress.suspend()
+
+    def resume(self) -> None:
+        """Resume FFmpeg process suspended by suspend() by SIGCONT."""
+        if not self.suspended:
+            return
+        self.suspended = False
+        self.progress.resume()
+        if self.popen.poll() is None:
+            self.send_signal("SIGCONT")
+
+    def send_signal(self, name: str) -> None:
+        if os.name == "nt":  # pragma: no cover
+            msg = "Suspending FFmpeg process is not supported on Windows"
+            raise NotImplementedError(msg)
+        self.logger.debug("Send %s to FFmpeg", name)
+        self.popen.send_signal(getattr(signal, name))
 
     async def quit(self, time_to_force_termination: float | None = None) -> None:
         """Quits FFmpeg process.
@@ -54,14 +131,21 @@ class BaseFFmpegProcess:
         see: https://github.com/kkroening/ffmpeg-python/issues/162#issuecomment-571820244
         """
         time_to_force_termination = self.get_time_to_force_termination(time_to_force_termination)
+        # Suspended FFmpeg can't read the key and the time to force termination would be spent for nothing.
+        self.resume()
         self.logger.debug("Stop FFmpeg")
         # No event loop running (e.g. subprocess context): no async readers to stop.
         with suppress(RuntimeError):
             self.live_popen.stop()
         # communicate() can't work in Python 3.8 or older on Windows...
-        _stdout, stderr = self.popen.communicate(str.encode("q"))  # Equivalent to send a Q
-        self.logger.debug("Sent key Q")
-        self.logger.info(stderr.decode("utf-8").rstrip())
+        try:
+            _stdout, stderr = self.popen.communicate(str.encode("q"), timeout=time_to_force_termination)
+        # Reason: FFmpeg can't read the key while it is blocked, e.g. by stalled input.
+        except TimeoutExpired:
+            self.logger.warning("FFmpeg didn't respond to key Q")
+        else:
+            self.logger.debug("Sent key Q")
+            self.consume_rest(stderr)
         self.logger.debug("To be sure that the process ends")
         try:
             self.popen.wait(timeout=time_to_force_termination)
@@ -77,12 +161,35 @@ class BaseFFmpegProcess:
 
 
 class FFmpegProcess(BaseFFmpegProcess):
-    """FFmpeg process interface which has constructor with stream spec argument."""
+    """FFmpeg process interface which has constructor with stream spec argument.
+
+    The stream spec can be FFmpeg job which has precompiled arguments.
+    """
 
-    def __init__(self, time_to_force_termination: float, stream_spec: StreamSpec) -> None:
+    def __init__(
+        self,
+        time_to_force_termination: float,
+        stream_spec: StreamSpec | FFmpegJob,
+        spawn_options: SpawnOptions | None = None,
+    ) -> None:
         self.stream_spec = stream_spec
+        self.spawn_options = SpawnOptions() if spawn_options is None else spawn_options
         super().__init__(time_to_force_termination)
 
     @abstractmethod
     def create_popen(self) -> Popen[bytes]:
         raise NotImplementedError  # pragma: no cover
+
+    def create_error_classifier(self) -> ErrorClassifier:
+        limits = self.spawn_options.limits
+        return ErrorClassifier(cpu_time_limited=limits is not None and limits.cpu_time is not None)
+
+    def compile(self) -> list[str]:
+        """Compile arguments of FFmpeg including executable at first."""
+        if isinstance(self.stream_spec, FFmpegJob):
+            return list(self.stream_spec.arguments)
+        # Reason: ffmpeg-python takes much time to import and jobs which have precompiled arguments don't use it.
+        import ffmpeg  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+        arguments: list[str] = ffmpeg.compile(self.stream_spec)
+        return arguments
@@ -0,0 +1,136 @@
+"""Live reader of FFmpeg output which notifies lines of stderr while FFmpeg runs."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from collections import deque
+from typing import TYPE_CHECKING
+from typing import Callable
+
+from livesubprocess import LivePopen
+
+if TYPE_CHECKING:
+    # Reason: This package requires to use subprocess.
+    from subprocess import Popen  # nosec
+
+__all__ = ["LineSplitter", "LivePopenPosix"]
+
+SIZE_READ_CHUNK = 4096
+# FFmpeg terminates progress lines by carriage return to overwrite them on terminal.
+PATTERN_LINE_TERMINATOR = re.compile(rb"\r\n|\r|\n")
+# Lines at the end of stderr kept for error message, since the reason of failure appears at last.
+MAX_LINES_KEPT = 200
+
+
+class LineSplitter:
+    """Splits chunks into lines terminated by LF or CR."""
+
+    def __init__(self) -> None:
+        self.buffer = b""
+
+    def feed(self, chunk: bytes) -> list[str]:
+        """Return lines completed by the chunk."""
+        *lines, self.buffer = PATTERN_LINE_TERMINATOR.split(self.buffer + chunk)
+        return [line.decode(errors="replace") for line in lines if line]
+
+    def flush(self) -> list[str]:
+        """Return the last line which isn't terminated."""
+        line, self.buffer = self.buffer, b""
+        return [line.decode(errors="replace")] if line else []
+
+
+class LivePopenPosix(LivePopen):
+    """Reads output of Popen in real time and notifies each line of stderr to listeners.
+
+    Unlike the livesubprocess package, this class can leave stdout pipe for the caller, e.g. StdoutBroadcaster, and
+    lets listeners observe progress lines of FFmpeg while it runs, e.g. StderrLogger. Output isn't echoed into stdout of
+    this process, and only the last lines of stderr are kept for error message so that long job doesn't hold its whole
+    log. Stdout which is read is discarded.
+
+    Args:
+        read_stdout: Whether to read stdout as well as stderr. When False, stdout pipe is left for the caller.
+        max_lines_kept: Number of the last lines of stderr to return as output.
+    """
+
+    def __init__(self, popen: Popen[bytes], *, read_stdout: bool = True, max_lines_kept: int = MAX_LINES_KEPT) -> None:
+        if popen.stderr is None or (read_stdout and popen.stdout is None):
+            msg = "Popen must have pipes to read"
+            raise ValueError(msg)
+        self.popen = popen
+        self.read_stdout = read_stdout
+        self.fd_stderr = popen.stderr.fileno()
+        # Reason: Checked above.
+        self.fds = [popen.stdout.fileno(), self.fd_stderr] if read_stdout else [self.fd_stderr]  # type: ignore[union-attr]
+        self.lines: deque[str] = deque(maxlen=max_lines_kept)
+        self.line_splitter = LineSplitter()
+        self.listeners: list[Callable[[str], None]] = []
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.eofs: list[asyncio.Event] = []
+
+    def stop(self) -> None:
+        """Deregister fd readers; call before popen.communicate() or popen.terminate()."""
+        if self.loop is not None:
+            for fd in self.fds:
+                self.loop.remove_reader(fd)
+
+    async def wait(self) -> tuple[str, int]:
+        """Wait for process and output; return (output, returncode)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No running event loop (e.g., coroutine advanced via .send() in a subprocess without asyncio.run()).
+            return self.wait_blocking()
+        self.loop = loop
+        self.eofs = [asyncio.Event() for _ in self.fds]
+        for fd, eof in zip(self.fds, self.eofs):
+            loop.add_reader(fd, self.on_readable, fd, eof)
+        await asyncio.gather(loop.run_in_executor(None, self.popen.wait), *(eof.wait() for eof in self.eofs))
+        # Defensive: no-op if already removed by on_readable()
+        self.stop()
+        return self.get_return_value()
+
+    def wait_blocking(self) -> tuple[str, int]:
+        if self.read_stdout:
+            # Same as livesubprocess, leaves pipes so that quit() can communicate with the process after interruption.
+            self.popen.wait()
+            return self.get_return_value()
+        # Reason: Checked in constructor.
+        stderr = self.popen.stderr.read()  # type: ignore[union-attr]
+        self.popen.wait()
+        self.notify(self.line_splitter.feed(stderr) + self.line_splitter.flush())
+        return self.get_return_value()
+
+    def on_readable(self, fd: int, eof: asyncio.Event) -> None:
+        """Read available data from fd; notify lines of stderr and signal EOF."""
+        try:
+            chunk = os.read(fd, SIZE_READ_CHUNK)
+        except OSError:
+            chunk = b""
+        is_stderr = fd == self.fd_stderr
+        if not chunk:
+            # Reason: Set in wait() before registering this callback.
+            self.loop.remove_reader(fd)  # type: ignore[union-attr]
+            eof.set()
+            if is_stderr:
+                self.notify(self.line_splitter.flush())
+            return
+        if is_stderr:
+            self.notify(self.line_splitter.feed(chunk))
+
+    def feed_rest(self, stderr: bytes) -> None:
+        """Notify the rest of stderr read by popen.communicate() after stop()."""
+        self.notify(self.line_splitter.feed(stderr) + self.line_splitter.flush())
+
+    def notify(self, lines: list[str]) -> None:
+        self.lines.extend(lines)
+        for line in lines:
+            for listener in self.listeners:
+                listener(line)
+
+    def get_return_value(self) -> tuple[str, int]:
+        if self.popen.returncode is None:
+            msg = "Process finished but returncode is None"
+            raise RuntimeError(msg)
+        return "\n".join(self.lines).strip(), self.popen.returncode
@@ -2,20 +2,103 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import asyncio
 
-import ffmpeg
+# Reason: This package requires to use subprocess.
+from subprocess import PIPE  # nosec
+from typing import IO
+from typing import TYPE_CHECKING
+from typing import cast
 
 from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
+from asyncffmpeg.ffmpegprocess.live_popen import LivePopenPosix
+from asyncffmpeg.ffmpegprocess.stderr_logger import StderrLogger
 
 if TYPE_CHECKING:
     # Reason: This package requires to use subprocess.
     from subprocess import Popen  # nosec
 
+    from livesubprocess import LivePopen
+
+    from asyncffmpeg.ffmpegprocess.spawn import SpawnOptions
+    from asyncffmpeg.job import FFmpegJob
+    from asyncffmpeg.type_alias import StreamSpec
+
 
 class FFmpegProcessPosix(FFmpegProcess):
-    """FFmpeg process wrapping Popen object."""
+    """FFmpeg process wrapping Popen object.
+
+    Args:
+        stdin: The pipe to be stdin of FFmpeg, e.g. stdout of upstream FFmpeg process. When None, stdin is piped so
+            that quit() can send `q` key.
+    """
+
+    READ_STDOUT = True
+
+    def __init__(
+        self,
+        time_to_force_termination: float,
+        stream_spec: StreamSpec | FFmpegJob,
+        spawn_options: SpawnOptions | None = None,
+        *,
+        stdin: IO[bytes] | None = None,
+    ) -> None:
+        self.stdin = stdin
+        super().__init__(time_to_force_termination, stream_spec, spawn_options)
 
     def create_popen(self) -> Popen[bytes]:
-        # Reason: Requires to update ffmpeg-python side.
-        return ffmpeg.run_async(self.stream_spec, pipe_stdin=True, pipe_stdout=True, pipe_stderr=True)  # type: ignore[no-any-return]
+        # Same as ffmpeg.run_async() except for spawn options.
+        return self.spawn_options.create_popen(self.compile(), PIPE if self.stdin is None else self.stdin)
+
+    def create_live_popen(self) -> LivePopen:
+        live_popen = LivePopenPosix(self.popen, read_stdout=self.READ_STDOUT)
+        self.stderr_logger = StderrLogger(self.popen.pid)
+        live_popen.listeners.append(self.stderr_logger.feed)
+        live_popen.listeners.append(self.progress.feed)
+        live_popen.listeners.append(self.statistics_parser.feed)
+        live_popen.listeners.append(self.error_classifier.feed)
+        return live_popen
+
+    async def wait_live_popen(self) -> tuple[str, int]:
+        """Wait for live popen; abort FFmpeg as soon as fatal error appears in stderr."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No running event loop (e.g., coroutine advanced via .send() in a subprocess without asyncio.run()).
+            return await self.live_popen.wait()
+        task_wait = asyncio.ensure_future(self.live_popen.wait())
+        task_detected = asyncio.ensure_future(self.error_classifier.wait_detected())
+        try:
+            await asyncio.wait([task_wait, task_detected], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            task_detected.cancel()
+            task_wait.cancel()
+        if task_wait.done() and not task_wait.cancelled():
+            return task_wait.result()
+        return await self.abort()
+
+    async def abort(self) -> tuple[str, int]:
+        self.logger.error("Abort FFmpeg since fatal error appeared")
+        self.aborted = True
+        await self.quit()
+        await asyncio.get_running_loop().run_in_executor(None, self.popen.wait)
+        return cast("LivePopenPosix", self.live_popen).get_return_value()
+
+    def consume(self, stdout: str) -> None:  # noqa: ARG002
+        """Output is logged line by line and parsed while the process runs."""
+        self.stderr_logger.finish()
+
+    def consume_rest(self, stderr: bytes) -> None:
+        """Log and parse the rest line by line as same as output while the process ran."""
+        cast("LivePopenPosix", self.live_popen).feed_rest(stderr)
+        self.stderr_logger.finish()
+
+
+class FFmpegProcessPosixStdout(FFmpegProcessPosix):
+    """FFmpeg process which leaves stdout pipe to the caller.
+
+    Use this class when output of FFmpeg is written into pipe, e.g. `ffmpeg.output(stream, "pipe:", format="mpegts")`.
+    The stdout pipe has to be read by the caller, e.g. StdoutBroadcaster, otherwise FFmpeg blocks when the pipe is full.
+    """
+
+    READ_STDOUT = False
@@ -0,0 +1,42 @@
+"""Progress of FFmpeg parsed from its statistics lines."""
+
+from __future__ import annotations
+
+import re
+import time
+
+__all__ = ["Progress"]
+
+# e.g. "frame=  120 fps= 60 q=28.0 size=     256KiB time=00:00:02.00 bitrate=1048.6kbits/s speed=   1x"
+PATTERN_PROGRESS = re.compile(r"(?<![A-Za-z])(frame|size|time)=\s*(\S+)")
+
+
+class Progress:
+    """Frames, size and time which FFmpeg reports, and the last time when any of them advanced.
+
+    Progress can't advance while FFmpeg is suspended, so that it isn't regarded as stalled while suspended.
+    """
+
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.time_advanced = time.monotonic()
+        self.suspended = False
+
+    def feed(self, line: str) -> None:
+        """Update progress by a line of stderr."""
+        values = dict(PATTERN_PROGRESS.findall(line))
+        if values and values != self.values:
+            self.values = values
+            self.time_advanced = time.monotonic()
+
+    def suspend(self) -> None:
+        self.suspended = True
+
+    def resume(self) -> None:
+        self.suspended = False
+        # Time while suspended isn't stall.
+        self.time_advanced = time.monotonic()
+
+    @property
+    def second_since_advanced(self) -> float:
+        return 0.0 if self.suspended else time.monotonic() - self.time_advanced
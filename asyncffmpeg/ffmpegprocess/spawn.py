@@ -0,0 +1,141 @@
+"""Options to spawn FFmpeg process."""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import shutil
+from contextlib import suppress
+from enum import Enum
+from functools import cache
+
+# Reason: This package requires to use subprocess.
+from subprocess import PIPE  # nosec
+from subprocess import Popen  # nosec
+from typing import IO
+from typing import TYPE_CHECKING
+from typing import Union
+
+if os.name != "nt":
+    import resource
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ["ResourceLimits", "SpawnMode", "SpawnOptions"]
+
+Stdin = Union[IO[bytes], int, None]
+
+
+class SpawnMode(Enum):
+    """How to spawn FFmpeg process on POSIX."""
+
+    # Same as ffmpeg.run_async(): fork (or vfork) and close all file descriptors other than stdio in child process.
+    FORK_EXEC = "fork_exec"
+    # posix_spawn() with absolute path of FFmpeg and without closing file descriptors. Since file descriptors created by
+    # Python are non-inheritable (PEP 446), child process receives only stdio and file descriptors which are explicitly
+    # set inheritable. This avoids close_fds loop and fork of big parent process in worker processes which have large fd
+    # limits and many open sockets.
+    POSIX_SPAWN = "posix_spawn"
+
+
+@dataclasses.dataclass(frozen=True)
+class ResourceLimits:
+    """Soft limits of resources applied to FFmpeg process by prlimit() right after it's spawned.
+
+    FFmpeg which exceeds the limit fails with FFmpegResourceLimitError, so that a malformed input or a wrong option can't
+    take down the whole host. Where prlimit() isn't available, e.g. macOS, they are applied by setrlimit() in child
+    process between fork and exec instead.
+
+    Args:
+        address_space: Maximum size (bytes) of virtual memory (RLIMIT_AS).
+        cpu_time: Maximum CPU time (second) summed over all threads (RLIMIT_CPU).
+        open_files: Maximum number of open file descriptors (RLIMIT_NOFILE).
+        file_size: Maximum size (bytes) of each file written (RLIMIT_FSIZE).
+    """
+
+    address_space: int | None = None
+    cpu_time: int | None = None
+    open_files: int | None = None
+    file_size: int | None = None
+
+    def list_limits(self) -> list[tuple[int, tuple[int, int]]]:
+        """List kinds and limits to set; hard limits are kept so that FFmpeg receives catchable signal, e.g. SIGXCPU."""
+        limits = (
+            (resource.RLIMIT_AS, self.address_space),
+            (resource.RLIMIT_CPU, self.cpu_time),
+            (resource.RLIMIT_NOFILE, self.open_files),
+            (resource.RLIMIT_FSIZE, self.file_size),
+        )
+        return [(kind, (soft, resource.getrlimit(kind)[1])) for kind, soft in limits if soft is not None]
+
+    def apply(self, pid: int) -> None:
+        """Set soft limits of the process."""
+        for kind, limits in self.list_limits():
+            resource.prlimit(pid, kind, limits)
+
+    def apply_current(self) -> None:  # pragma: no cover
+        """Set soft limits of the current process; called in child process between fork and exec."""
+        for kind, limits in self.list_limits():
+            resource.setrlimit(kind, limits)
+
+
+class SpawnOptions:
+    """Options to spawn FFmpeg process.
+
+    Args:
+        mode: How to spawn FFmpeg process. Ignored on Windows.
+        limits: Resource limits of FFmpeg process. Ignored on Windows.
+    """
+
+    def __init__(self, *, mode: SpawnMode = SpawnMode.FORK_EXEC, limits: ResourceLimits | None = None) -> None:
+        self.mode = mode
+        self.limits = limits
+
+    def create_popen(self, arguments: Sequence[str], stdin: Stdin = PIPE) -> Popen[bytes]:
+        """Spawn FFmpeg process.
+
+        Args:
+            arguments: Arguments of FFmpeg including executable at first.
+            stdin: Stdin of FFmpeg process.
+        """
+        if self.limits is not None and not hasattr(resource, "prlimit"):  # pragma: no cover
+            # Reason: Same as below. pylint: disable=consider-using-with
+            return Popen(  # noqa: S603  # nosec
+                arguments,
+                stdin=stdin,
+                stdout=PIPE,
+                stderr=PIPE,
+                preexec_fn=self.limits.apply_current,  # noqa: PLW1509
+            )
+        popen = self.spawn(arguments, stdin)
+        if self.limits is not None:
+            # FFmpeg which already finished doesn't need limits, and its result is reported as usual.
+            with suppress(ProcessLookupError):
+                self.limits.apply(popen.pid)
+        return popen
+
+    def spawn(self, arguments: Sequence[str], stdin: Stdin) -> Popen[bytes]:
+        if self.mode is SpawnMode.POSIX_SPAWN:
+            # Reason:
+            #   consider-using-with: This method is instead of ffmpeg.run_async(). pylint: disable=consider-using-with
+            #   S603: Arguments are compiled by ffmpeg-python.
+            return Popen(  # noqa: S603  # nosec
+                [resolve_executable(arguments[0]), *arguments[1:]],
+                stdin=stdin,
+                stdout=PIPE,
+                stderr=PIPE,
+                close_fds=False,
+            )
+        # Reason: Same as above. pylint: disable=consider-using-with
+        return Popen(arguments, stdin=stdin, stdout=PIPE, stderr=PIPE)  # noqa: S603  # nosec
+
+
+@cache
+def resolve_executable(executable: str) -> str:
+    """Resolve absolute path of executable since subprocess uses posix_spawn() only for path including directory."""
+    path = shutil.which(executable)
+    if path is None:
+        msg = f"Executable not found: {executable}"
+        raise FileNotFoundError(msg)
+    return path
@@ -0,0 +1,68 @@
+"""Logger of FFmpeg stderr line by line."""
+
+from __future__ import annotations
+
+import time
+from logging import INFO
+from logging import LoggerAdapter
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logging import Logger
+
+__all__ = ["StderrLogger"]
+
+SECOND_INTERVAL_PROGRESS = 5.0
+PREFIXES_PROGRESS = ("frame=", "size=")
+
+
+class StderrLogger:
+    """Logs each line of FFmpeg stderr as its own record while FFmpeg runs.
+
+    Records are small, so they are cheap to pickle into QueueHandler of worker processes. Records are scoped by pid of
+    FFmpeg in `extra` so that handlers can tell jobs apart. Progress lines, which FFmpeg repeats twice a second, are
+    sampled once per interval and the last one is logged at the end since it's the final summary.
+
+    Args:
+        pid: Process ID of FFmpeg, set into `ffmpeg_pid` attribute of each record.
+        level: Level of records.
+        second_interval_progress: Minimum interval (second) between progress lines to log.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        *,
+        level: int = INFO,
+        second_interval_progress: float = SECOND_INTERVAL_PROGRESS,
+    ) -> None:
+        self.logger: LoggerAdapter[Logger] = LoggerAdapter(getLogger(__name__), {"ffmpeg_pid": pid})
+        self.level = level
+        self.second_interval_progress = second_interval_progress
+        self.time_logged_progress = -second_interval_progress
+        self.progress_skipped: str | None = None
+
+    def feed(self, line: str) -> None:
+        # Filters by level before any other work since this is called for each line.
+        if not self.logger.isEnabledFor(self.level):
+            return
+        if line.startswith(PREFIXES_PROGRESS):
+            self.feed_progress(line)
+            return
+        self.logger.log(self.level, "%s", line)
+
+    def feed_progress(self, line: str) -> None:
+        now = time.monotonic()
+        if now - self.time_logged_progress < self.second_interval_progress:
+            self.progress_skipped = line
+            return
+        self.time_logged_progress = now
+        self.progress_skipped = None
+        self.logger.log(self.level, "%s", line)
+
+    def finish(self) -> None:
+        """Log the last progress line which was skipped."""
+        if self.progress_skipped is not None:
+            self.logger.log(self.level, "%s", self.progress_skipped)
+            self.progress_skipped = None
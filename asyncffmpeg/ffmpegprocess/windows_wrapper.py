@@ -40,8 +40,6 @@ from subprocess import PIPE  # nosec
 from subprocess import Popen  # nosec
 from subprocess import TimeoutExpired  # nosec
 
-import ffmpeg
-
 from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
 
 
@@ -53,7 +51,7 @@ class FFmpegProcessWindowsWrapper(FFmpegProcess):
             sys.executable,
             str(Path(__file__).resolve().parent / "windows.py"),
             str(self.time_to_force_termination),
-            *ffmpeg.get_args(self.stream_spec),
+            *self.compile()[1:],
         ]
         self.logger.debug(argument)
         # Reason:
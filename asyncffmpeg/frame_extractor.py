@@ -0,0 +1,222 @@
+"""Batch extraction of frames in a single FFmpeg invocation."""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import struct
+import uuid
+from abc import abstractmethod
+from enum import Enum
+from typing import TYPE_CHECKING
+
+import ffmpeg
+
+from asyncffmpeg.broadcaster import StdoutBroadcaster
+from asyncffmpeg.ffmpeg_coroutine import TIME_TO_FORCE_TERMINATION
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+from asyncffmpeg.job import FFmpegJob
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
+
+__all__ = [
+    "FrameExtractor",
+    "IntervalSelection",
+    "SceneChangeSelection",
+    "SeekStrategy",
+    "TimestampSelection",
+]
+
+# Frames closer than typical GOP are cheaper to decode through than to seek one by one.
+SECOND_MEAN_GAP_SINGLE_PASS = 5.0
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_CHUNK_TYPE_END = b"IEND"
+SIZE_PNG_CHUNK_HEADER = 8
+SIZE_PNG_CHUNK_CRC = 4
+# Each call has its own prefix so that it doesn't overwrite frames saved by other calls into the same directory.
+FILE_NAME_PATTERN = "frame_{prefix}_%06d.png"
+# Selected frames are output as they are, otherwise frames which are close to each other are dropped.
+VSYNC = "passthrough"
+
+
+class SeekStrategy(Enum):
+    """How to reach frames at timestamps."""
+
+    # Chooses by density of timestamps.
+    AUTO = "auto"
+    # Decodes through the range once and selects frames by select filter.
+    SINGLE_PASS = "single_pass"  # noqa: S105
+    # Seeks each timestamp by input option and concatenates the first frames.
+    MULTI_SEEK = "multi_seek"
+
+
+class FrameSelection:
+    """Which frames to extract."""
+
+    @abstractmethod
+    def create_stream(self, path_file_input: Path | str) -> ffmpeg.nodes.FilterableStream:
+        """Create video stream of selected frames."""
+        raise NotImplementedError  # pragma: no cover
+
+
+class TimestampSelection(FrameSelection):
+    """Frames at or right after timestamps (second).
+
+    Args:
+        timestamps: Timestamps in second. Duplicates are merged and results are ordered by timestamp.
+        strategy: How to reach frames at timestamps.
+        second_mean_gap_single_pass: Threshold of mean gap between timestamps to choose single pass in AUTO strategy.
+    """
+
+    def __init__(
+        self,
+        timestamps: Iterable[float],
+        *,
+        strategy: SeekStrategy = SeekStrategy.AUTO,
+        second_mean_gap_single_pass: float = SECOND_MEAN_GAP_SINGLE_PASS,
+    ) -> None:
+        self.timestamps = sorted(set(timestamps))
+        if not self.timestamps:
+            msg = "Timestamps are required"
+            raise ValueError(msg)
+        self.strategy = strategy
+        self.second_mean_gap_single_pass = second_mean_gap_single_pass
+
+    def choose_strategy(self) -> SeekStrategy:
+        if self.strategy is not SeekStrategy.AUTO:
+            return self.strategy
+        if len(self.timestamps) == 1:
+            return SeekStrategy.MULTI_SEEK
+        gaps = [later - earlier for earlier, later in zip(self.timestamps, self.timestamps[1:])]
+        is_dense = statistics.mean(gaps) <= self.second_mean_gap_single_pass
+        return SeekStrategy.SINGLE_PASS if is_dense else SeekStrategy.MULTI_SEEK
+
+    def create_stream(self, path_file_input: Path | str) -> ffmpeg.nodes.FilterableStream:
+        if self.choose_strategy() is SeekStrategy.SINGLE_PASS:
+            return self.create_stream_single_pass(path_file_input)
+        return self.create_stream_multi_seek(path_file_input)
+
+    def create_stream_single_pass(self, path_file_input: Path | str) -> ffmpeg.nodes.FilterableStream:
+        start = self.timestamps[0]
+        # Input seek resets timestamps so that they start from 0.
+        expression = "+".join(
+            f"gte(t,{timestamp - start})*not(gte(prev_t,{timestamp - start}))" for timestamp in self.timestamps
+        )
+        stream = ffmpeg.input(str(path_file_input), ss=start, t=self.timestamps[-1] - start + 1).video
+        return stream.filter("select", expression)
+
+    def create_stream_multi_seek(self, path_file_input: Path | str) -> ffmpeg.nodes.FilterableStream:
+        streams = (
+            ffmpeg.input(str(path_file_input), ss=timestamp).video.filter("trim", end_frame=1)
+            for timestamp in self.timestamps
+        )
+        return ffmpeg.concat(*streams, v=1, a=0)
+
+
+class IntervalSelection(FrameSelection):
+    """A frame per interval (second)."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+
+    def create_stream(self, path_file_input: Path | str) -> ffmpeg.nodes.FilterableStream:
+        return ffmpeg.input(str(path_file_input)).video.filter("fps", fps=f"1/{self.interval}")
+
+
+class SceneChangeSelection(FrameSelection):
+    """Frames whose scene change score is greater than threshold (0.0 - 1.0)."""
+
+    def __init__(self, threshold: float = 0.4) -> None:
+        self.threshold = threshold
+
+    def create_stream(self, path_file_input: Path | str) -> ffmpeg.nodes.FilterableStream:
+        return ffmpeg.input(str(path_file_input)).video.filter("select", f"gt(scene,{self.threshold})")
+
+
+class PngSplitter:
+    """Splits concatenated PNG images written by image2pipe muxer."""
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.images: list[bytes] = []
+
+    def feed(self, chunk: bytes) -> None:
+        self.buffer += chunk
+        while (end := self.find_end()) is not None:
+            self.images.append(bytes(self.buffer[:end]))
+            del self.buffer[:end]
+
+    def find_end(self) -> int | None:
+        """Return the end of the first image in buffer, or None when it is incomplete."""
+        position = len(PNG_SIGNATURE)
+        while position + SIZE_PNG_CHUNK_HEADER <= len(self.buffer):
+            length, chunk_type = struct.unpack_from(">I4s", self.buffer, position)
+            position += SIZE_PNG_CHUNK_HEADER + length + SIZE_PNG_CHUNK_CRC
+            if chunk_type == PNG_CHUNK_TYPE_END:
+                return position if position <= len(self.buffer) else None
+        return None
+
+
+class FrameExtractor:
+    """Extracts multiple frames from an input in a single FFmpeg invocation.
+
+    Since process startup, probing and seeking are paid once, this is much faster than extracting frames one by one.
+    """
+
+    def __init__(
+        self,
+        path_file_input: Path | str,
+        selection: FrameSelection,
+        *,
+        time_to_force_termination: int = TIME_TO_FORCE_TERMINATION,
+    ) -> None:
+        self.path_file_input = path_file_input
+        self.selection = selection
+        self.time_to_force_termination = time_to_force_termination
+
+    async def save(self, directory: Path) -> list[Path]:
+        """Save frames as PNG files into the directory; return paths which FFmpeg wrote ordered by frame."""
+        prefix = uuid.uuid4().hex[:8]
+        stream = self.selection.create_stream(self.path_file_input)
+        path_pattern = directory / FILE_NAME_PATTERN.format(prefix=prefix)
+        stream_spec = ffmpeg.output(stream, str(path_pattern), vsync=VSYNC)
+
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(time_to_force_termination=self.time_to_force_termination)
+        await ffmpeg_coroutine.execute_job(FFmpegJob.from_stream_spec(stream_spec))
+        return sorted(await asyncio.to_thread(list_frames, directory, prefix))
+
+    async def read(self) -> list[bytes]:
+        """Read frames as PNG images in memory ordered by frame."""
+        stream = self.selection.create_stream(self.path_file_input)
+        stream_spec = ffmpeg.output(stream, "pipe:", format="image2pipe", vcodec="png", vsync=VSYNC)
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(
+            time_to_force_termination=self.time_to_force_termination,
+            pipe_stdout=True,
+        )
+        job = FFmpegJob.from_stream_spec(stream_spec)
+        _result, images = await ffmpeg_coroutine.execute_job_reading_stdout(job, split)
+        return images
+
+
+async def split(ffmpeg_process: FFmpegProcess) -> list[bytes]:
+    """Split stdout of FFmpeg into PNG images."""
+    broadcaster = StdoutBroadcaster(ffmpeg_process)
+    subscriber = broadcaster.subscribe()
+    png_splitter = PngSplitter()
+
+    task = asyncio.ensure_future(broadcaster.run())
+    try:
+        async for chunk in subscriber:
+            png_splitter.feed(chunk)
+        await task
+    finally:
+        task.cancel()
+    return png_splitter.images
+
+
+def list_frames(directory: Path, prefix: str) -> list[Path]:
+    return list(directory.glob(FILE_NAME_PATTERN.format(prefix=prefix).replace("%06d", "*")))
@@ -0,0 +1,365 @@
+"""Named pipes (FIFO), Unix domain sockets and staged files as inputs / outputs of FFmpeg."""
+
+from __future__ import annotations
+
+import asyncio
+import errno
+import os
+import shutil
+import tempfile
+import uuid
+from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import cache
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Callable
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Awaitable
+    from collections.abc import Sequence
+
+    from asyncffmpeg.result import FFmpegResult
+
+__all__ = ["FifoInput", "FifoOutput", "IOChannel", "StagedOutput", "UnixSocketInput", "UnixSocketOutput"]
+
+SIZE_CHUNK = 64 * 1024
+SIZE_COPY = 1024 * 1024
+# Default maximum number of staged outputs transferred to destination at the same time in a process.
+MAX_TRANSFERS = 2
+# FFmpeg opens inputs one by one, so the FIFO of input may not be opened for a while.
+SECOND_POLL_OPEN = 0.01
+# FFmpeg may close input before reading all of it, e.g. when output option `t` has been reached.
+ERRORS_INPUT_CLOSED = (BrokenPipeError, ConnectionResetError)
+Source = Callable[[], "AsyncIterator[bytes]"]
+Sink = Callable[[bytes], "Awaitable[None]"]
+
+
+class IOChannel:
+    """Path which FFmpeg reads from or writes into while this package feeds or drains it asynchronously.
+
+    The path is decided on instantiation so that stream spec can refer `url` even after the channel is pickled into
+    worker process. The path is created by FFmpegCoroutine before FFmpeg starts and removed after FFmpeg finishes
+    including the case of cancellation and error.
+    """
+
+    NAME = "channel"
+    # Errors of run() which mean the normal end when FFmpeg succeeded.
+    ERRORS_END: tuple[type[Exception], ...] = ()
+
+    def __init__(self) -> None:
+        self.directory = Path(tempfile.gettempdir()) / f"asyncffmpeg-{uuid.uuid4().hex}"
+        self.path = self.directory / self.NAME
+        self.logger = getLogger(__name__)
+
+    @property
+    def url(self) -> str:
+        """URL to be set into stream spec as filename of input or output."""
+        return str(self.path)
+
+    async def open(self) -> None:
+        self.directory.mkdir(mode=0o700)
+        await self.create()
+
+    @abstractmethod
+    async def create(self) -> None:
+        """Create the path before FFmpeg starts."""
+        raise NotImplementedError  # pragma: no cover
+
+    @abstractmethod
+    async def run(self) -> None:
+        """Feed or drain the path while FFmpeg runs."""
+        raise NotImplementedError  # pragma: no cover
+
+    async def commit(self) -> None:
+        """Complete the channel after FFmpeg succeeded."""
+
+    def close(self) -> None:
+        """Release resources and remove the path."""
+        self.dispose()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def dispose(self) -> None:
+        """Release resources other than the path."""
+
+
+class Fifo(IOChannel):
+    """Named pipe."""
+
+    NAME = "fifo"
+
+    async def create(self) -> None:
+        os.mkfifo(self.path, 0o600)
+
+
+class FifoInput(Fifo):
+    """Named pipe which FFmpeg reads from.
+
+    FFmpeg may stop reading before the source is exhausted, which isn't an error when FFmpeg succeeds.
+
+    Args:
+        source: Async generator function which yields bytes to be fed.
+    """
+
+    ERRORS_END = ERRORS_INPUT_CLOSED
+
+    def __init__(self, source: Source) -> None:
+        super().__init__()
+        self.source = source
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        # The file object is closed by the transport.
+        pipe = os.fdopen(await self.open_writer(), "wb", buffering=0)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, pipe)
+        writer = asyncio.StreamWriter(transport, protocol, None, loop)
+        try:
+            async for chunk in self.source():
+                writer.write(chunk)
+                await writer.drain()
+        finally:
+            # FFmpeg detects the end of input by EOF.
+            transport.close()
+
+    async def open_writer(self) -> int:
+        """Open FIFO without blocking thread until FFmpeg opens it for reading."""
+        while True:
+            try:
+                return os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as error:
+                if error.errno != errno.ENXIO:
+                    raise
+            await asyncio.sleep(SECOND_POLL_OPEN)
+
+
+class FifoOutput(Fifo):
+    """Named pipe which FFmpeg writes into.
+
+    Since the named pipe already exists when FFmpeg starts, stream spec requires `overwrite_output()`. Draining relies
+    on Linux, where the event loop doesn't report the named pipe which no writer has opened yet as hung up. On other
+    platforms, draining may end before FFmpeg opens the named pipe.
+
+    Args:
+        sink: Coroutine function which receives drained bytes.
+    """
+
+    def __init__(self, sink: Sink) -> None:
+        super().__init__()
+        self.sink = sink
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        # The file object is closed by the transport.
+        pipe = os.fdopen(os.open(self.path, os.O_RDONLY | os.O_NONBLOCK), "rb", buffering=0)
+        transport, _protocol = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+        try:
+            while chunk := await reader.read(SIZE_CHUNK):
+                await self.sink(chunk)
+        finally:
+            transport.close()
+
+
+class UnixSocket(IOChannel):
+    """Unix domain socket which serves the first connection from FFmpeg."""
+
+    NAME = "socket"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.server: asyncio.AbstractServer | None = None
+        self.finished: asyncio.Future[None] | None = None
+
+    @property
+    def url(self) -> str:
+        return f"unix:{self.path}"
+
+    async def create(self) -> None:
+        self.finished = asyncio.get_running_loop().create_future()
+        self.server = await asyncio.start_unix_server(self.handle, path=str(self.path))
+
+    async def run(self) -> None:
+        # Reason: Created in create().
+        await self.finished  # type: ignore[misc]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Reason: Created in create().
+        finished: asyncio.Future[None] = self.finished  # type: ignore[assignment]
+        if finished.done():
+            writer.close()
+            return
+        try:
+            await self.communicate(reader, writer)
+        except Exception as error:  # noqa: BLE001
+            finished.set_exception(error)
+        else:
+            finished.set_result(None)
+        finally:
+            writer.close()
+
+    @abstractmethod
+    async def communicate(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        raise NotImplementedError  # pragma: no cover
+
+    def dispose(self) -> None:
+        if self.server is not None:
+            self.server.close()
+        if self.finished is not None and not self.finished.done():
+            self.finished.cancel()
+
+
+class UnixSocketInput(UnixSocket):
+    """Unix domain socket which FFmpeg reads from.
+
+    FFmpeg may stop reading before the source is exhausted, which isn't an error when FFmpeg succeeds.
+
+    Args:
+        source: Async generator function which yields bytes to be fed.
+    """
+
+    ERRORS_END = ERRORS_INPUT_CLOSED
+
+    def __init__(self, source: Source) -> None:
+        super().__init__()
+        self.source = source
+
+    async def communicate(self, _reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async for chunk in self.source():
+            writer.write(chunk)
+            await writer.drain()
+
+
+class UnixSocketOutput(UnixSocket):
+    """Unix domain socket which FFmpeg writes into.
+
+    Args:
+        sink: Coroutine function which receives drained bytes.
+    """
+
+    def __init__(self, sink: Sink) -> None:
+        super().__init__()
+        self.sink = sink
+
+    async def communicate(self, reader: asyncio.StreamReader, _writer: asyncio.StreamWriter) -> None:
+        while chunk := await reader.read(SIZE_CHUNK):
+            await self.sink(chunk)
+
+
+class StagedOutput(IOChannel):
+    """Output file which FFmpeg writes into scratch directory and which is moved to destination after FFmpeg succeeds.
+
+    Writing into fast local storage, e.g. tmpfs or NVMe, doesn't throttle encoder by slow network storage, and the
+    destination never has truncated file since it's replaced atomically. When FFmpeg fails or is cancelled, the
+    partial output is removed. Since FFmpeg doesn't see the destination, it's replaced even if it exists.
+
+    Args:
+        destination: Path of the output file.
+        directory_scratch: Directory to write into. When None, the temporary directory of the system.
+        max_transfers: Maximum number of staged outputs transferred at the same time in the process. Outputs which have
+            the same maximum share the limit, e.g. lower it for slow network storage.
+    """
+
+    def __init__(
+        self,
+        destination: Path | str,
+        *,
+        directory_scratch: Path | str | None = None,
+        max_transfers: int = MAX_TRANSFERS,
+    ) -> None:
+        super().__init__()
+        self.destination = Path(destination)
+        self.max_transfers = max_transfers
+        if directory_scratch is not None:
+            self.directory = Path(directory_scratch) / self.directory.name
+        # Keeps the name so that FFmpeg can guess the format by its extension.
+        self.path = self.directory / self.destination.name
+
+    async def create(self) -> None:
+        """FFmpeg creates the file."""
+
+    async def run(self) -> None:
+        """FFmpeg writes into the file directly."""
+
+    async def commit(self) -> None:
+        # Transfers run in the dedicated threads so that they don't saturate the destination storage.
+        await asyncio.get_running_loop().run_in_executor(
+            get_executor(self.max_transfers),
+            transfer,
+            self.path,
+            self.destination,
+        )
+
+
+@cache
+def get_executor(max_transfers: int) -> ThreadPoolExecutor:
+    """Executor shared by staged outputs which have the same maximum number of transfers in the process.
+
+    Created per maximum instead of being held by each output, so that outputs can be pickled into worker processes.
+    """
+    return ThreadPoolExecutor(max_transfers, thread_name_prefix="asyncffmpeg-transfer")
+
+
+def transfer(source: Path, destination: Path) -> None:
+    """Move source into destination atomically; copy via temporary file in the same directory across file systems."""
+    try:
+        source.replace(destination)
+    except OSError as error:
+        if error.errno != errno.EXDEV:
+            raise
+    else:
+        return
+    path_partial = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.partial")
+    try:
+        with source.open("rb") as file_source, path_partial.open("wb") as file_partial:
+            shutil.copyfileobj(file_source, file_partial, SIZE_COPY)
+            file_partial.flush()
+            os.fsync(file_partial.fileno())
+        path_partial.replace(destination)
+    except BaseException:
+        path_partial.unlink(missing_ok=True)
+        raise
+
+
+class IOChannels:
+    """Manages lifecycle of IO channels along with FFmpeg process."""
+
+    def __init__(self, io_channels: Sequence[IOChannel]) -> None:
+        self.io_channels = io_channels
+        self.tasks: list[asyncio.Future[None]] = []
+
+    async def open(self) -> None:
+        for io_channel in self.io_channels:
+            await io_channel.open()
+
+    def start(self) -> None:
+        self.tasks = [asyncio.ensure_future(io_channel.run()) for io_channel in self.io_channels]
+
+    async def join(self, result_ffmpeg: FFmpegResult) -> None:
+        """Wait for feeding / draining after FFmpeg finished.
+
+        Errors which mean the normal end, e.g. FFmpeg closed input before the end, are ignored only when FFmpeg exited
+        successfully, since otherwise they may be caused by FFmpeg which died early.
+        """
+        results = await asyncio.gather(*self.tasks, return_exceptions=True)
+        for io_channel, result in zip(self.io_channels, results):
+            if isinstance(result, io_channel.ERRORS_END) and result_ffmpeg.return_code == 0:
+                io_channel.logger.debug("FFmpeg closed %s before the end: %r", io_channel.url, result)
+            elif isinstance(result, BaseException):
+                raise result
+
+    async def commit(self) -> None:
+        await asyncio.gather(*(io_channel.commit() for io_channel in self.io_channels))
+
+    def close(self) -> None:
+        """Cancel feeding / draining and remove paths.
+
+        This method doesn't require running event loop so that it can be called in any error path.
+        """
+        for task in self.tasks:
+            task.cancel()
+        for io_channel in self.io_channels:
+            with suppress(Exception):
+                io_channel.close()
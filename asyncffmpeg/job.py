@@ -0,0 +1,53 @@
+"""Serializable descriptor of FFmpeg job."""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+from pathlib import PurePath
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from asyncffmpeg.type_alias import StreamSpec
+
+__all__ = ["FFmpegJob"]
+
+NAME_EXECUTABLE = "ffmpeg"
+
+
+@dataclasses.dataclass(frozen=True)
+class FFmpegJob:
+    """FFmpeg job as precompiled arguments.
+
+    Unlike coroutine function to create stream spec, this is small to pickle into worker processes and can be
+    serialized into JSON, so that producers other than Python can submit jobs.
+
+    Args:
+        arguments: Arguments of FFmpeg including executable at first. The name of executable has to be `ffmpeg`.
+    """
+
+    arguments: tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        if not self.arguments or PurePath(self.arguments[0]).stem != NAME_EXECUTABLE:
+            msg = f"Arguments have to start with FFmpeg executable: {self.arguments!r}"
+            raise ValueError(msg)
+
+    @classmethod
+    def from_stream_spec(cls, stream_spec: StreamSpec, *, executable: str = NAME_EXECUTABLE) -> FFmpegJob:
+        # Reason: ffmpeg-python takes much time to import and jobs loaded from JSON don't use it.
+        import ffmpeg  # noqa: PLC0415  # pylint: disable=import-outside-toplevel
+
+        return cls(tuple(ffmpeg.compile(stream_spec, cmd=executable)))
+
+    @classmethod
+    def from_json(cls, text: str) -> FFmpegJob:
+        data = json.loads(text)
+        arguments = data.get("arguments") if isinstance(data, dict) else None
+        if not isinstance(arguments, list) or not all(isinstance(argument, str) for argument in arguments):
+            msg = f"Job has to be object with list of string as arguments: {text}"
+            raise ValueError(msg)
+        return cls(tuple(arguments))
+
+    def to_json(self) -> str:
+        return json.dumps({"arguments": list(self.arguments)})
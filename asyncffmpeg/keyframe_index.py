@@ -0,0 +1,158 @@
+"""Persistent index of keyframes to resolve seek points without probing inputs again."""
+
+from __future__ import annotations
+
+import asyncio
+import mmap
+import struct
+import uuid
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+from fractions import Fraction
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+import ffmpeg
+
+from asyncffmpeg.ffmpeg_coroutine import TIME_TO_FORCE_TERMINATION
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+from asyncffmpeg.job import FFmpegJob
+from asyncffmpeg.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+__all__ = ["KeyframeIndex", "KeyframeIndexer"]
+
+# Native byte order since the index is a cache on local host.
+HEADER = struct.Struct("=8sQQ")
+MAGIC = b"AFKIDX1\0"
+SUFFIX_INDEX = ".kfidx"
+# Flag of keyframe in AVPacket, framecrc prints flags only when they differ from this.
+AV_PKT_FLAG_KEY = 0x1
+AV_NOPTS_VALUE = -(2**63)
+
+
+class KeyframeIndex:
+    """Presentation timestamps (second) of keyframes and of all packets of the first video stream, both sorted.
+
+    Timestamps are on the same timeline as `-ss` option, that is, the first frame is around 0.
+
+    Args:
+        keyframes: Sorted presentation timestamps of keyframes.
+        timestamps: Sorted presentation timestamps of all packets.
+    """
+
+    def __init__(self, keyframes: Sequence[float], timestamps: Sequence[float]) -> None:
+        self.keyframes = keyframes
+        self.timestamps = timestamps
+
+    def keyframe_before(self, second: float) -> float:
+        """Return the last keyframe at or before the second, or the first keyframe if there is no such keyframe."""
+        return self.keyframes[max(bisect_right(self.keyframes, second) - 1, 0)]
+
+    def keyframe_after(self, second: float) -> float | None:
+        """Return the first keyframe at or after the second, or None if there is no such keyframe."""
+        index = bisect_left(self.keyframes, second)
+        return self.keyframes[index] if index < len(self.keyframes) else None
+
+    def frame_at(self, second: float) -> float:
+        """Return timestamp of the frame displayed at the second, e.g. to snap cut points onto frame boundaries."""
+        return self.timestamps[max(bisect_right(self.timestamps, second) - 1, 0)]
+
+    def save(self, path: Path) -> None:
+        """Save atomically so that concurrent readers never see a partial index."""
+        path_partial = path.with_name(f".{path.name}.{uuid.uuid4().hex}.partial")
+        with path_partial.open("wb") as file:
+            file.write(HEADER.pack(MAGIC, len(self.keyframes), len(self.timestamps)))
+            array("d", self.keyframes).tofile(file)
+            array("d", self.timestamps).tofile(file)
+        path_partial.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> KeyframeIndex:
+        """Load by memory map, so that indexes of long inputs are paged in only where they are searched."""
+        with path.open("rb") as file:
+            # Reason: The map is kept open after the file is closed.
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, number_of_keyframes, number_of_timestamps = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            msg = f"Not a keyframe index: {path}"
+            raise ValueError(msg)
+        view = memoryview(buffer)[HEADER.size :].cast("d")
+        return cls(view[:number_of_keyframes], view[number_of_keyframes : number_of_keyframes + number_of_timestamps])
+
+
+class KeyframeIndexer:
+    """Builds keyframe index of an input once and caches it in the directory keyed by identity of the file.
+
+    The index is built from packets which FFmpeg copies into framecrc format without decoding. The identity consists of
+    device, inode, size and modification time, so that the index is rebuilt when the file is replaced or modified.
+    Concurrent requests for the same input share a single FFmpeg invocation, which is quitted when all of them are
+    cancelled.
+
+    Args:
+        directory_cache: Directory to store indexes.
+        time_to_force_termination: Time to force termination of FFmpeg which builds index.
+    """
+
+    def __init__(self, directory_cache: Path, *, time_to_force_termination: int = TIME_TO_FORCE_TERMINATION) -> None:
+        self.directory_cache = directory_cache
+        self.time_to_force_termination = time_to_force_termination
+        self.builds: SingleFlight[str, KeyframeIndex] = SingleFlight()
+        self.logger = getLogger(__name__)
+
+    async def index(self, path: Path) -> KeyframeIndex:
+        """Return index of the input; build it only when it's not cached yet."""
+        key = await asyncio.to_thread(identify, path)
+        path_index = self.directory_cache / f"{key}{SUFFIX_INDEX}"
+        return await self.builds.share(key, lambda: self.load_or_build(path, path_index))
+
+    async def load_or_build(self, path: Path, path_index: Path) -> KeyframeIndex:
+        if await asyncio.to_thread(path_index.exists):
+            return await asyncio.to_thread(KeyframeIndex.load, path_index)
+        self.logger.debug("Build keyframe index: %s", path)
+        await asyncio.to_thread(self.directory_cache.mkdir, parents=True, exist_ok=True)
+        path_packets = path_index.with_name(f".{path_index.stem}.{uuid.uuid4().hex}.framecrc")
+        stream_spec = ffmpeg.input(str(path)).output(str(path_packets), map="0:v:0", c="copy", f="framecrc")
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(time_to_force_termination=self.time_to_force_termination)
+        try:
+            await ffmpeg_coroutine.execute_job(FFmpegJob.from_stream_spec(stream_spec))
+            index = await asyncio.to_thread(parse_framecrc, path_packets)
+        finally:
+            path_packets.unlink(missing_ok=True)
+        await asyncio.to_thread(index.save, path_index)
+        return index
+
+
+def identify(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_dev:x}-{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def parse_framecrc(path: Path) -> KeyframeIndex:
+    """Parse packets of the single stream in framecrc format: stream, dts, pts, duration, size, crc[, F=flags]."""
+    time_base = Fraction(1)
+    keyframes = array("d")
+    timestamps = array("d")
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("#tb "):
+                time_base = Fraction(line.split(":", 1)[1].strip())
+            elif not line.startswith("#"):
+                parse_packet(line, time_base, keyframes, timestamps)
+    return KeyframeIndex(array("d", sorted(keyframes)), array("d", sorted(timestamps)))
+
+
+def parse_packet(line: str, time_base: Fraction, keyframes: array[float], timestamps: array[float]) -> None:
+    fields = [field.strip() for field in line.split(",")]
+    pts = int(fields[2])
+    if pts == AV_NOPTS_VALUE:
+        return
+    second = float(pts * time_base)
+    timestamps.append(second)
+    flags = next((int(field[2:], 0) for field in fields[6:] if field.startswith("F=")), AV_PKT_FLAG_KEY)
+    if flags & AV_PKT_FLAG_KEY:
+        keyframes.append(second)
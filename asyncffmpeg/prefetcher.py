@@ -0,0 +1,208 @@
+"""Read-ahead of inputs of upcoming FFmpeg jobs into page cache."""
+
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import dataclasses
+import mmap
+import os
+import sys
+from contextlib import contextmanager
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from typing import BinaryIO
+
+    from asyncffmpeg.ffmpeg_coroutine import FFmpegCoroutine
+    from asyncffmpeg.job import FFmpegJob
+    from asyncffmpeg.result import FFmpegResult
+
+__all__ = ["InputPrefetcher", "PrefetchStatistics"]
+
+BUDGET = 1024 * 1024 * 1024
+SIZE_READ = 1024 * 1024
+MAP_FAILED = ctypes.c_void_p(-1).value
+
+
+@dataclasses.dataclass
+class PrefetchStatistics:
+    """Statistics to tune the budget of prefetch.
+
+    Args:
+        hits: Number of prefetched inputs which were entirely in page cache when the job started.
+        misses: Number of prefetched inputs which weren't entirely in page cache when the job started, e.g. since
+            they were evicted or read-ahead didn't complete.
+        skipped: Number of inputs which weren't prefetched since they didn't fit in the budget.
+        bytes_prefetched: Total size (bytes) of inputs prefetched.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    skipped: int = 0
+    bytes_prefetched: int = 0
+
+
+@dataclasses.dataclass
+class Prefetch:
+    """Size of input reserved in the budget and the task to read it ahead."""
+
+    size: int
+    task: asyncio.Future[bool]
+
+
+class InputPrefetcher:
+    """Prefetches local input files of upcoming jobs into page cache while the current job runs.
+
+    Then FFmpeg of the upcoming job starts reading from page cache instead of cold disk or network storage. The files
+    are advised by `posix_fadvise(POSIX_FADV_WILLNEED)`, or read through where it isn't available. Files which are
+    prefetched but not started yet are kept within the budget so that they don't evict each other. Since the advice
+    returns before the kernel reads the file, hits are counted by `mincore()` when the job starts, or by completion of
+    reading through on Windows.
+
+    Args:
+        budget: Maximum total size (bytes) of inputs prefetched but not started yet.
+    """
+
+    def __init__(self, *, budget: int = BUDGET) -> None:
+        self.budget = budget
+        self.prefetches: dict[Path, Prefetch] = {}
+        self.reservations: dict[FFmpegJob, list[Path]] = {}
+        self.statistics = PrefetchStatistics()
+        self.logger = getLogger(__name__)
+
+    @property
+    def bytes_in_budget(self) -> int:
+        return sum(prefetch.size for prefetch in self.prefetches.values())
+
+    async def prefetch(self, job: FFmpegJob) -> None:
+        """Start prefetching inputs of the job which will start later; return without waiting for the prefetch.
+
+        Call `execute_job()` or `discard()` of the job later, otherwise its inputs are kept in the budget.
+        """
+        paths = self.reservations.setdefault(job, [])
+        for path, size in await asyncio.to_thread(list_local_inputs, job):
+            if path in self.prefetches:
+                continue
+            if self.bytes_in_budget + size > self.budget:
+                self.logger.debug("Skip prefetch since budget is full: %s", path)
+                self.statistics.skipped += 1
+                continue
+            self.prefetches[path] = Prefetch(size, asyncio.ensure_future(self.read_ahead(path)))
+            self.statistics.bytes_prefetched += size
+            paths.append(path)
+
+    async def execute_job(self, job: FFmpegJob, ffmpeg_coroutine: FFmpegCoroutine[Any] | None = None) -> FFmpegResult:
+        """Execute the job; release budget of its inputs and count hits."""
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create() if ffmpeg_coroutine is None else ffmpeg_coroutine
+        await self.consume(job)
+        return await ffmpeg_coroutine.execute_job(job)
+
+    def discard(self, job: FFmpegJob) -> None:
+        """Release budget of inputs of the job which won't start, and stop prefetching them."""
+        for _path, prefetch in self.release(job):
+            prefetch.task.cancel()
+
+    async def consume(self, job: FFmpegJob) -> None:
+        # Released before awaiting anything, so that cancellation doesn't leave inputs in the budget.
+        for path, prefetch in self.release(job):
+            resident = await asyncio.to_thread(is_resident, path)
+            if resident is None:
+                resident = prefetch.task.done() and not prefetch.task.cancelled() and prefetch.task.result()
+            if resident:
+                self.statistics.hits += 1
+            else:
+                self.statistics.misses += 1
+            # FFmpeg reads the rest by itself.
+            prefetch.task.cancel()
+
+    def release(self, job: FFmpegJob) -> list[tuple[Path, Prefetch]]:
+        paths = self.reservations.pop(job, [])
+        return [(path, self.prefetches.pop(path)) for path in paths if path in self.prefetches]
+
+    async def read_ahead(self, path: Path) -> bool:
+        try:
+            await asyncio.to_thread(read_ahead, path)
+        # Reason: Prefetch is only a hint, FFmpeg reports the error if the input is really unreadable.
+        except OSError:
+            self.logger.warning("Failed to prefetch: %s", path, exc_info=True)
+            return False
+        return True
+
+
+def list_local_inputs(job: FFmpegJob) -> list[tuple[Path, int]]:
+    """List regular files given by `-i` option and their sizes; URLs and devices are excluded."""
+    arguments = job.arguments
+    paths = (Path(argument) for option, argument in zip(arguments, arguments[1:]) if option == "-i")
+    return [(path.resolve(), path.stat().st_size) for path in paths if path.is_file()]
+
+
+def read_ahead(path: Path) -> None:
+    with path.open("rb") as file:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            return
+        # Reason: Reading through is the way to fill page cache where advice isn't available, e.g. macOS.
+        while file.read(SIZE_READ):  # pragma: no cover
+            pass
+
+
+def load_libc() -> ctypes.CDLL | None:
+    """Load C library to call `mincore()`, which Windows doesn't have."""
+    if sys.platform == "win32":  # pragma: no cover
+        return None
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_long]
+    libc.mmap.restype = ctypes.c_void_p
+    libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+    libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_char_p]
+    return libc
+
+
+LIBC = load_libc()
+
+
+def is_resident(path: Path) -> bool | None:
+    """Return whether all pages of the file are in page cache, or None when it can't be measured."""
+    if LIBC is None:  # pragma: no cover
+        return None
+    try:
+        # Bit 0 of each byte tells whether the page is resident.
+        return all(byte & 1 for byte in read_residency(LIBC, path))
+    # Reason: The input may have been removed, then FFmpeg reports the error.
+    except OSError:
+        return False
+
+
+def read_residency(libc: ctypes.CDLL, path: Path) -> bytes:
+    """Read residency of each page of the file by `mincore()`."""
+    with path.open("rb") as file, map_file(libc, file) as (address, size):
+        vector = ctypes.create_string_buffer(-(-size // mmap.PAGESIZE))
+        if libc.mincore(address, size, vector) != 0:
+            raise OSError(ctypes.get_errno(), "mincore() failed")
+        return vector.raw
+
+
+@contextmanager
+def map_file(libc: ctypes.CDLL, file: BinaryIO) -> Generator[tuple[int, int], None, None]:
+    """Map the file without reading it; yield its address and size.
+
+    Since `mmap.mmap` can't tell the address, the C library maps it.
+    """
+    size = os.fstat(file.fileno()).st_size
+    if size == 0:
+        yield 0, 0
+        return
+    address = libc.mmap(None, size, mmap.PROT_READ, mmap.MAP_SHARED, file.fileno(), 0)
+    if address == MAP_FAILED:
+        raise OSError(ctypes.get_errno(), "mmap() failed")
+    try:
+        yield address, size
+    finally:
+        libc.munmap(address, size)
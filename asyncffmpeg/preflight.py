@@ -0,0 +1,218 @@
+"""Pre-flight validation of FFmpeg jobs by cheap dry run with cached verdicts."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import re
+import subprocess  # nosec
+from collections import OrderedDict
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from asyncffmpeg.exceptions import FFmpegEncoderNotFoundError
+from asyncffmpeg.exceptions import FFmpegInvalidFilterGraphError
+from asyncffmpeg.exceptions import FFmpegInvalidOptionError
+from asyncffmpeg.exceptions import FFmpegProcessError
+from asyncffmpeg.ffmpeg_coroutine import TIME_TO_FORCE_TERMINATION
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+from asyncffmpeg.ffmpegprocess.classifier import ErrorClassifier
+from asyncffmpeg.job import FFmpegJob
+from asyncffmpeg.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from collections.abc import Mapping
+    from collections.abc import Sequence
+
+    from asyncffmpeg.type_alias import StreamSpec
+
+__all__ = ["PreflightValidator"]
+
+# Video and audio stream of a few frames, output by pads named as lavfi requires.
+STAND_IN = "testsrc2=size=1920x1080:rate=30:duration=0.1[out0];sine=sample_rate=48000:duration=0.1[out1]"
+MAX_VERDICTS = 1024
+# Errors which stand-in inputs can't cause, unlike e.g. mapping subtitle streams which the stand-in doesn't have.
+ERRORS_REJECTED = (FFmpegEncoderNotFoundError, FFmpegInvalidFilterGraphError, FFmpegInvalidOptionError)
+# Encoder reports parameters which it doesn't support only by this line when it opens, e.g. size of the stand-in which
+# H.263 doesn't support, so that it may be caused by the stand-in rather than the options.
+PATTERN_CAUSED_BY_STAND_IN = re.compile(r"Error while opening encoder")
+# FFmpeg logs how it splits the command line at debug level, and `-version` exits before inputs and outputs are opened.
+ARGUMENTS_SPLIT = ("-hide_banner", "-loglevel", "debug")
+# e.g. "Reading option '-c:v' ... matched as option 'c' (select encoder/decoder) with argument 'libx264'."
+PATTERN_READING_OPTION = re.compile(r"^Reading option '(.*)' \.\.\. ?(matched as )?")
+NULL_OUTPUT = ("-f", "null", "-")
+
+
+class PreflightValidator:
+    """Rejects jobs whose filter graph or options are invalid by dry-running FFmpeg before they wait for a slot.
+
+    Inputs are replaced by a short lavfi stand-in which has a video and an audio stream, input options are dropped and
+    outputs are replaced by the null muxer, so that the dry run takes a fraction of a second regardless of inputs. Which
+    arguments are options, their values or outputs is learned from how FFmpeg splits the command line, and a job which
+    has an option FFmpeg doesn't know, or which FFmpeg doesn't split in time, is passed without dry run. The verdict is cached per arguments of the dry run, that
+    is, the graph and output options without file names, so that repeated submissions of the same template are judged
+    without FFmpeg. Only unknown encoder, invalid filter graph and invalid option reject the job. Other failures of the
+    dry run, and encoders which fail to open without telling the reason, e.g. H.263 which doesn't support the size of
+    the stand-in, are inconclusive, pass the job and aren't cached.
+
+    Args:
+        stand_in: Graph of lavfi whose outputs `[out0]` and `[out1]` stand in for streams of each input. Make it
+            resemble actual inputs, e.g. a crop larger than the stand-in fails as invalid filter graph.
+        max_verdicts: Maximum number of verdicts cached, the least recently used one is evicted.
+        time_to_force_termination: Time to force termination of FFmpeg of dry run.
+    """
+
+    def __init__(
+        self,
+        *,
+        stand_in: str = STAND_IN,
+        max_verdicts: int = MAX_VERDICTS,
+        time_to_force_termination: int = TIME_TO_FORCE_TERMINATION,
+    ) -> None:
+        self.stand_in = stand_in
+        self.max_verdicts = max_verdicts
+        self.time_to_force_termination = time_to_force_termination
+        self.verdicts: OrderedDict[tuple[str, ...], FFmpegProcessError | None] = OrderedDict()
+        self.dry_runs: SingleFlight[tuple[str, ...], FFmpegProcessError | None] = SingleFlight()
+        # Whether each option takes a value, per FFmpeg executable.
+        self.arities: dict[str, dict[str, bool]] = {}
+        self.number_of_dry_runs = 0
+        self.logger = getLogger(__name__)
+
+    async def validate(self, stream_spec: StreamSpec | FFmpegJob) -> None:
+        """Raise the error which the job would fail with; return when it's valid or the dry run is inconclusive."""
+        job = stream_spec if isinstance(stream_spec, FFmpegJob) else FFmpegJob.from_stream_spec(stream_spec)
+        arguments = await self.prepare(job.arguments)
+        if arguments is None:
+            return
+        if arguments in self.verdicts:
+            self.verdicts.move_to_end(arguments)
+            error = self.verdicts[arguments]
+        else:
+            error = await self.judge(arguments)
+        if error is not None:
+            # New instance, since raising the cached one would pile up its traceback.
+            raise type(error)(*error.args)
+
+    async def prepare(self, arguments: tuple[str, ...]) -> tuple[str, ...] | None:
+        """Create arguments of dry run; return None when FFmpeg doesn't know some option of the job."""
+        arities = self.arities.setdefault(arguments[0], {})
+        arguments_dry_run = create_arguments_dry_run(arguments, self.stand_in, arities)
+        if arguments_dry_run is None:
+            arities.update(await asyncio.to_thread(read_arities, arguments, timeout=self.time_to_force_termination))
+            arguments_dry_run = create_arguments_dry_run(arguments, self.stand_in, arities)
+        if arguments_dry_run is None:
+            self.logger.debug("Dry run is inconclusive, unknown option: %s", arguments)
+        return arguments_dry_run
+
+    async def judge(self, arguments: tuple[str, ...]) -> FFmpegProcessError | None:
+        return await self.dry_runs.share(arguments, lambda: self.dry_run(arguments))
+
+    async def dry_run(self, arguments: tuple[str, ...]) -> FFmpegProcessError | None:
+        self.number_of_dry_runs += 1
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(time_to_force_termination=self.time_to_force_termination)
+        error: FFmpegProcessError | None = None
+        try:
+            await ffmpeg_coroutine.execute_job(FFmpegJob(arguments))
+        except FFmpegProcessError as error_process:
+            if not is_conclusive(error_process):
+                self.logger.debug("Dry run is inconclusive, exit code: %d", error_process.exit_code)
+                return None
+            error = error_process
+        self.verdicts[arguments] = error
+        if len(self.verdicts) > self.max_verdicts:
+            self.verdicts.popitem(last=False)
+        return error
+
+
+def is_conclusive(error: FFmpegProcessError) -> bool:
+    """Whether the error of dry run tells the job would fail with it, regardless of the stand-in."""
+    if not isinstance(error, ERRORS_REJECTED):
+        return False
+    error_classifier = ErrorClassifier()
+    for line in str(error.args[0]).splitlines():
+        error_classifier.feed(line)
+    return error_classifier.line is None or not PATTERN_CAUSED_BY_STAND_IN.search(error_classifier.line)
+
+
+def create_arguments_dry_run(
+    arguments: Sequence[str],
+    stand_in: str,
+    arities: Mapping[str, bool],
+) -> tuple[str, ...] | None:
+    """Replace inputs with the stand-in dropping their options, and outputs with the null muxer.
+
+    Return None when arity of some option is unknown.
+    """
+    executable, *rest = arguments
+    units = split(rest, arities)
+    if units is None:
+        return None
+    positions_input = [position for position, unit in enumerate(units) if unit[0] == "-i"]
+    inputs = ["-f", "lavfi", "-i", stand_in] * len(positions_input)
+    units_output = units[positions_input[-1] + 1 :] if positions_input else units
+    # The last `-f` takes effect.
+    outputs = itertools.chain.from_iterable(unit if is_option(unit[0]) else NULL_OUTPUT for unit in units_output)
+    return (executable, *inputs, *outputs)
+
+
+def split(arguments: Sequence[str], arities: Mapping[str, bool]) -> list[tuple[str, ...]] | None:
+    """Split arguments into options with their values and URLs of outputs; return None at option of unknown arity."""
+    units: list[tuple[str, ...]] = []
+    iterator = iter(arguments)
+    for argument in iterator:
+        if not is_option(argument):
+            units.append((argument,))
+            continue
+        takes_value = arities.get(argument)
+        if takes_value is None:
+            return None
+        units.append((argument, *itertools.islice(iterator, int(takes_value))))
+    return units
+
+
+def is_option(argument: str) -> bool:
+    # `-` is stdout.
+    return argument.startswith("-") and len(argument) > 1
+
+
+def read_arities(arguments: Sequence[str], *, timeout: float = TIME_TO_FORCE_TERMINATION) -> dict[str, bool]:
+    """Read whether each option takes a value from how FFmpeg splits the arguments, without running the job.
+
+    FFmpeg logs each argument which it reads as an option or a URL, so that arguments which it doesn't log are values
+    of the option before them. Options which FFmpeg doesn't recognize aren't included, and nothing is included when
+    FFmpeg doesn't exit within the timeout (second).
+    """
+    executable, *rest = arguments
+    arguments_split = [*ARGUMENTS_SPLIT, *rest, "-version"]
+    try:
+        completed_process = subprocess.run(  # noqa: S603  # nosec
+            [executable, *arguments_split],
+            capture_output=True,
+            check=False,
+            text=True,
+            errors="replace",
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {}
+    matches = [match for match in map(PATTERN_READING_OPTION.match, completed_process.stderr.splitlines()) if match]
+    positions = list(locate(arguments_split, [match.group(1) for match in matches]))
+    return {
+        arguments_split[position]: position_next > position + 1
+        for match, position, position_next in zip(matches, positions, positions[1:])
+        if match.group(2) and is_option(arguments_split[position])
+    }
+
+
+def locate(arguments: Sequence[str], arguments_read: Sequence[str]) -> Iterator[int]:
+    """Locate arguments which FFmpeg read in order, skipping values between them."""
+    position = 0
+    for argument in arguments_read:
+        try:
+            position = arguments.index(argument, position)
+        except ValueError:
+            return
+        yield position
+        position += 1
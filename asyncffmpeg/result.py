@@ -0,0 +1,130 @@
+"""Result of FFmpeg process with statistics parsed from its stderr."""
+
+from __future__ import annotations
+
+import dataclasses
+import re
+
+__all__ = ["FFmpegResult"]
+
+# e.g. "frame=  300 fps=120 q=-1.0 Lsize=  1024KiB time=00:00:05.00 bitrate=1677.7kbits/s dup=0 drop=1 speed=2.01x"
+PATTERN_STATISTICS = re.compile(r"(\w+)=\s*(\S+)")
+# FFmpeg 6.1 or later prefixes lines of muxer, e.g. "[out#0/mp4 @ 0x55d0c0] ".
+PATTERN_PREFIX_MUXER = re.compile(r"^\[out#\d+/\w+ @ 0x[0-9a-f]+\] ")
+# e.g. "video:416KiB audio:12KiB subtitle:0KiB other streams:0KiB global headers:0KiB muxing overhead: 0.517%"
+PATTERN_MUXING_OVERHEAD = re.compile(r"video:\s*(\S+) audio:\s*(\S+) .*muxing overhead: ([-\d.]+)%")
+PATTERN_SIZE = re.compile(r"(\d+(?:\.\d+)?)\s*(B|kB|KiB|MiB|GiB)")
+PATTERN_TIME = re.compile(r"(-?)(\d+):(\d+):(\d+(?:\.\d+)?)")
+BYTES_PER_UNIT = {"B": 1, "kB": 1024, "KiB": 1024, "MiB": 1024**2, "GiB": 1024**3}
+SECONDS_PER_MINUTE = 60
+SECONDS_PER_HOUR = 60 * SECONDS_PER_MINUTE
+
+
+@dataclasses.dataclass(frozen=True)
+class FFmpegResult:
+    """Result of FFmpeg process.
+
+    Each statistic is None when FFmpeg didn't report it, e.g. frames for audio only output.
+
+    Args:
+        return_code: Exit code of FFmpeg process.
+        frames: Number of frames output.
+        fps: Frames per second of processing.
+        size: Size (bytes) of output.
+        time: Time (second) of output.
+        bitrate: Bitrate (kbit/s) of output.
+        speed: Speed of processing relative to real time.
+        duplicated_frames: Number of frames duplicated to keep frame rate.
+        dropped_frames: Number of frames dropped to keep frame rate.
+        size_video: Size (bytes) of video streams in output.
+        size_audio: Size (bytes) of audio streams in output.
+        muxing_overhead: Overhead (percent) of container over the streams.
+    """
+
+    return_code: int
+    frames: int | None = None
+    fps: float | None = None
+    size: int | None = None
+    time: float | None = None
+    bitrate: float | None = None
+    speed: float | None = None
+    duplicated_frames: int | None = None
+    dropped_frames: int | None = None
+    size_video: int | None = None
+    size_audio: int | None = None
+    muxing_overhead: float | None = None
+
+
+class StatisticsParser:
+    """Parses statistics from lines of FFmpeg stderr in a single pass without keeping them.
+
+    Since FFmpeg overwrites the progress line until it finishes, the last progress line is the final summary.
+    """
+
+    def __init__(self) -> None:
+        self.statistics: dict[str, str] = {}
+        self.muxing: tuple[str, str, str] | None = None
+
+    def feed(self, line: str) -> None:
+        line = PATTERN_PREFIX_MUXER.sub("", line, count=1)
+        if line.startswith(("frame=", "size=")):
+            self.statistics = dict(PATTERN_STATISTICS.findall(line))
+            return
+        match = PATTERN_MUXING_OVERHEAD.match(line)
+        if match:
+            video, audio, overhead = match.groups()
+            self.muxing = video, audio, overhead
+
+    def create_result(self, return_code: int) -> FFmpegResult:
+        statistics = self.statistics
+        video, audio, overhead = (None, None, None) if self.muxing is None else self.muxing
+        return FFmpegResult(
+            return_code=return_code,
+            frames=parse_int(statistics.get("frame")),
+            fps=parse_float(statistics.get("fps")),
+            size=parse_size(statistics.get("Lsize", statistics.get("size"))),
+            time=parse_time(statistics.get("time")),
+            bitrate=parse_float(strip_suffix(statistics.get("bitrate"), "kbits/s")),
+            speed=parse_float(strip_suffix(statistics.get("speed"), "x")),
+            duplicated_frames=parse_int(statistics.get("dup")),
+            dropped_frames=parse_int(statistics.get("drop")),
+            size_video=parse_size(video),
+            size_audio=parse_size(audio),
+            muxing_overhead=parse_float(overhead),
+        )
+
+
+def strip_suffix(value: str | None, suffix: str) -> str | None:
+    return value[: -len(suffix)] if value is not None and value.endswith(suffix) else value
+
+
+def parse_int(value: str | None) -> int | None:
+    """Parse integer; return None for "N/A" and so on."""
+    return None if value is None or not value.isdigit() else int(value)
+
+
+def parse_float(value: str | None) -> float | None:
+    """Parse float; return None for "N/A" and so on."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_size(value: str | None) -> int | None:
+    match = None if value is None else PATTERN_SIZE.fullmatch(value)
+    if match is None:
+        return None
+    number, unit = match.groups()
+    return int(float(number) * BYTES_PER_UNIT[unit])
+
+
+def parse_time(value: str | None) -> float | None:
+    match = None if value is None else PATTERN_TIME.fullmatch(value)
+    if match is None:
+        return None
+    sign, hours, minutes, seconds = match.groups()
+    time = int(hours) * SECONDS_PER_HOUR + int(minutes) * SECONDS_PER_MINUTE + float(seconds)
+    return -time if sign else time
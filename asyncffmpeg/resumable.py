@@ -0,0 +1,163 @@
+"""Checkpointed encoding which resumes from the last completed chunk."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import shutil
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+
+import ffmpeg
+
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+
+if TYPE_CHECKING:
+    from asyncffmpeg.ffmpeg_coroutine import FFmpegCoroutine
+    from asyncffmpeg.type_alias import StreamSpec
+
+__all__ = ["ResumableEncoder"]
+
+SECOND_CHUNK = 300.0
+NAME_MANIFEST = "manifest.json"
+CreateOutput = Callable[[Any, str], "StreamSpec"]
+
+
+class Manifest:
+    """Checkpoint of completed chunks, which is replaced atomically."""
+
+    def __init__(self, path: Path, job: dict[str, Any]) -> None:
+        self.path = path
+        self.job = job
+        self.chunks: list[str] = []
+
+    def load(self) -> bool:
+        """Load completed chunks; return False when the manifest is of another job, so that the job starts over."""
+        if not self.path.exists():
+            return True
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data["job"] != self.job:
+            return False
+        self.chunks = data["chunks"]
+        return True
+
+    def append(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        path_temporary = self.path.with_name(f"{self.path.name}.tmp")
+        with path_temporary.open("w", encoding="utf-8") as file:
+            json.dump({"job": self.job, "chunks": self.chunks}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        path_temporary.replace(self.path)
+
+
+class ResumableEncoder:
+    """Encodes input in time-bounded chunks with checkpoint so that restarted job continues from the last chunk.
+
+    Each chunk is encoded from the input seeked to its start and recorded into the manifest in the work directory
+    after it completes. When the job is interrupted, e.g. by SIGTERM, and started again with the same arguments, the
+    completed chunks are skipped. The manifest records a hash of the arguments which chunks are encoded by, so that
+    the job starts over when the input, the duration of chunks or the output options have changed. Finally, the chunks
+    are concatenated with stream copy.
+
+    Args:
+        create_output: Function to create stream spec of a chunk from the input and the path of the chunk, e.g.
+            `lambda stream, path: stream.output(path, vcodec="libx264")`. The format of chunks has to be concatenated
+            by concat demuxer.
+        second_chunk: Duration (second) of each chunk.
+        directory_work: Directory to store chunks and manifest. It has to be the same on restart.
+            When None, `<output>.chunks` is used. It's removed after the output is created.
+    """
+
+    def __init__(
+        self,
+        path_file_input: Path | str,
+        path_file_output: Path | str,
+        create_output: CreateOutput,
+        *,
+        second_chunk: float = SECOND_CHUNK,
+        directory_work: Path | None = None,
+    ) -> None:
+        self.path_file_input = Path(path_file_input)
+        self.path_file_output = Path(path_file_output)
+        self.create_output = create_output
+        self.second_chunk = second_chunk
+        self.directory_work = (
+            self.path_file_output.with_name(f"{self.path_file_output.name}.chunks")
+            if directory_work is None
+            else directory_work
+        )
+        self.logger = getLogger(__name__)
+
+    async def encode(
+        self,
+        *,
+        duration: float | None = None,
+        ffmpeg_coroutine: FFmpegCoroutine[Any] | None = None,
+    ) -> None:
+        """Encode remaining chunks and concatenate them into the output.
+
+        Args:
+            duration: Duration (second) of the input. When None, it's probed by ffprobe.
+            ffmpeg_coroutine: FFmpeg coroutine to execute each FFmpeg process.
+        """
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create() if ffmpeg_coroutine is None else ffmpeg_coroutine
+        duration = await self.get_duration() if duration is None else duration
+        await asyncio.to_thread(self.directory_work.mkdir, parents=True, exist_ok=True)
+        job = {
+            "input": str(self.path_file_input),
+            "duration": duration,
+            "second_chunk": self.second_chunk,
+            "arguments": self.hash_arguments(),
+        }
+        manifest = Manifest(self.directory_work / NAME_MANIFEST, job)
+        if not await asyncio.to_thread(manifest.load):
+            self.logger.warning("Manifest doesn't match the job, start over: %s", manifest.path)
+        number_of_chunks = math.ceil(duration / self.second_chunk)
+        if manifest.chunks:
+            self.logger.info("Resume from chunk %d / %d", len(manifest.chunks), number_of_chunks)
+        for index in range(len(manifest.chunks), number_of_chunks):
+            await self.encode_chunk(ffmpeg_coroutine, index, manifest)
+        await self.concat(ffmpeg_coroutine, manifest.chunks)
+        await asyncio.to_thread(shutil.rmtree, self.directory_work)
+
+    async def get_duration(self) -> float:
+        probe = await asyncio.to_thread(ffmpeg.probe, str(self.path_file_input))
+        return float(probe["format"]["duration"])
+
+    def hash_arguments(self) -> str:
+        """Hash arguments of FFmpeg which the first chunk is encoded by, with the path of the chunk fixed."""
+        stream = ffmpeg.input(str(self.path_file_input), ss=0, t=self.second_chunk)
+        arguments = ffmpeg.compile(self.create_output(stream, f"chunk{self.path_file_output.suffix}"))
+        return hashlib.sha256("\0".join(arguments).encode()).hexdigest()
+
+    async def encode_chunk(self, ffmpeg_coroutine: FFmpegCoroutine[Any], index: int, manifest: Manifest) -> None:
+        name = f"chunk_{index:06d}{self.path_file_output.suffix}"
+        # The chunk interrupted on the way is overwritten.
+        path_partial = self.directory_work / f"partial_{name}"
+        stream = ffmpeg.input(str(self.path_file_input), ss=index * self.second_chunk, t=self.second_chunk)
+        stream_spec = ffmpeg.overwrite_output(self.create_output(stream, str(path_partial)))
+        await execute(ffmpeg_coroutine, stream_spec)
+        await asyncio.to_thread(path_partial.replace, self.directory_work / name)
+        await asyncio.to_thread(manifest.append, name)
+        self.logger.debug("Chunk %d finished", index)
+
+    async def concat(self, ffmpeg_coroutine: FFmpegCoroutine[Any], chunks: list[str]) -> None:
+        path_list = self.directory_work / "concat.txt"
+        lines = (f"file '{chunk}'\n" for chunk in chunks)
+        await asyncio.to_thread(path_list.write_text, "".join(lines), encoding="utf-8")
+        stream = ffmpeg.input(str(path_list), f="concat", safe=0)
+        await execute(ffmpeg_coroutine, stream.output(str(self.path_file_output), c="copy").overwrite_output())
+
+
+async def execute(ffmpeg_coroutine: FFmpegCoroutine[Any], stream_spec: StreamSpec) -> None:
+    async def create_stream_spec() -> StreamSpec:
+        return stream_spec
+
+    await ffmpeg_coroutine.execute(create_stream_spec)
@@ -0,0 +1,213 @@
+"""Sampler of resource usage of FFmpeg processes from procfs (Linux only)."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import os
+import time
+from array import array
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+__all__ = ["ResourceSampler", "ResourceSeries", "ResourceUsage"]
+
+SECOND_INTERVAL = 1.0
+CAPACITY = 600
+PATH_PROC = Path("/proc")
+# Indexes of fields in /proc/<pid>/stat after the command name, see: man 5 proc
+INDEX_STATE = 0
+INDEX_UTIME = 11
+INDEX_STIME = 12
+INDEX_RSS = 21
+TICKS_PER_SECOND = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+SIZE_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclasses.dataclass(frozen=True)
+class ResourceUsage:
+    """The latest sample of resource usage of a process.
+
+    Args:
+        cpu_percent: CPU usage (percent of a core) since the previous sample.
+        rss: Resident set size (bytes).
+        peak_rss: Peak resident set size (bytes) including peaks between samples.
+        threads: Number of threads.
+        bytes_read: Bytes read from storage.
+        bytes_written: Bytes written into storage.
+    """
+
+    cpu_percent: float
+    rss: int
+    peak_rss: int
+    threads: int
+    bytes_read: int
+    bytes_written: int
+
+
+class ResourceSeries:
+    """Time series of resource usage of a process in ring buffers of arrays.
+
+    Samples are stored into preallocated arrays without object per sample, and the oldest sample is overwritten when
+    the capacity is full.
+
+    Args:
+        capacity: Maximum number of samples to keep.
+    """
+
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.cpu_percents = array("d", bytes(8 * capacity))
+        self.rss = array("q", bytes(8 * capacity))
+        self.threads = array("q", bytes(8 * capacity))
+        self.bytes_read = array("q", bytes(8 * capacity))
+        self.bytes_written = array("q", bytes(8 * capacity))
+        self.count = 0
+        self.peak_rss = 0
+        self.ticks_last = 0
+        self.time_last = 0.0
+        self.finished = False
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, now: float, ticks: int, rss: int, threads: int, bytes_io: tuple[int, int]) -> None:
+        """Append a sample.
+
+        Args:
+            now: Monotonic time (second) of the sample.
+            ticks: CPU time (clock ticks) which the process has consumed.
+            rss: Resident set size (bytes).
+            threads: Number of threads.
+            bytes_io: Bytes read from and written into storage.
+        """
+        second_elapsed = now - self.time_last
+        cpu_percent = (ticks - self.ticks_last) / TICKS_PER_SECOND / second_elapsed * 100 if self.count else 0.0
+        index = self.count % self.capacity
+        self.times[index] = now
+        self.cpu_percents[index] = cpu_percent
+        self.rss[index] = rss
+        self.threads[index] = threads
+        self.bytes_read[index], self.bytes_written[index] = bytes_io
+        self.count += 1
+        self.peak_rss = max(self.peak_rss, rss)
+        self.ticks_last = ticks
+        self.time_last = now
+
+    def ordered(self, values: array[float] | array[int]) -> list[float] | list[int]:
+        """Return values of the series in chronological order, e.g. `series.ordered(series.rss)`."""
+        if self.count <= self.capacity:
+            return values[: self.count].tolist()
+        index = self.count % self.capacity
+        return values[index:].tolist() + values[:index].tolist()
+
+    def latest(self, values: array[float] | array[int]) -> float | int | None:
+        """Return the latest value, e.g. `series.latest(series.cpu_percents)`."""
+        return values[(self.count - 1) % self.capacity] if self.count else None
+
+    def usage(self) -> ResourceUsage | None:
+        """Return the latest sample, None when there is no sample yet."""
+        if not self.count:
+            return None
+        index = (self.count - 1) % self.capacity
+        return ResourceUsage(
+            self.cpu_percents[index],
+            self.rss[index],
+            self.peak_rss,
+            self.threads[index],
+            self.bytes_read[index],
+            self.bytes_written[index],
+        )
+
+
+class ResourceSampler:
+    """Samples CPU usage (percent of a core), RSS (bytes) and I/O (bytes) of processes periodically.
+
+    All registered processes are read in a single thread per interval. The series of a process is kept after the
+    process finished until it's discarded, so that schedulers and dashboards can query it, e.g. PriorityScheduler
+    holds new jobs while RSS of its jobs exceeds its budget.
+
+    Args:
+        second_interval: Interval (second) between samples.
+        capacity: Maximum number of samples to keep for each process.
+    """
+
+    def __init__(self, *, second_interval: float = SECOND_INTERVAL, capacity: int = CAPACITY) -> None:
+        self.second_interval = second_interval
+        self.capacity = capacity
+        self.series: dict[int, ResourceSeries] = {}
+        self.logger = getLogger(__name__)
+
+    def register(self, pid: int) -> ResourceSeries:
+        """Start sampling the process, e.g. `sampler.register(ffmpeg_process.popen.pid)` in after_start."""
+        return self.series.setdefault(pid, ResourceSeries(self.capacity))
+
+    def discard(self, pid: int) -> None:
+        self.series.pop(pid, None)
+
+    def query(self, pid: int) -> ResourceUsage | None:
+        """Return the latest usage of the process, None when it isn't registered or sampled yet."""
+        series = self.series.get(pid)
+        return None if series is None else series.usage()
+
+    def total_rss(self, pids: Iterable[int]) -> int:
+        """Return total of the latest RSS of the processes which are running, 0 for ones not sampled yet."""
+        total = 0
+        for pid in pids:
+            series = self.series.get(pid)
+            usage = None if series is None or series.finished else series.usage()
+            total += 0 if usage is None else usage.rss
+        return total
+
+    async def run(self) -> None:
+        """Sample until cancelled."""
+        while True:
+            await asyncio.to_thread(self.sample)
+            await asyncio.sleep(self.second_interval)
+
+    def sample(self) -> None:
+        now = time.monotonic()
+        for pid, series in list(self.series.items()):
+            if series.finished:
+                continue
+            try:
+                sample_process(pid, series, now)
+            except (FileNotFoundError, ProcessLookupError):
+                series.finished = True
+
+
+def sample_process(pid: int, series: ResourceSeries, now: float) -> None:
+    path = PATH_PROC / str(pid)
+    stat = (path / "stat").read_bytes()
+    # The command name can contain spaces and parentheses.
+    fields = stat[stat.rindex(b")") + 2 :].split()
+    if fields[INDEX_STATE] in (b"Z", b"X"):
+        series.finished = True
+        return
+    peak_rss, threads = read_status(path / "status")
+    ticks = int(fields[INDEX_UTIME]) + int(fields[INDEX_STIME])
+    series.append(now, ticks, int(fields[INDEX_RSS]) * SIZE_PAGE, threads, read_io(path / "io"))
+    # Peak between samples which the kernel records.
+    series.peak_rss = max(series.peak_rss, peak_rss)
+
+
+def read_status(path: Path) -> tuple[int, int]:
+    """Read peak RSS (bytes) and the number of threads."""
+    values = dict(line.split(b":", 1) for line in path.read_bytes().splitlines())
+    # Zombie process doesn't have memory fields.
+    return int(values.get(b"VmHWM", b"0 kB").split()[0]) * 1024, int(values[b"Threads"])
+
+
+def read_io(path: Path) -> tuple[int, int]:
+    """Read bytes read from and written into storage; 0 when not permitted."""
+    try:
+        content = path.read_bytes()
+    except PermissionError:
+        return 0, 0
+    values = dict(line.split(b": ") for line in content.splitlines())
+    return int(values[b"read_bytes"]), int(values[b"write_bytes"])
@@ -0,0 +1,170 @@
+"""Priority scheduler which preempts low-priority FFmpeg jobs by suspending them."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+from logging import getLogger
+from typing import TYPE_CHECKING
+from typing import Callable
+
+from asyncffmpeg.ffmpeg_coroutine import TIME_TO_FORCE_TERMINATION
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+from asyncffmpeg.job import FFmpegJob
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+    from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
+    from asyncffmpeg.ffmpegprocess.spawn import SpawnOptions
+    from asyncffmpeg.result import FFmpegResult
+    from asyncffmpeg.sampler import ResourceSampler
+    from asyncffmpeg.type_alias import StreamSpec
+
+__all__ = ["PriorityScheduler"]
+
+
+class Entry:
+    """Job waiting, running or suspended in the scheduler."""
+
+    def __init__(self, priority: int, sequence: int) -> None:
+        self.priority = priority
+        self.sequence = sequence
+        self.started: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self.ffmpeg_process: FFmpegProcess | None = None
+        self.suspended = False
+
+    @property
+    def rank(self) -> tuple[int, int]:
+        # Earlier job ranks higher among jobs of the same priority.
+        return self.priority, -self.sequence
+
+    async def attach(self, ffmpeg_process: FFmpegProcess) -> None:
+        """Attach FFmpeg process as after_start; suspend it if the job was preempted before FFmpeg started."""
+        self.ffmpeg_process = ffmpeg_process
+        if self.suspended:
+            ffmpeg_process.suspend()
+
+    def run(self) -> None:
+        """Start the job, or resume it when it was suspended."""
+        if not self.started.done():
+            self.started.set_result(None)
+        self.suspended = False
+        if self.ffmpeg_process is not None:
+            self.ffmpeg_process.resume()
+
+    def suspend(self) -> None:
+        self.suspended = True
+        if self.ffmpeg_process is not None:
+            self.ffmpeg_process.suspend()
+
+
+class PriorityScheduler:
+    """Runs FFmpeg jobs in limited slots, preempting jobs of lower priority by suspending them.
+
+    When a job is submitted while all slots are busy, the running job of the lowest priority is suspended by SIGSTOP if
+    its priority is lower than the job, and the job runs in its slot. Unlike quitting, the suspended job keeps its
+    progress. When a slot is freed, the suspended or waiting job of the highest priority runs; the suspended one is
+    resumed by SIGCONT. Jobs of the same priority run in order of submission and never preempt each other. Suspended
+    FFmpeg keeps its memory. Not supported on Windows.
+
+    When sampler and max_rss are given, FFmpeg of each job is registered to the sampler, and waiting jobs don't start
+    while the total latest RSS of running and suspended jobs is max_rss or more, even if slots are free. Suspended jobs
+    are still resumed since they don't allocate new memory. Waiting jobs are reconsidered when a job finishes or is
+    submitted. The sampler has to be run by the caller.
+
+    Args:
+        max_running: Maximum number of jobs running at once.
+        time_to_force_termination: Time to force termination of each FFmpeg.
+        spawn_options: Options to spawn each FFmpeg.
+        sampler: Sampler to query RSS of FFmpeg of jobs.
+        max_rss: Budget (bytes) of total RSS of FFmpeg of jobs to start waiting jobs.
+    """
+
+    def __init__(
+        self,
+        max_running: int = 1,
+        *,
+        time_to_force_termination: int = TIME_TO_FORCE_TERMINATION,
+        spawn_options: SpawnOptions | None = None,
+        sampler: ResourceSampler | None = None,
+        max_rss: int | None = None,
+    ) -> None:
+        self.max_running = max_running
+        self.time_to_force_termination = time_to_force_termination
+        self.spawn_options = spawn_options
+        self.sampler = sampler
+        self.max_rss = max_rss
+        self.waiting: set[Entry] = set()
+        self.running: set[Entry] = set()
+        self.suspended: set[Entry] = set()
+        self.sequence = itertools.count()
+        self.logger = getLogger(__name__)
+
+    async def execute(
+        self,
+        create_stream_spec: Callable[[], Awaitable[StreamSpec]],
+        *,
+        priority: int = 0,
+    ) -> FFmpegResult:
+        """Execute FFmpeg job when its priority is the highest; return its result with statistics."""
+        return await self.execute_job(FFmpegJob.from_stream_spec(await create_stream_spec()), priority=priority)
+
+    async def execute_job(self, job: FFmpegJob, *, priority: int = 0) -> FFmpegResult:
+        """Execute FFmpeg job which has precompiled arguments when its priority is the highest."""
+        entry = Entry(priority, next(self.sequence))
+        self.waiting.add(entry)
+        self.dispatch()
+
+        async def after_start(ffmpeg_process: FFmpegProcess) -> None:
+            await entry.attach(ffmpeg_process)
+            if self.sampler is not None:
+                self.sampler.register(ffmpeg_process.popen.pid)
+
+        try:
+            await entry.started
+            ffmpeg_coroutine = FFmpegCoroutineFactory.create(
+                time_to_force_termination=self.time_to_force_termination,
+                spawn_options=self.spawn_options,
+            )
+            # When cancelled while suspended, quit() of FFmpeg process resumes it before sending `q`.
+            return await ffmpeg_coroutine.execute_job(job, after_start=after_start)
+        finally:
+            self.waiting.discard(entry)
+            self.running.discard(entry)
+            self.suspended.discard(entry)
+            if self.sampler is not None and entry.ffmpeg_process is not None:
+                self.sampler.discard(entry.ffmpeg_process.popen.pid)
+            self.dispatch()
+
+    def dispatch(self) -> None:
+        """Run waiting or suspended jobs of the highest priority while slots are free or can be freed."""
+        while True:
+            candidates = self.suspended if self.exceeds_max_rss() else self.waiting | self.suspended
+            candidate = max(candidates, key=lambda entry: entry.rank, default=None)
+            if candidate is None or not self.acquire_slot(candidate):
+                return
+            self.waiting.discard(candidate)
+            self.suspended.discard(candidate)
+            self.running.add(candidate)
+            candidate.run()
+
+    def exceeds_max_rss(self) -> bool:
+        if self.sampler is None or self.max_rss is None:
+            return False
+        entries = self.running | self.suspended
+        pids = [entry.ffmpeg_process.popen.pid for entry in entries if entry.ffmpeg_process is not None]
+        return self.sampler.total_rss(pids) >= self.max_rss
+
+    def acquire_slot(self, candidate: Entry) -> bool:
+        """Free a slot by suspending the running job of the lowest priority if it is lower than the candidate."""
+        if len(self.running) < self.max_running:
+            return True
+        victim = min(self.running, key=lambda entry: entry.rank)
+        if victim.priority >= candidate.priority:
+            return False
+        self.logger.debug("Preempt job of priority %d by job of priority %d", victim.priority, candidate.priority)
+        self.running.remove(victim)
+        self.suspended.add(victim)
+        victim.suspend()
+        return True
@@ -0,0 +1,135 @@
+"""Single-flight deduplication of identical FFmpeg jobs in flight."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Hashable
+from logging import getLogger
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Generic
+from typing import TypeVar
+
+from asyncffmpeg.ffmpeg_coroutine import TIME_TO_FORCE_TERMINATION
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+from asyncffmpeg.job import FFmpegJob
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+    from asyncffmpeg.ffmpegprocess.spawn import SpawnOptions
+    from asyncffmpeg.result import FFmpegResult
+    from asyncffmpeg.type_alias import StreamSpec
+
+__all__ = ["FFmpegSingleFlight"]
+
+TypeVarKey = TypeVar("TypeVarKey", bound=Hashable)
+TypeVarResult = TypeVar("TypeVarResult")
+
+
+class Flight(Generic[TypeVarResult]):
+    """Task in flight and the number of its awaiters."""
+
+    def __init__(self, task: asyncio.Task[TypeVarResult]) -> None:
+        self.task = task
+        self.number_of_awaiters = 0
+        self.quitting = False
+
+    async def quit(self) -> None:
+        """Cancel the task and wait for it to finish, e.g. so that the output isn't written after cancellation."""
+        self.quitting = True
+        self.task.cancel()
+        await asyncio.wait([self.task])
+
+
+class SingleFlight(Generic[TypeVarKey, TypeVarResult]):
+    """Shares a task per key among concurrent awaiters, which receive the same result or error.
+
+    Cancellation of an awaiter only detaches it, and the task is cancelled when the last awaiter is cancelled. Awaiters
+    arriving while the task quits wait for it to finish and start a new task, instead of receiving its cancellation.
+    """
+
+    def __init__(self) -> None:
+        self.flights: dict[TypeVarKey, Flight[TypeVarResult]] = {}
+        self.logger = getLogger(__name__)
+
+    async def share(self, key: TypeVarKey, create: Callable[[], Awaitable[TypeVarResult]]) -> TypeVarResult:
+        """Await the task of the key; start it by the coroutine function when it's not in flight."""
+        flight = await self.join(key, create)
+        flight.number_of_awaiters += 1
+        try:
+            # The task isn't cancelled by cancellation of each awaiter.
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.number_of_awaiters == 1 and not flight.task.done():
+                self.logger.debug("All awaiters cancelled, quit: %s", key)
+                await flight.quit()
+            raise
+        finally:
+            flight.number_of_awaiters -= 1
+
+    async def join(self, key: TypeVarKey, create: Callable[[], Awaitable[TypeVarResult]]) -> Flight[TypeVarResult]:
+        while True:
+            flight = self.flights.get(key)
+            # Done callback to remove finished flight may not be called yet.
+            if flight is None or flight.task.done():
+                return self.start(key, create)
+            if not flight.quitting:
+                self.logger.debug("Join in flight: %s", key)
+                return flight
+            await asyncio.wait([flight.task])
+
+    def start(self, key: TypeVarKey, create: Callable[[], Awaitable[TypeVarResult]]) -> Flight[TypeVarResult]:
+        flight = Flight(asyncio.ensure_future(create()))
+        self.flights[key] = flight
+        flight.task.add_done_callback(lambda _: self.remove(key, flight))
+        # Reason: Error is reported to awaiters through shield, but not retrieved when all awaiters are cancelled.
+        flight.task.add_done_callback(retrieve_exception)
+        return flight
+
+    def remove(self, key: TypeVarKey, flight: Flight[TypeVarResult]) -> None:
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+
+class FFmpegSingleFlight(SingleFlight[tuple[str, ...], "FFmpegResult"]):
+    """Coalesces identical jobs submitted while the first one is running onto the same FFmpeg process.
+
+    Jobs are identical when their compiled arguments are the same, that is, the same inputs, options and outputs. All
+    awaiters of the job receive the same result or error. When some awaiters are cancelled, the others keep waiting,
+    and FFmpeg is quitted only when all awaiters are cancelled. Jobs submitted after the job finished or while FFmpeg
+    quits start FFmpeg again.
+    """
+
+    def __init__(
+        self,
+        *,
+        time_to_force_termination: int = TIME_TO_FORCE_TERMINATION,
+        spawn_options: SpawnOptions | None = None,
+    ) -> None:
+        super().__init__()
+        self.time_to_force_termination = time_to_force_termination
+        self.spawn_options = spawn_options
+        self.number_of_invocations = 0
+
+    async def execute(self, create_stream_spec: Callable[[], Awaitable[StreamSpec]]) -> FFmpegResult:
+        """Execute FFmpeg job unless identical job is in flight; return its result with statistics."""
+        return await self.execute_job(FFmpegJob.from_stream_spec(await create_stream_spec()))
+
+    async def execute_job(self, job: FFmpegJob) -> FFmpegResult:
+        """Execute FFmpeg job which has precompiled arguments unless identical job is in flight."""
+        return await self.share(job.arguments, lambda: self.run(job))
+
+    async def run(self, job: FFmpegJob) -> FFmpegResult:
+        self.number_of_invocations += 1
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(
+            time_to_force_termination=self.time_to_force_termination,
+            spawn_options=self.spawn_options,
+        )
+        return await ffmpeg_coroutine.execute_job(job)
+
+
+def retrieve_exception(task: asyncio.Task[Any]) -> None:
+    if not task.cancelled():
+        task.exception()
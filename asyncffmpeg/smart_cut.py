@@ -0,0 +1,300 @@
+"""Frame-accurate clip extraction which re-encodes only partial GOPs at the edges."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import re
+import tempfile
+from bisect import bisect_left
+from bisect import bisect_right
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+import ffmpeg
+
+from asyncffmpeg.ffmpeg_coroutine import TIME_TO_FORCE_TERMINATION
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+from asyncffmpeg.job import FFmpegJob
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from asyncffmpeg.keyframe_index import KeyframeIndex
+    from asyncffmpeg.keyframe_index import KeyframeIndexer
+    from asyncffmpeg.result import FFmpegResult
+    from asyncffmpeg.type_alias import StreamSpec
+
+__all__ = ["SmartCutter"]
+
+VCODEC_X264 = "libx264"
+VIDEO_OPTIONS = {"vcodec": VCODEC_X264}
+AUDIO_OPTIONS = {"acodec": "aac"}
+# NUT keeps time base of the input, so that copied packets keep their exact timestamps.
+FORMAT_SEGMENT = "nut"
+# Puts SPS and PPS in front of the keyframe in Annex B, whether they are out-of-band (MP4) or global header (NUT).
+BSF_PARAMETER_SETS = "h264_mp4toannexb,dump_extra=freq=keyframe"
+PATTERN_START_CODE = re.compile(rb"\x00\x00\x01")
+# Unregistered user data SEI which x264 writes, e.g. "x264 - core 164 ... - options: cabac=1 ref=3 ...".
+PATTERN_X264_OPTIONS = re.compile(rb"x264 - core .*? - options: ([^\x00]*)")
+MASK_NAL_UNIT_TYPE = 0x1F
+NAL_UNIT_TYPES_PARAMETER_SET = {7, 8}
+# Options of x264 which determine SPS and PPS, printed in the same form as x264-params take.
+X264_OPTIONS_PARAMETER_SETS = (
+    "cabac",
+    "ref",
+    "8x8dct",
+    "bframes",
+    "b_pyramid",
+    "weightb",
+    "weightp",
+    "keyint",
+    "constrained_intra",
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Segment:
+    """Run of frames of video which is either re-encoded or stream copied.
+
+    Args:
+        second_seek: Seek target to reach the first frame.
+        number_of_frames: Number of frames.
+        second_duration: Duration from the first frame to the first frame of the next segment.
+        copy: Whether the segment is stream copied.
+        from_keyframe: Whether the segment starts at keyframe, so that seeking doesn't have to be accurate.
+    """
+
+    second_seek: float
+    number_of_frames: int
+    second_duration: float | None
+    copy: bool
+    from_keyframe: bool
+
+
+@dataclasses.dataclass(frozen=True)
+class ParameterSets:
+    """SPS and PPS of H.264 and options of x264 which encoded them, if x264 did.
+
+    Args:
+        nal_units: NAL units of SPS and PPS.
+        x264_options: Options which x264 printed into SEI.
+    """
+
+    nal_units: frozenset[bytes]
+    x264_options: dict[str, str]
+
+    @classmethod
+    def parse(cls, data: bytes) -> ParameterSets:
+        """Parse the parameter sets and x264 options from the keyframe in Annex B."""
+        # Zero bytes before 4 bytes start code trail the previous NAL unit.
+        nal_units = (nal_unit.rstrip(b"\x00") for nal_unit in PATTERN_START_CODE.split(data))
+        parameter_sets = [
+            nal_unit
+            for nal_unit in nal_units
+            if nal_unit and nal_unit[0] & MASK_NAL_UNIT_TYPE in NAL_UNIT_TYPES_PARAMETER_SET
+        ]
+        match = PATTERN_X264_OPTIONS.search(data)
+        options = match.group(1).decode("ascii", "replace").split() if match else []
+        return cls(frozenset(parameter_sets), dict(option.partition("=")[::2] for option in options))
+
+    def apply(self, video_options: dict[str, Any]) -> dict[str, Any]:
+        """Add x264 options which determine the parameter sets to video options; x264-params in them take precedence."""
+        params = [f"{key}={self.x264_options[key]}" for key in X264_OPTIONS_PARAMETER_SETS if key in self.x264_options]
+        if "x264-params" in video_options:
+            params.append(str(video_options["x264-params"]))
+        return {**video_options, "x264-params": ":".join(params)} if params else video_options
+
+
+class SmartCutter:
+    """Cuts frame-accurate clips from an input by stream copying keyframe-aligned middle and re-encoding only edges.
+
+    The video of a clip is split into the partial GOP before the first keyframe in the clip, the GOPs between keyframes,
+    and the partial GOP after the last keyframe in the clip. Only the partial GOPs are re-encoded, then all segments are
+    concatenated and the audio is encoded in a single pass. Since the re-encoded segments are concatenated with copied
+    packets, video options have to produce the same codec, resolution and pixel format as the input.
+
+    Concatenated segments share SPS and PPS of the first segment, so that copied GOPs decode with errors when the
+    re-encoded edges have different parameter sets, e.g. the input was encoded by `-preset slow` which refers to more
+    frames. For libx264, the edges are re-encoded by the options of x264 which the input was encoded with, and when
+    their parameter sets still differ from those of the input, e.g. the input wasn't encoded by x264, the entire clip
+    is re-encoded instead. Parameter sets of other encoders aren't checked, so that their video options have to match
+    the input.
+
+    Args:
+        path_file_input: Input file.
+        indexer: Indexer which resolves keyframes of the input, probed once for all clips.
+        video_options: Output options to re-encode edges of video.
+        audio_options: Output options to encode audio of clips.
+        time_to_force_termination: Time to force termination of each FFmpeg.
+    """
+
+    def __init__(
+        self,
+        path_file_input: Path,
+        indexer: KeyframeIndexer,
+        *,
+        video_options: dict[str, Any] | None = None,
+        audio_options: dict[str, Any] | None = None,
+        time_to_force_termination: int = TIME_TO_FORCE_TERMINATION,
+    ) -> None:
+        self.path_file_input = path_file_input
+        self.indexer = indexer
+        self.video_options = VIDEO_OPTIONS if video_options is None else video_options
+        self.audio_options = AUDIO_OPTIONS if audio_options is None else audio_options
+        self.time_to_force_termination = time_to_force_termination
+        self.logger = getLogger(__name__)
+
+    async def cut(self, second_start: float, second_end: float, path_file_output: Path) -> FFmpegResult:
+        """Cut frames presented in [start, end) with audio into the output."""
+        return (await self.cut_all([(second_start, second_end, path_file_output)]))[0]
+
+    async def cut_all(self, clips: Iterable[tuple[float, float, Path]]) -> list[FFmpegResult]:
+        """Cut clips of (start, end, output) one by one; the input is probed and its parameter sets are read once."""
+        clips = list(clips)
+        index = await self.indexer.index(self.path_file_input)
+        plans = [plan(index, second_start, second_end) for second_start, second_end, _path in clips]
+        parameter_sets = await self.read_parameter_sets_input(plans)
+        return [await self.cut_planned(index, clip, segments, parameter_sets) for clip, segments in zip(clips, plans)]
+
+    async def cut_planned(
+        self,
+        index: KeyframeIndex,
+        clip: tuple[float, float, Path],
+        segments: list[Segment],
+        parameter_sets: ParameterSets | None,
+    ) -> FFmpegResult:
+        """Cut the clip of (start, end, output) by the planned segments."""
+        second_start, second_end, path_file_output = clip
+        number_of_frames_copied = sum(segment.number_of_frames for segment in segments if segment.copy)
+        self.logger.debug("Copy %d frames into %s", number_of_frames_copied, path_file_output)
+        # Segments are written next to the output, so that copied packets don't cross filesystems twice.
+        with tempfile.TemporaryDirectory(dir=path_file_output.parent) as name:
+            directory = Path(name)
+            if not await self.encode_segments(segments, directory, parameter_sets):
+                self.logger.warning("Parameter sets differ from input, re-encode entire clip: %s", path_file_output)
+                segments = [create_segment(index, second_start, second_end, copy=False, from_keyframe=False)]
+                await self.encode_segments(segments, directory, None)
+            path_list = directory / "segments.txt"
+            paths_segment = [create_path_segment(directory, number) for number in range(len(segments))]
+            concat_list = create_concat_list(zip(paths_segment, segments))
+            await asyncio.to_thread(path_list.write_text, concat_list, "utf-8")
+            video = ffmpeg.input(str(path_list), f="concat", safe=0)
+            duration = second_end - second_start
+            audio = ffmpeg.input(str(self.path_file_input), ss=second_start, t=duration)
+            output = ffmpeg.output(video["v"], audio["a?"], str(path_file_output), vcodec="copy", **self.audio_options)
+            return await self.execute(output.overwrite_output())
+
+    async def encode_segments(
+        self,
+        segments: list[Segment],
+        directory: Path,
+        parameter_sets: ParameterSets | None,
+    ) -> bool:
+        """Encode segments into the directory; return False when parameter sets of the edges differ from the input.
+
+        Parameter sets are checked only when the input ones are given and any segment is copied.
+        """
+        if not any(segment.copy for segment in segments):
+            parameter_sets = None
+        video_options = self.video_options if parameter_sets is None else parameter_sets.apply(self.video_options)
+        for number, segment in enumerate(segments):
+            path_segment = create_path_segment(directory, number)
+            await self.execute(self.create_stream_spec_segment(segment, path_segment, video_options))
+            if segment.copy or parameter_sets is None:
+                continue
+            if (await self.read_parameter_sets(path_segment, directory)).nal_units != parameter_sets.nal_units:
+                return False
+        return True
+
+    async def read_parameter_sets_input(self, plans: list[list[Segment]]) -> ParameterSets | None:
+        """Read parameter sets of the input, or None when no clip copies anything or the encoder isn't checked."""
+        copied = any(segment.copy for segments in plans for segment in segments)
+        if not copied or self.video_options.get("vcodec") != VCODEC_X264:
+            return None
+        with tempfile.TemporaryDirectory() as name:
+            return await self.read_parameter_sets(self.path_file_input, Path(name))
+
+    async def read_parameter_sets(self, path: Path, directory: Path) -> ParameterSets:
+        """Read parameter sets of the first keyframe, which x264 writes its options with."""
+        path_keyframe = directory / "keyframe.h264"
+        options = {"frames:v": 1, "bsf:v": BSF_PARAMETER_SETS}
+        output = ffmpeg.input(str(path)).output(str(path_keyframe), map="0:v:0", vcodec="copy", f="h264", **options)
+        await self.execute(output.overwrite_output())
+        return ParameterSets.parse(await asyncio.to_thread(path_keyframe.read_bytes))
+
+    def create_stream_spec_segment(
+        self,
+        segment: Segment,
+        path_segment: Path,
+        video_options: dict[str, Any],
+    ) -> StreamSpec:
+        options_input: dict[str, Any] = {"ss": segment.second_seek}
+        if segment.from_keyframe:
+            options_input["noaccurate_seek"] = None
+        options_output = {"vcodec": "copy"} if segment.copy else video_options
+        frames = {"frames:v": segment.number_of_frames}
+        stream = ffmpeg.input(str(self.path_file_input), **options_input)
+        output = stream.output(str(path_segment), map="0:v:0", f=FORMAT_SEGMENT, **frames, **options_output)
+        return output.overwrite_output()
+
+    async def execute(self, stream_spec: StreamSpec) -> FFmpegResult:
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(time_to_force_termination=self.time_to_force_termination)
+        return await ffmpeg_coroutine.execute_job(FFmpegJob.from_stream_spec(stream_spec))
+
+
+def create_path_segment(directory: Path, number: int) -> Path:
+    return directory / f"{number}.{FORMAT_SEGMENT}"
+
+
+def plan(index: KeyframeIndex, second_start: float, second_end: float) -> list[Segment]:
+    """Split frames presented in [start, end) into the partial GOP to re-encode, GOPs to copy and the partial GOP."""
+    keyframes = index.keyframes[bisect_left(index.keyframes, second_start) : bisect_left(index.keyframes, second_end)]
+    if not keyframes:
+        return [create_segment(index, second_start, second_end, copy=False, from_keyframe=False)]
+    keyframe_first, keyframe_last = keyframes[0], keyframes[-1]
+    segments = [
+        create_segment(index, second_start, keyframe_first, copy=False, from_keyframe=False),
+        create_segment(index, keyframe_first, keyframe_last, copy=True, from_keyframe=True),
+        create_segment(index, keyframe_last, second_end, copy=False, from_keyframe=True),
+    ]
+    return [segment for segment in segments if segment.number_of_frames > 0]
+
+
+def create_segment(
+    index: KeyframeIndex,
+    second_start: float,
+    second_end: float,
+    *,
+    copy: bool,
+    from_keyframe: bool,
+) -> Segment:
+    position_start = bisect_left(index.timestamps, second_start)
+    position_end = bisect_left(index.timestamps, second_end)
+    second_seek = seek(index, second_start) if from_keyframe else second_start
+    # Duration from the first frame to the first frame of the next segment, unknown after the last frame of the input.
+    in_range = position_start < position_end < len(index.timestamps)
+    second_duration = index.timestamps[position_end] - index.timestamps[position_start] if in_range else None
+    return Segment(second_seek, position_end - position_start, second_duration, copy=copy, from_keyframe=from_keyframe)
+
+
+def seek(index: KeyframeIndex, keyframe: float) -> float:
+    """Return seek target between the keyframe and the next frame, so that rounding of `-ss` can't miss the keyframe."""
+    position = bisect_right(index.timestamps, keyframe)
+    return (keyframe + index.timestamps[position]) / 2 if position < len(index.timestamps) else keyframe
+
+
+def create_concat_list(paths_segment: Iterable[tuple[Path, Segment]]) -> str:
+    """Create list of files for concat demuxer.
+
+    Durations are given explicitly since durations which muxer estimates from B-frames can leave gaps between segments.
+    """
+    lines = []
+    for path, segment in paths_segment:
+        escaped = str(path).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'\n")
+        if segment.second_duration is not None:
+            lines.append(f"duration {segment.second_duration!r}\n")
+    return "".join(lines)
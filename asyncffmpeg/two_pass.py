@@ -0,0 +1,143 @@
+"""Two-pass encoding which pipelines passes across jobs."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+import ffmpeg
+
+from asyncffmpeg.ffmpeg_coroutine import TIME_TO_FORCE_TERMINATION
+from asyncffmpeg.ffmpeg_coroutine_factory import FFmpegCoroutineFactory
+from asyncffmpeg.job import FFmpegJob
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+    # Reason: Maybe, requires to update ffmpeg-python side.
+    from ffmpeg.nodes import Stream  # type: ignore[import-untyped]
+
+    from asyncffmpeg.ffmpegprocess.spawn import SpawnOptions
+    from asyncffmpeg.result import FFmpegResult
+    from asyncffmpeg.type_alias import StreamSpec
+
+__all__ = ["TwoPassEncoder", "TwoPassJob"]
+
+PREFIX_DIRECTORY = "asyncffmpeg-passlog-"
+
+
+@dataclasses.dataclass(frozen=True)
+class TwoPassJob:
+    """Two-pass encode of streams into an output.
+
+    Args:
+        streams: Streams to output, e.g. `ffmpeg.input(path).video`. Audio is dropped in the first pass.
+        path_file_output: Output file written by the second pass, overwritten if it exists.
+        options: Output options shared by both passes, e.g. `{"vcodec": "libx264", "video_bitrate": "1M"}`.
+    """
+
+    streams: tuple[Stream, ...]
+    path_file_output: Path
+    options: dict[str, Any]
+
+    def create_stream_spec(self, number: int, passlogfile: str) -> StreamSpec:
+        """Create stream spec of the pass of the number which reads or writes the passlog."""
+        options = {**self.options, "pass": number, "passlogfile": passlogfile}
+        if number == 1:
+            # The first pass only writes statistics into the passlog.
+            return ffmpeg.output(*self.streams, "-", **{**options, "f": "null", "an": None})
+        return ffmpeg.output(*self.streams, str(self.path_file_output), **options).overwrite_output()
+
+
+class Passes:
+    """Passes of a job which share the passlog in a temporary directory of their own.
+
+    FFmpeg names passlog files after `ffmpeg2pass` in the working directory by default, where passes of jobs collide.
+    """
+
+    def __init__(self, job: TwoPassJob) -> None:
+        self.job = job
+        self.directory = tempfile.TemporaryDirectory(prefix=PREFIX_DIRECTORY)
+        # Encoders suffix the prefix, e.g. passlog-0.log and passlog-0.log.mbtree of libx264.
+        self.passlogfile = str(Path(self.directory.name) / "passlog")
+
+    def create_stream_spec(self, number: int) -> StreamSpec:
+        return self.job.create_stream_spec(number, self.passlogfile)
+
+    def cleanup(self) -> None:
+        # Idempotent, the directory may have been removed when the job finished.
+        self.directory.cleanup()
+
+
+class TwoPassEncoder:
+    """Encodes jobs in two passes, running the first pass of the next job while the second pass of a job runs.
+
+    Each job keeps its passlog in a temporary directory of its own, which is removed when the job finishes, fails or is
+    cancelled. Since the passlog is removed only after FFmpeg quits, cancelling during either pass doesn't leave files.
+    When a pass fails, the first pass in flight is cancelled and the error is raised.
+
+    Args:
+        time_to_force_termination: Time to force termination of each FFmpeg.
+        spawn_options: Options to spawn each FFmpeg.
+    """
+
+    def __init__(
+        self,
+        *,
+        time_to_force_termination: int = TIME_TO_FORCE_TERMINATION,
+        spawn_options: SpawnOptions | None = None,
+    ) -> None:
+        self.time_to_force_termination = time_to_force_termination
+        self.spawn_options = spawn_options
+
+    async def encode(self, job: TwoPassJob) -> FFmpegResult:
+        """Encode a job in two passes; return result of the second pass."""
+        results = await self.encode_all([job])
+        return results[0]
+
+    async def encode_all(self, jobs: Iterable[TwoPassJob]) -> list[FFmpegResult]:
+        """Encode jobs in order; return results of the second passes."""
+        iterator = iter(jobs)
+        started: list[Passes] = []
+        results: list[FFmpegResult] = []
+        task = self.start_first_pass(iterator, started)
+        try:
+            while task is not None:
+                passes = started[-1]
+                await task
+                task = self.start_first_pass(iterator, started)
+                results.append(await self.execute(passes.create_stream_spec(2)))
+                passes.cleanup()
+        finally:
+            await cancel(task)
+            for passes in started:
+                passes.cleanup()
+        return results
+
+    def start_first_pass(self, jobs: Iterator[TwoPassJob], started: list[Passes]) -> asyncio.Task[FFmpegResult] | None:
+        job = next(jobs, None)
+        if job is None:
+            return None
+        passes = Passes(job)
+        started.append(passes)
+        return asyncio.ensure_future(self.execute(passes.create_stream_spec(1)))
+
+    async def execute(self, stream_spec: StreamSpec) -> FFmpegResult:
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(
+            time_to_force_termination=self.time_to_force_termination,
+            spawn_options=self.spawn_options,
+        )
+        return await ffmpeg_coroutine.execute_job(FFmpegJob.from_stream_spec(stream_spec))
+
+
+async def cancel(task: asyncio.Task[FFmpegResult] | None) -> None:
+    """Cancel the task and wait FFmpeg to quit, so that its passlog can be removed."""
+    if task is None:
+        return
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
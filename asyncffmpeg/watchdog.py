@@ -0,0 +1,78 @@
+"""Watchdog which quits FFmpeg stuck by stalled input or output."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from asyncffmpeg.exceptions import FFmpegDeadlineExceededError
+from asyncffmpeg.exceptions import FFmpegStalledError
+
+if TYPE_CHECKING:
+    from asyncffmpeg.ffmpegprocess.interface import FFmpegRunnable
+    from asyncffmpeg.result import FFmpegResult
+
+__all__ = ["Watchdog"]
+
+SECOND_POLL = 1.0
+
+
+class Watchdog:
+    """Quits FFmpeg when its progress stalls or its deadline passes.
+
+    Progress is frames, size and time which FFmpeg reports in stderr. Since FFmpeg can't report progress while it is
+    blocked, e.g. by stalled NFS read or broken stream, this reclaims the FFmpeg coroutine which would wait forever.
+
+    Args:
+        second_stall: Quits FFmpeg when its progress doesn't advance for this time (second).
+        second_deadline: Quits FFmpeg when it doesn't finish within this time (second) since start.
+        second_poll: Interval (second) to check progress and deadline.
+    """
+
+    def __init__(
+        self,
+        *,
+        second_stall: float | None = None,
+        second_deadline: float | None = None,
+        second_poll: float = SECOND_POLL,
+    ) -> None:
+        self.second_stall = second_stall
+        self.second_deadline = second_deadline
+        self.second_poll = second_poll
+        self.logger = getLogger(__name__)
+
+    async def wait(self, ffmpeg_runnable: FFmpegRunnable, time_to_force_termination: float) -> FFmpegResult:
+        """Wait for FFmpeg to finish; quit it and raise FFmpegWatchdogError when it stalls or exceeds deadline."""
+        task_wait = asyncio.ensure_future(ffmpeg_runnable.wait())
+        task_watch = asyncio.ensure_future(self.watch(ffmpeg_runnable))
+        try:
+            await asyncio.wait([task_wait, task_watch], return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task_wait.cancel()
+            task_watch.cancel()
+            raise
+        if task_wait.done():
+            task_watch.cancel()
+            return task_wait.result()
+        task_wait.cancel()
+        error = task_watch.exception()
+        self.logger.error("%s", error)
+        await ffmpeg_runnable.quit(time_to_force_termination)
+        # Reason: watch() never returns without error.
+        raise error  # type: ignore[misc]
+
+    async def watch(self, ffmpeg_runnable: FFmpegRunnable) -> None:
+        time_start = time.monotonic()
+        while True:
+            await asyncio.sleep(self.second_poll)
+            self.check(time.monotonic() - time_start, ffmpeg_runnable.progress.second_since_advanced)
+
+    def check(self, second_elapsed: float, second_since_advanced: float) -> None:
+        if self.second_deadline is not None and second_elapsed >= self.second_deadline:
+            msg = f"FFmpeg didn't finish within {self.second_deadline} seconds"
+            raise FFmpegDeadlineExceededError(msg)
+        if self.second_stall is not None and second_since_advanced >= self.second_stall:
+            msg = f"FFmpeg didn't advance for {second_since_advanced:.1f} seconds"
+            raise FFmpegStalledError(msg)
@@ -7,13 +7,13 @@ import logging
 import multiprocessing
 import os
 import shutil
-import time
+import threading
 from contextlib import AbstractContextManager
 from contextlib import contextmanager
 from logging import handlers
 from multiprocessing import Queue
 from pathlib import Path
-from queue import Empty
+from queue import SimpleQueue
 from typing import TYPE_CHECKING
 from typing import Callable
 
@@ -49,7 +49,12 @@ def caplog_workaround() -> Callable[[], AbstractContextManager[None]]:
     @contextmanager
     def ctx() -> Generator[None, None, None]:
         # Reason: Queue is subscriptable in Python 3.9+. pylint: disable=unsubscriptable-object
-        logger_queue: Queue[logging.LogRecord] = Queue()
+        logger_queue: Queue[logging.LogRecord | None] = Queue()
+        log_records: SimpleQueue[logging.LogRecord] = SimpleQueue()
+        # Drains the queue while subprocess runs,
+        # otherwise subprocess blocks on exit to flush the queue when the pipe is full.
+        thread = threading.Thread(target=transfer, args=(logger_queue, log_records), daemon=True)
+        thread.start()
         logger = logging.getLogger()
         queue_handler = handlers.QueueHandler(logger_queue)
         logger.addHandler(queue_handler)
@@ -59,20 +64,22 @@ def caplog_workaround() -> Callable[[], AbstractContextManager[None]]:
         yield
         logger.removeHandler(queue_handler)
         logger.setLevel(original_level)
-        # Process logs with a timeout to avoid infinite wait
-        timeout_end = time.time() + 2  # 2 second timeout
-        while not logger_queue.empty() and time.time() < timeout_end:
-            try:
-                log_record: logging.LogRecord = logger_queue.get(timeout=0.1)
-            except Empty:
-                # Queue became empty while we were waiting
-                break
+        logger_queue.put(None)
+        # Join with a timeout to avoid infinite wait
+        thread.join(timeout=2)
+        while not log_records.empty():
             # Reason: To hack. pylint: disable=protected-access
-            logger.handle(log_record)
+            logger.handle(log_records.get())
 
     return ctx
 
 
+def transfer(source: Queue[logging.LogRecord | None], destination: SimpleQueue[logging.LogRecord]) -> None:
+    """Transfer log records until None."""
+    for log_record in iter(source.get, None):
+        destination.put(log_record)
+
+
 @pytest.fixture
 def fork_mp_context() -> ForkContext:
     """Provide a multiprocessing context with 'fork' start method.
@@ -0,0 +1,146 @@
+"""Tests for AudioReader and PeaksReducer."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import sys
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import numpy as np
+import pytest
+
+from asyncffmpeg import AudioReader
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegJob
+from asyncffmpeg import PeaksReducer
+from asyncffmpeg import SampleFormat
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+SAMPLE_RATE = 8000
+SECOND_DURATION = 3
+# Default amplitude of sine source of FFmpeg.
+AMPLITUDE = 1 / 8
+
+
+def create_sine(path: Path, second_duration: int) -> Path:
+    """Create WAV file of sine wave."""
+    stream = ffmpeg.input(f"sine=frequency=1000:sample_rate={SAMPLE_RATE}:duration={second_duration}", f="lavfi")
+    asyncio.run(FFmpegCoroutineFactory.create().execute_job(FFmpegJob.from_stream_spec(stream.output(str(path)))))
+    return path
+
+
+@pytest.fixture
+def path_file_sine(tmp_path: Path) -> Path:
+    """WAV file of sine wave."""
+    return create_sine(tmp_path / "sine.wav", SECOND_DURATION)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="test for POSIX only")
+class TestAudioReader:
+    """Tests for AudioReader."""
+
+    @staticmethod
+    @pytest.mark.parametrize("sample_format", list(SampleFormat))
+    def test(path_file_sine: Path, sample_format: SampleFormat) -> None:
+        """PCM is streamed in blocks and reduced into peaks and RMS per bucket."""
+        reader = AudioReader(path_file_sine, sample_format=sample_format, frames_per_block=1000)
+        reducer = PeaksReducer(frames_per_bucket=SAMPLE_RATE // 10)
+        shapes: list[tuple[int, ...]] = []
+
+        def consume(block: np.ndarray) -> None:
+            shapes.append(block.shape)
+            reducer.feed(block)
+
+        asyncio.run(reader.read(consume))
+        reducer.finish()
+        assert sum(shape[0] for shape in shapes) == SAMPLE_RATE * SECOND_DURATION
+        assert all(shape[1] == 1 for shape in shapes)
+        minimums, maximums, rms = reducer.peaks()
+        assert minimums.shape == maximums.shape == rms.shape == (SECOND_DURATION * 10, 1)
+        np.testing.assert_allclose(maximums, AMPLITUDE, rtol=0.01)
+        np.testing.assert_allclose(minimums, -AMPLITUDE, rtol=0.01)
+        np.testing.assert_allclose(rms, AMPLITUDE / math.sqrt(2), rtol=0.01)
+
+    @staticmethod
+    def test_consume_raises(tmp_path: Path) -> None:
+        """Error of consume is raised without waiting FFmpeg blocked on writing PCM which nobody reads."""
+        # Longer than pipe buffer can hold.
+        path_file_sine = create_sine(tmp_path / "sine.wav", 60)
+        reader = AudioReader(path_file_sine, frames_per_block=1000)
+
+        def consume(_block: np.ndarray) -> None:
+            msg = "Failed to consume"
+            raise ValueError(msg)
+
+        with pytest.raises(ValueError, match="Failed to consume"):
+            asyncio.run(asyncio.wait_for(reader.read(consume), 10))
+
+    @staticmethod
+    def test_concurrent(path_file_input: Path) -> None:
+        """Audio of files are decoded concurrently into stereo blocks."""
+        reducers = [PeaksReducer(frames_per_bucket=4410) for _ in range(4)]
+
+        async def read_all() -> None:
+            readers = [AudioReader(path_file_input, channels=2, sample_rate=44100) for _ in reducers]
+            await asyncio.gather(*(reader.read(reducer.feed) for reader, reducer in zip(readers, reducers)))
+
+        asyncio.run(read_all())
+        peaks = [reducer.peaks() for reducer in reducers]
+        assert peaks[0][1].shape[1] == 2  # noqa: PLR2004
+        assert peaks[0][1].shape[0] > 0
+        for minimums, maximums, rms in peaks[1:]:
+            np.testing.assert_array_equal(minimums, peaks[0][0])
+            np.testing.assert_array_equal(maximums, peaks[0][1])
+            np.testing.assert_array_equal(rms, peaks[0][2])
+
+    @staticmethod
+    def test_concurrent_same_reader(tmp_path: Path) -> None:
+        """Concurrent reads of the same reader don't overwrite blocks of each other."""
+        path_file_sine = create_sine(tmp_path / "sine.wav", 60)
+        # Block larger than pipe buffer so that reads fill it across awaits, and not multiple of period of sine wave.
+        reader = AudioReader(path_file_sine, frames_per_block=32 * 1024 + 1)
+        blocks: list[list[np.ndarray]] = [[] for _ in range(4)]
+
+        async def read(list_blocks: list[np.ndarray]) -> None:
+            await reader.read(lambda block: list_blocks.append(block.copy()))
+
+        async def read_all() -> None:
+            await asyncio.gather(*(read(list_blocks) for list_blocks in blocks))
+
+        asyncio.run(read_all())
+        expected = np.concatenate(blocks[0])
+        assert len(expected) == SAMPLE_RATE * 60
+        for list_blocks in blocks[1:]:
+            np.testing.assert_array_equal(np.concatenate(list_blocks), expected)
+
+
+class TestPeaksReducer:
+    """Tests for PeaksReducer."""
+
+    @staticmethod
+    def test_across_blocks() -> None:
+        """Buckets across blocks are reduced as same as the whole samples at once."""
+        samples = np.arange(-10, 10, dtype=np.float32).reshape(-1, 2) / 10
+        reducer = PeaksReducer(frames_per_bucket=3)
+        for block in np.split(samples, [2, 6, 7]):
+            # Reducer mustn't keep the block which the reader reuses.
+            reducer.feed(block.copy())
+        reducer.finish()
+        minimums, maximums, rms = reducer.peaks()
+        buckets = [samples[start : start + 3] for start in range(0, len(samples), 3)]
+        np.testing.assert_array_equal(minimums, [bucket.min(axis=0) for bucket in buckets])
+        np.testing.assert_array_equal(maximums, [bucket.max(axis=0) for bucket in buckets])
+        np.testing.assert_allclose(rms, [np.sqrt(np.square(bucket).mean(axis=0)) for bucket in buckets], rtol=1e-6)
+
+    @staticmethod
+    def test_s16() -> None:
+        """Integer samples are normalized."""
+        reducer = PeaksReducer(frames_per_bucket=2)
+        reducer.feed(np.array([[-32768], [16384]], dtype=np.int16))
+        minimums, maximums, _rms = reducer.peaks()
+        assert minimums.tolist() == [[-1.0]]
+        assert maximums.tolist() == [[0.5]]
@@ -0,0 +1,80 @@
+"""Tests for StdoutBroadcaster."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import ffmpeg
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import OverflowPolicy
+from asyncffmpeg import StdoutBroadcaster
+from asyncffmpeg import StdoutSubscriberDroppedError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from asyncffmpeg import StdoutSubscriber
+    from asyncffmpeg import StreamSpec
+    from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
+
+
+class CreateStreamSpecCoroutinePipe:
+    """Coroutine to create stream spec to write MPEG-TS into stdout."""
+
+    def __init__(self, path_file_input: Path) -> None:
+        self.path_file_input = path_file_input
+
+    async def create(self) -> StreamSpec:
+        stream = ffmpeg.input(self.path_file_input)
+        return ffmpeg.output(stream, "pipe:", format="mpegts", c="copy")
+
+
+async def consume(subscriber: StdoutSubscriber, second_sleep: float = 0) -> bytes:
+    chunks = []
+    async for chunk in subscriber:
+        chunks.append(chunk)
+        await asyncio.sleep(second_sleep)
+    return b"".join(chunks)
+
+
+class Broadcast:
+    """Runs broadcaster with consumers after start of FFmpeg process."""
+
+    def __init__(self, second_sleep_slow_consumer: float) -> None:
+        self.second_sleep_slow_consumer = second_sleep_slow_consumer
+        self.tasks: list[asyncio.Task[bytes | int]] = []
+
+    async def after_start(self, ffmpeg_process: FFmpegProcess) -> None:
+        broadcaster = StdoutBroadcaster(ffmpeg_process, size_chunk=4096)
+        subscribers = [broadcaster.subscribe(), broadcaster.subscribe()]
+        slow_subscriber = broadcaster.subscribe(maxsize=1, policy=OverflowPolicy.DROP)
+        self.tasks = [
+            asyncio.create_task(broadcaster.run()),
+            *(asyncio.create_task(consume(subscriber)) for subscriber in subscribers),
+            asyncio.create_task(consume(slow_subscriber, self.second_sleep_slow_consumer)),
+        ]
+
+    async def execute(self, path_file_input: Path) -> list[bytes | int | BaseException]:
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(pipe_stdout=True)
+        await ffmpeg_coroutine.execute(
+            CreateStreamSpecCoroutinePipe(path_file_input).create,
+            after_start=self.after_start,
+        )
+        return await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+class TestStdoutBroadcaster:
+    """Tests for StdoutBroadcaster."""
+
+    @staticmethod
+    def test(path_file_input: Path) -> None:
+        """Every subscriber should receive the same bytes and the slow subscriber should be dropped."""
+        total, output1, output2, result_slow = asyncio.run(Broadcast(0.1).execute(path_file_input))
+        assert isinstance(total, int)
+        assert total > 0
+        assert output1 == output2
+        assert isinstance(output1, bytes)
+        assert len(output1) == total
+        assert isinstance(result_slow, StdoutSubscriberDroppedError)
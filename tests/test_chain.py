@@ -0,0 +1,74 @@
+"""Tests for FFmpegProcessChain."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegProcessError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from asyncffmpeg import FFmpegProcessChain
+    from asyncffmpeg import StreamSpec
+
+
+class CreateStreamSpecsCoroutineChain:
+    """Coroutine to create stream specs: filter stage and then encode stage."""
+
+    def __init__(self, path_file_input: Path, path_file_output: Path) -> None:
+        self.path_file_input = path_file_input
+        self.path_file_output = path_file_output
+
+    async def create(self) -> list[StreamSpec]:
+        stream = ffmpeg.filter(ffmpeg.input(self.path_file_input), "scale", 192, -1)
+        stage_filter = ffmpeg.output(stream, "pipe:", format="nut", vcodec="rawvideo")
+        stage_encode = ffmpeg.output(ffmpeg.input("pipe:", format="nut"), str(self.path_file_output))
+        return [stage_filter, stage_encode]
+
+
+class CreateStreamSpecsSingle:
+    async def create(self) -> list[StreamSpec]:
+        return [ffmpeg.output(ffmpeg.input("in.mp4"), "out.mp4")]
+
+
+class TestFFmpegProcessChain:
+    """Tests for FFmpegProcessChain."""
+
+    @staticmethod
+    def test(path_file_input: Path, path_file_output: Path) -> None:
+        """Output of the last stage should exist and every stage should finish."""
+        chains: list[FFmpegProcessChain] = []
+
+        async def after_start(chain: FFmpegProcessChain) -> None:
+            chains.append(chain)
+
+        create_stream_specs = CreateStreamSpecsCoroutineChain(path_file_input, path_file_output).create
+        asyncio.run(FFmpegCoroutineFactory.create().execute_chain(create_stream_specs, after_start=after_start))
+        assert path_file_output.exists()
+        assert [ffmpeg_process.popen.returncode for ffmpeg_process in chains[0].ffmpeg_processes] == [0, 0]
+
+    @staticmethod
+    def test_error(path_file_input: Path, tmp_path: Path) -> None:
+        """Failure of the last stage should be raised and the first stage should be quitted."""
+        chains: list[FFmpegProcessChain] = []
+
+        async def after_start(chain: FFmpegProcessChain) -> None:
+            chains.append(chain)
+
+        path_file_output = tmp_path / "not_exist" / "out.mp4"
+        create_stream_specs = CreateStreamSpecsCoroutineChain(path_file_input, path_file_output).create
+        with pytest.raises(FFmpegProcessError):
+            asyncio.run(FFmpegCoroutineFactory.create().execute_chain(create_stream_specs, after_start=after_start))
+        assert all(ffmpeg_process.popen.poll() is not None for ffmpeg_process in chains[0].ffmpeg_processes)
+
+    @staticmethod
+    def test_single_stage() -> None:
+        """Chain should reject single stream spec."""
+        with pytest.raises(ValueError, match="at least 2"):
+            asyncio.run(FFmpegCoroutineFactory.create().execute_chain(CreateStreamSpecsSingle().create))
@@ -0,0 +1,185 @@
+"""Tests for classification of FFmpeg failure."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Callable
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegDiskFullError
+from asyncffmpeg import FFmpegEncoderNotFoundError
+from asyncffmpeg import FFmpegInputNotFoundError
+from asyncffmpeg import FFmpegInvalidFilterGraphError
+from asyncffmpeg import FFmpegInvalidOptionError
+from asyncffmpeg import FFmpegJob
+from asyncffmpeg import FFmpegOutputExistsError
+from asyncffmpeg import FFmpegProcessError
+from asyncffmpeg import FFmpegResourceLimitError
+from asyncffmpeg.ffmpegprocess.classifier import ErrorClassifier
+
+if TYPE_CHECKING:
+    from asyncffmpeg import StreamSpec
+
+# Stand-in of FFmpeg which keeps running after fatal error until key Q, since FFmpeg exits soon by itself.
+SOURCE_FFMPEG_FATAL = """#!{executable}
+import select, sys
+print("[vost#0:0 @ 0x2e466a40] Unknown encoder 'x'", file=sys.stderr, flush=True)
+select.select([sys.stdin], [], [], 600)
+sys.exit(255)
+"""
+
+
+def create_input_not_found(path_file_input: Path, path_file_output: Path) -> StreamSpec:
+    return ffmpeg.input(str(path_file_input.with_name("not_exist.mp4"))).output(str(path_file_output))
+
+
+def create_output_exists(path_file_input: Path, path_file_output: Path) -> StreamSpec:
+    shutil.copy(path_file_input, path_file_output)
+    return ffmpeg.input(str(path_file_input)).output(str(path_file_output)).global_args("-n")
+
+
+def create_encoder_not_found(path_file_input: Path, path_file_output: Path) -> StreamSpec:
+    return ffmpeg.input(str(path_file_input)).output(str(path_file_output), vcodec="not_exist")
+
+
+def create_invalid_filter_graph(path_file_input: Path, path_file_output: Path) -> StreamSpec:
+    return ffmpeg.input(str(path_file_input)).video.filter("not_exist").output(str(path_file_output))
+
+
+def create_invalid_option(path_file_input: Path, path_file_output: Path) -> StreamSpec:
+    return ffmpeg.input(str(path_file_input)).output(str(path_file_output), vcodec="libx264", preset="not_exist")
+
+
+class TestErrorClassifier:
+    """Tests for ErrorClassifier."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("create", "expected"),
+        [
+            (create_input_not_found, FFmpegInputNotFoundError),
+            (create_output_exists, FFmpegOutputExistsError),
+            (create_encoder_not_found, FFmpegEncoderNotFoundError),
+            (create_invalid_filter_graph, FFmpegInvalidFilterGraphError),
+            (create_invalid_option, FFmpegInvalidOptionError),
+        ],
+    )
+    def test(
+        path_file_input: Path,
+        path_file_output: Path,
+        create: Callable[[Path, Path], StreamSpec],
+        expected: type[FFmpegProcessError],
+    ) -> None:
+        """Failure should be raised as the specific subclass of FFmpegProcessError."""
+
+        async def create_stream_spec() -> StreamSpec:
+            return create(path_file_input, path_file_output)
+
+        with pytest.raises(expected):
+            asyncio.run(FFmpegCoroutineFactory.create().execute(create_stream_spec))
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("line", "expected"),
+        [
+            ("[vost#0:0 @ 0x2e466a40] Unknown encoder 'not_exist'", FFmpegEncoderNotFoundError),
+            ("[AVFilterGraph @ 0x1b1c7500] No such filter: 'not_exist'", FFmpegInvalidFilterGraphError),
+            ("[libx264 @ 0x2cad7200] Error setting option crf to value abc.", FFmpegInvalidOptionError),
+            ("[out#0/s16le @ 0x19aa4600] Error writing trailer: No space left on device", FFmpegDiskFullError),
+            (
+                "[tee @ 0x153baa40] Slave muxer #0 failed: No space left on device, continuing with 1/2 slaves.",
+                FFmpegDiskFullError,
+            ),
+            ("Input #0, mov,mp4,m4a,3gp,3g2,mj2, from '/tmp/Unknown encoder 'x'.mp4':", None),
+            ("    title           : No space left on device", None),
+            ("  configuration: --enable-gpl --enable-libx264", None),
+            ("Error opening input file /tmp/Unknown encoder 'x'.mp4.", None),
+            ("Error opening output file /tmp/a: No space left on device/Unrecognized option 'x'.", None),
+        ],
+    )
+    def test_feed(line: str, expected: type[FFmpegProcessError] | None) -> None:
+        """Signatures should match only lines of the format which FFmpeg writes, not file names or metadata."""
+        error_classifier = ErrorClassifier()
+        error_classifier.feed(line)
+        assert error_classifier.error_class is expected
+        assert error_classifier.line == (None if expected is None else line)
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("cpu_time_limited", "expected"),
+        [(True, FFmpegResourceLimitError), (False, FFmpegProcessError)],
+    )
+    def test_hard_exit(cpu_time_limited: bool, expected: type[FFmpegProcessError]) -> None:  # noqa: FBT001
+        """Hard exit on repeated signals is classified as resource limit only when CPU time is limited."""
+        error_classifier = ErrorClassifier(cpu_time_limited=cpu_time_limited)
+        error_classifier.feed("Received > 3 system signals, hard exiting")
+        assert error_classifier.error_class is None
+        error = error_classifier.create_error("", 123)
+        assert type(error) is expected
+
+    @staticmethod
+    def test_success_not_overridden(path_file_input: Path, tmp_path: Path) -> None:
+        """Success shouldn't be overridden by signatures in file names and metadata."""
+        path_file_copy = tmp_path / "Unknown encoder 'x' No space left on device.mp4"
+        shutil.copy(path_file_input, path_file_copy)
+        path_file_output = tmp_path / "Error opening input: No such file or directory.mp4"
+
+        async def create_stream_spec() -> StreamSpec:
+            stream = ffmpeg.input(str(path_file_copy))
+            title = "Unrecognized option 'x'."
+            return stream.output(str(path_file_output), c="copy", metadata=f"title={title}")
+
+        result = asyncio.run(FFmpegCoroutineFactory.create().execute(create_stream_spec))
+        assert result.return_code == 0
+        assert path_file_output.stat().st_size > 0
+
+    @staticmethod
+    def test_abort(tmp_path: Path) -> None:
+        """FFmpeg should be aborted as soon as fatal error appears instead of waiting for its exit."""
+        path_executable = tmp_path / "ffmpeg"
+        path_executable.write_text(SOURCE_FFMPEG_FATAL.format(executable=sys.executable))
+        path_executable.chmod(0o700)
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(time_to_force_termination=1)
+        time_start = time.monotonic()
+        with pytest.raises(FFmpegEncoderNotFoundError):
+            asyncio.run(ffmpeg_coroutine.execute_job(FFmpegJob((str(path_executable),))))
+        assert time.monotonic() - time_start < 10  # noqa: PLR2004
+        assert ffmpeg_coroutine.ffmpeg_process is not None
+        assert ffmpeg_coroutine.ffmpeg_process.popen.returncode is not None
+
+    @staticmethod
+    @pytest.mark.skipif(not Path("/dev/full").exists(), reason="/dev/full isn't available")
+    def test_not_aborted_on_recoverable_error() -> None:
+        """Error which FFmpeg recovers from doesn't abort the job, and classifies failure only at exit."""
+
+        async def create_stream_spec() -> StreamSpec:
+            stream = ffmpeg.input("sine=duration=1", f="lavfi")
+            # The tee muxer keeps writing into the other output after writing into the full disk failed.
+            tee = "[f=s16le:onfail=ignore]/dev/full|[f=null]-"
+            return stream.output(tee, f="tee", acodec="pcm_s16le", map="0")
+
+        result = asyncio.run(FFmpegCoroutineFactory.create().execute(create_stream_spec))
+        assert result.return_code == 0
+
+        async def create_stream_spec_failed() -> StreamSpec:
+            return ffmpeg.input("sine=duration=1", f="lavfi").output("/dev/full", f="s16le").overwrite_output()
+
+        with pytest.raises(FFmpegDiskFullError):
+            asyncio.run(FFmpegCoroutineFactory.create().execute(create_stream_spec_failed))
+
+    @staticmethod
+    def test_fatal_after_recoverable() -> None:
+        """Fatal error which appears after recoverable one takes precedence."""
+        error_classifier = ErrorClassifier()
+        error_classifier.feed("[out#0/s16le @ 0x19aa4600] Error writing trailer: No space left on device")
+        assert (error_classifier.error_class, error_classifier.fatal) == (FFmpegDiskFullError, False)
+        error_classifier.feed("[vost#0:0 @ 0x2e466a40] Unknown encoder 'not_exist'")
+        assert (error_classifier.error_class, error_classifier.fatal) == (FFmpegEncoderNotFoundError, True)
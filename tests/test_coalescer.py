@@ -0,0 +1,98 @@
+"""Tests for FFmpegCoalescer."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+from typing import Callable
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoalescer
+from asyncffmpeg import FFmpegProcessError
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from pathlib import Path
+
+    from asyncffmpeg import StreamSpec
+
+
+def create_job(path_file_output: Path, *, overwrite: bool = True) -> Callable[[], Awaitable[StreamSpec]]:
+    """Tiny job which encodes 0.1 second sine wave."""
+
+    async def create_stream_spec() -> StreamSpec:
+        stream = ffmpeg.input("sine=duration=0.1", f="lavfi").audio.output(str(path_file_output))
+        return stream.overwrite_output() if overwrite else stream
+
+    return create_stream_spec
+
+
+async def execute_all(coalescer: FFmpegCoalescer, jobs: list[Callable[[], Awaitable[StreamSpec]]]) -> list[object]:
+    return await asyncio.gather(*(coalescer.execute(job) for job in jobs), return_exceptions=True)
+
+
+class TestFFmpegCoalescer:
+    """Tests for FFmpegCoalescer."""
+
+    @staticmethod
+    def test(tmp_path: Path) -> None:
+        """Compatible jobs should be run in a single invocation."""
+        paths = [tmp_path / f"{index}.wav" for index in range(4)]
+        coalescer = FFmpegCoalescer()
+        results = asyncio.run(execute_all(coalescer, [create_job(path) for path in paths]))
+        assert results == [None] * len(paths)
+        assert all(path.exists() for path in paths)
+        assert coalescer.number_of_invocations == 1
+
+    @staticmethod
+    def test_incompatible(tmp_path: Path) -> None:
+        """Jobs with different global args and jobs without stream selector should be run separately."""
+
+        async def create_stream_spec_without_selector() -> StreamSpec:
+            return ffmpeg.input("sine=duration=0.1", f="lavfi").output(str(tmp_path / "2.wav"))
+
+        jobs = [
+            create_job(tmp_path / "0.wav"),
+            create_job(tmp_path / "1.wav", overwrite=False),
+            create_stream_spec_without_selector,
+        ]
+        coalescer = FFmpegCoalescer()
+        asyncio.run(execute_all(coalescer, jobs))
+        expected_number_of_invocations = 3
+        assert coalescer.number_of_invocations == expected_number_of_invocations
+
+    @staticmethod
+    def test_max_jobs(tmp_path: Path) -> None:
+        """Full batch should be run without waiting the window."""
+        coalescer = FFmpegCoalescer(second_window=60, max_jobs=2)
+        jobs = [create_job(tmp_path / f"{index}.wav") for index in range(2)]
+        asyncio.run(asyncio.wait_for(execute_all(coalescer, jobs), 30))
+        assert coalescer.number_of_invocations == 1
+
+    @staticmethod
+    @pytest.mark.parametrize("overwrite", [True, False])
+    def test_fallback(tmp_path: Path, *, overwrite: bool) -> None:
+        """Failed batch should be run one by one and only the failed job should raise.
+
+        Outputs which the batch created are removed before, otherwise FFmpeg prompts whether to overwrite them.
+        """
+        paths = [tmp_path / "0.wav", tmp_path / "not_exist" / "1.wav", tmp_path / "2.wav"]
+        coalescer = FFmpegCoalescer()
+        jobs = [create_job(path, overwrite=overwrite) for path in paths]
+        results = asyncio.run(asyncio.wait_for(execute_all(coalescer, jobs), 30))
+        assert results[0] is None
+        assert isinstance(results[1], FFmpegProcessError)
+        assert results[2] is None
+        assert paths[0].exists()
+        assert paths[2].exists()
+        assert coalescer.number_of_invocations == 1 + len(paths)
+
+    @staticmethod
+    def test_type_error() -> None:
+        async def create_stream_spec() -> StreamSpec:
+            return [ffmpeg.input("in.mp4").output("out.mp4")]
+
+        with pytest.raises(TypeError, match="stream spec of output"):
+            asyncio.run(FFmpegCoalescer().execute(create_stream_spec))
@@ -0,0 +1,140 @@
+"""Tests for FFmpeg daemon."""
+
+from __future__ import annotations
+
+import asyncio
+import stat
+from typing import TYPE_CHECKING
+from typing import Any
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegDaemon
+from asyncffmpeg import FFmpegDaemonClient
+from asyncffmpeg import FFmpegInputNotFoundError
+from asyncffmpeg import FFmpegJob
+from asyncffmpeg import FFmpegProcessError
+from asyncffmpeg.daemon import LIMIT_MESSAGE
+from asyncffmpeg.daemon import create_error
+from asyncffmpeg.daemon import create_error_message
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+async def serve(path_socket: Path, client: Callable[[], Awaitable[Any]]) -> Any:  # noqa: ANN401
+    daemon = FFmpegDaemon(path_socket, max_jobs=1, second_progress=0.1)
+    await daemon.start()
+    try:
+        return await client()
+    finally:
+        await daemon.close()
+
+
+class TestFFmpegDaemon:
+    """Tests for FFmpegDaemon and FFmpegDaemonClient."""
+
+    @staticmethod
+    def test(path_file_input: Path, tmp_path: Path) -> None:
+        """Jobs of multiple clients are executed with progress and result."""
+        path_socket = tmp_path / "daemon.sock"
+        paths_output = [tmp_path / f"out{index}.mp4" for index in range(2)]
+        progresses: list[dict[str, str]] = []
+
+        async def client() -> list[Any]:
+            jobs = [
+                FFmpegJob.from_stream_spec(ffmpeg.input(str(path_file_input)).output(str(path), vcodec="libx264"))
+                for path in paths_output
+            ]
+            client = FFmpegDaemonClient(path_socket)
+            return await asyncio.gather(*(client.execute(job, on_progress=progresses.append) for job in jobs))
+
+        results = asyncio.run(serve(path_socket, client))
+        expected_frames = 449
+        assert [result.frames for result in results] == [expected_frames, expected_frames]
+        assert all(path.exists() for path in paths_output)
+        assert progresses
+        assert not path_socket.exists()
+
+    @staticmethod
+    def test_socket(tmp_path: Path) -> None:
+        """Socket is bound in a private directory and moved into the path after only the owner can connect to it."""
+        path_socket = tmp_path / "daemon.sock"
+
+        async def client() -> int:
+            return stat.S_IMODE(path_socket.stat().st_mode)
+
+        assert asyncio.run(serve(path_socket, client)) == 0o600  # noqa: PLR2004
+        assert not list(tmp_path.iterdir())
+
+    @staticmethod
+    def test_ffmpeg_error(path_file_input: Path, tmp_path: Path) -> None:
+        """Error of FFmpeg is restored in client."""
+        path_socket = tmp_path / "daemon.sock"
+        job = FFmpegJob(("ffmpeg", "-i", str(path_file_input.with_name("not_exist.mp4")), str(tmp_path / "out.mp4")))
+
+        with pytest.raises(FFmpegInputNotFoundError) as excinfo:
+            asyncio.run(serve(path_socket, lambda: FFmpegDaemonClient(path_socket).execute(job)))
+        assert excinfo.value.exit_code != 0
+
+    @staticmethod
+    def test_cancel(path_file_input: Path, tmp_path: Path) -> None:
+        """Cancelled client quits FFmpeg so that the concurrency budget is released."""
+        path_socket = tmp_path / "daemon.sock"
+        stream = ffmpeg.input("testsrc=duration=60:rate=30", f="lavfi", re=None)
+        job_long = FFmpegJob.from_stream_spec(stream.output(str(tmp_path / "long.mp4")))
+        job = FFmpegJob.from_stream_spec(ffmpeg.input(str(path_file_input)).output(str(tmp_path / "out.mp4")))
+
+        async def client() -> Any:  # noqa: ANN401
+            client = FFmpegDaemonClient(path_socket)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.execute(job_long), 1)
+            return await asyncio.wait_for(client.execute(job), 30)
+
+        assert asyncio.run(serve(path_socket, client)).return_code == 0
+
+    @staticmethod
+    def test_invalid_job(tmp_path: Path) -> None:
+        """Invalid job is reported as error message."""
+        path_socket = tmp_path / "daemon.sock"
+
+        async def client() -> None:
+            reader, writer = await asyncio.open_unix_connection(str(path_socket))
+            writer.write(b'{"arguments": ["rm", "-rf", "/"]}\n')
+            line = await reader.readline()
+            writer.close()
+            assert b"ValueError" in line
+
+        asyncio.run(serve(path_socket, client))
+
+    @staticmethod
+    def test_executable(path_file_input: Path, tmp_path: Path) -> None:
+        """Executable sent by client is replaced with the one which the daemon is configured with."""
+        path_socket = tmp_path / "daemon.sock"
+        path_executable = tmp_path / "evil" / "ffmpeg"
+        path_executable.parent.mkdir()
+        path_executable.write_text('#!/bin/sh\ntouch "$0.executed"\n')
+        path_executable.chmod(0o700)
+        path_output = tmp_path / "out.mp4"
+        job = FFmpegJob((str(path_executable), "-i", str(path_file_input), "-t", "1", str(path_output)))
+        result = asyncio.run(serve(path_socket, lambda: FFmpegDaemonClient(path_socket).execute(job)))
+        assert result.return_code == 0
+        assert path_output.exists()
+        assert not path_executable.with_name("ffmpeg.executed").exists()
+
+
+class TestCreateErrorMessage:
+    """Tests for create_error_message()."""
+
+    @staticmethod
+    def test_truncated() -> None:
+        """Long stderr is truncated into its tail, so that the message fits in a line which client can read."""
+        stderr = "x" * LIMIT_MESSAGE + "Error opening input"
+        error = create_error(create_error_message(FFmpegProcessError(stderr, 1)))
+        assert isinstance(error, FFmpegProcessError)
+        assert len(error.args[0]) == LIMIT_MESSAGE
+        assert error.args[0].endswith("Error opening input")
+        assert error.exit_code == 1
@@ -0,0 +1,110 @@
+"""Tests for FrameExtractor."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegJob
+from asyncffmpeg import FrameExtractor
+from asyncffmpeg import IntervalSelection
+from asyncffmpeg import SceneChangeSelection
+from asyncffmpeg import SeekStrategy
+from asyncffmpeg import TimestampSelection
+from asyncffmpeg.frame_extractor import PngSplitter
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def create_input_scene_change(path: Path) -> Path:
+    """Create input whose scene changes once from black to white."""
+    scenes = (ffmpeg.input(f"color={color}:duration=1:size=160x120", f="lavfi") for color in ["black", "white"])
+    stream_spec = ffmpeg.concat(*scenes).output(str(path), vcodec="libx264")
+    asyncio.run(FFmpegCoroutineFactory.create().execute_job(FFmpegJob.from_stream_spec(stream_spec)))
+    return path
+
+
+class TestTimestampSelection:
+    """Tests for TimestampSelection."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("timestamps", "expected"),
+        [
+            ([1.0, 2.0, 3.0], SeekStrategy.SINGLE_PASS),
+            ([0.5, 30.0, 60.0], SeekStrategy.MULTI_SEEK),
+            ([3.0], SeekStrategy.MULTI_SEEK),
+        ],
+    )
+    def test_choose_strategy(timestamps: list[float], expected: SeekStrategy) -> None:
+        """Dense timestamps should be single pass and sparse timestamps should be multi seek."""
+        assert TimestampSelection(timestamps).choose_strategy() is expected
+
+    @staticmethod
+    def test_empty() -> None:
+        with pytest.raises(ValueError, match="Timestamps are required"):
+            TimestampSelection([])
+
+
+class TestFrameExtractor:
+    """Tests for FrameExtractor."""
+
+    @staticmethod
+    @pytest.mark.parametrize("strategy", [SeekStrategy.SINGLE_PASS, SeekStrategy.MULTI_SEEK])
+    def test_read(path_file_input: Path, strategy: SeekStrategy) -> None:
+        """Each timestamp should become a PNG image in memory."""
+        selection = TimestampSelection([1.0, 1.5, 4.0, 4.0, 6.5], strategy=strategy)
+        images = asyncio.run(FrameExtractor(path_file_input, selection).read())
+        expected_number_of_images = 4
+        assert len(images) == expected_number_of_images
+        assert all(image.startswith(PNG_SIGNATURE) for image in images)
+
+    @staticmethod
+    def test_read_error(path_file_input: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Error while reading stdout should quit FFmpeg and be raised."""
+
+        def feed(_self: PngSplitter, _chunk: bytes) -> None:
+            msg = "Failed to split"
+            raise RuntimeError(msg)
+
+        monkeypatch.setattr(PngSplitter, "feed", feed)
+        with pytest.raises(RuntimeError, match="Failed to split"):
+            asyncio.run(FrameExtractor(path_file_input, IntervalSelection(1)).read())
+
+    @staticmethod
+    def test_save_interval(path_file_input: Path, tmp_path: Path) -> None:
+        """A frame per interval should be saved into the directory."""
+        paths = asyncio.run(FrameExtractor(path_file_input, IntervalSelection(2)).save(tmp_path))
+        expected_number_of_images = 4  # Duration is 7.49 seconds.
+        assert len(paths) == expected_number_of_images
+        assert all(path.read_bytes().startswith(PNG_SIGNATURE) for path in paths)
+
+    @staticmethod
+    def test_save_scene_change(tmp_path: Path) -> None:
+        """Frames at scene change should be saved into the directory."""
+        path_file_input = create_input_scene_change(tmp_path / "input.mp4")
+        directory = tmp_path / "frames"
+        directory.mkdir()
+        paths = asyncio.run(FrameExtractor(path_file_input, SceneChangeSelection(0.1)).save(directory))
+        assert len(paths) == 1
+        assert all(path.name.startswith("frame_") for path in paths)
+
+    @staticmethod
+    def test_save_twice(path_file_input: Path, tmp_path: Path) -> None:
+        """Saving into the same directory again shouldn't overwrite frames saved before."""
+        frame_extractor = FrameExtractor(path_file_input, IntervalSelection(2))
+        paths_first = asyncio.run(frame_extractor.save(tmp_path))
+        images_first = [path.read_bytes() for path in paths_first]
+        paths_second = asyncio.run(frame_extractor.save(tmp_path))
+        expected_number_of_images = 4
+        assert len(paths_second) == expected_number_of_images
+        assert not set(paths_first) & set(paths_second)
+        assert [path.read_bytes() for path in paths_first] == images_first
+        assert sorted(tmp_path.iterdir()) == sorted(paths_first + paths_second)
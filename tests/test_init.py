@@ -0,0 +1,88 @@
+"""Tests for lazy import of the package."""
+
+from __future__ import annotations
+
+import importlib
+import statistics
+import subprocess  # nosec
+import sys
+import time
+from logging import getLogger
+
+import pytest
+
+import asyncffmpeg
+
+# Heavy modules which importing the package shouldn't import.
+MODULES_HEAVY = ["asyncio", "ffmpeg", "livesubprocess", "numpy", "asyncffmpeg.ffmpeg_coroutine"]
+# Modules which only some jobs use, so that creating coroutine shouldn't import them.
+MODULES_ON_DEMAND = ["ffmpeg", "asyncffmpeg.ffmpegprocess.chain", "asyncffmpeg.io_channel"]
+NUMBER_OF_IMPORTS = 10
+# Importing ffmpeg-python, asyncio and submodules eagerly takes tens of milliseconds, lazily about a millisecond.
+SECOND_THRESHOLD_IMPORT = 0.05
+
+
+def measure_seconds(code: str) -> float:
+    """Measure seconds to run the code in fresh process of the same Python interpreter."""
+    start = time.perf_counter()
+    # Reason: Runs the same Python interpreter to import the package in fresh process.
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603  # nosec
+    return time.perf_counter() - start
+
+
+class TestLazyImport:
+    """Tests for lazy import of public names."""
+
+    @staticmethod
+    def test_heavy_modules_not_imported() -> None:
+        """Importing the package doesn't import heavy modules until public names are accessed.
+
+        Accessing the factory doesn't import modules which only some jobs use.
+        """
+        code = (
+            "import sys, asyncffmpeg\n"
+            f"print([module for module in {MODULES_HEAVY!r} if module in sys.modules])\n"
+            "asyncffmpeg.FFmpegCoroutineFactory\n"
+            f"print([module for module in {MODULES_ON_DEMAND!r} if module in sys.modules])\n"
+        )
+        # Reason: Runs the same Python interpreter to import the package in fresh process.
+        completed_process = subprocess.run(  # noqa: S603  # nosec
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        assert completed_process.stdout.splitlines() == ["[]", "[]"]
+
+    @staticmethod
+    def test_modules_match_all() -> None:
+        """Each public name is mapped to the module which exports it."""
+        for name, module in asyncffmpeg.MODULES.items():
+            assert name in importlib.import_module(module).__all__
+        for module in set(asyncffmpeg.MODULES.values()):
+            for name in importlib.import_module(module).__all__:
+                assert asyncffmpeg.MODULES[name] == module
+
+    @staticmethod
+    def test_import_all_without_numpy() -> None:
+        """All public names are importable without NumPy, which is an optional extra."""
+        # Blocks import of NumPy as if it isn't installed.
+        code = "import sys\nsys.modules['numpy'] = None\nfrom asyncffmpeg import *\nSampleFormat.F32LE\n"
+        # Reason: Runs the same Python interpreter to import the package in fresh process.
+        subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603  # nosec
+
+    @staticmethod
+    def test_unknown_attribute() -> None:
+        """Unknown name raises AttributeError as usual module."""
+        with pytest.raises(AttributeError, match="has no attribute 'not_exist'"):
+            _ = asyncffmpeg.not_exist
+
+    @staticmethod
+    @pytest.mark.slow
+    def test_benchmark_import_time() -> None:
+        """Benchmark time to import the package in fresh process, excluding startup of the interpreter."""
+        startups = [measure_seconds("pass") for _ in range(NUMBER_OF_IMPORTS)]
+        imports = [measure_seconds("import asyncffmpeg") for _ in range(NUMBER_OF_IMPORTS)]
+        second_import = statistics.median(imports) - statistics.median(startups)
+        getLogger(__name__).info("import asyncffmpeg: median %.2f ms", second_import * 1000)
+        assert second_import < SECOND_THRESHOLD_IMPORT
@@ -0,0 +1,200 @@
+"""Tests for IO channels."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import pickle
+import struct
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegProcessError
+from asyncffmpeg import FFmpegResult
+from asyncffmpeg import FifoInput
+from asyncffmpeg import FifoOutput
+from asyncffmpeg import StagedOutput
+from asyncffmpeg import UnixSocketInput
+from asyncffmpeg import UnixSocketOutput
+from asyncffmpeg.io_channel import IOChannels
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from asyncffmpeg import IOChannel
+    from asyncffmpeg import StreamSpec
+
+SAMPLE_RATE = 8000
+
+
+async def generate_sine_wave() -> AsyncIterator[bytes]:
+    """Yield 1 second of 440 Hz mono PCM s16le by 0.1 seconds."""
+    for block in range(10):
+        start = block * SAMPLE_RATE // 10
+        samples = (
+            int(10000 * math.sin(2 * math.pi * 440 * index / SAMPLE_RATE)) for index in range(start, start + 800)
+        )
+        yield struct.pack("<800h", *samples)
+        await asyncio.sleep(0)
+
+
+async def generate_large() -> AsyncIterator[bytes]:
+    """Yield about 2 minutes of the PCM, which is longer than FFmpeg reads when output option `t` is set."""
+    for _ in range(2000):
+        yield bytes(64 * 1024)
+
+
+class Collector:
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    async def sink(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+
+
+class CreateStreamSpecCoroutineMux:
+    """Coroutine to create stream spec to mux 2 audio inputs into 1 output."""
+
+    def __init__(self, input1: IOChannel, input2: IOChannel, output: IOChannel | Path) -> None:
+        self.input1 = input1
+        self.input2 = input2
+        self.output = output
+
+    async def create(self) -> StreamSpec:
+        stream1 = ffmpeg.input(self.input1.url, format="s16le", ar=SAMPLE_RATE, ac=1)
+        stream2 = ffmpeg.input(self.input2.url, format="s16le", ar=SAMPLE_RATE, ac=1)
+        url = str(self.output) if isinstance(self.output, Path) else self.output.url
+        return ffmpeg.output(stream1, stream2, url, format="nut", acodec="pcm_s16le").overwrite_output()
+
+
+class TestIOChannel:
+    """Tests for IO channels."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("class_input", "class_output"),
+        [(FifoInput, FifoOutput), (UnixSocketInput, UnixSocketOutput)],
+    )
+    def test_mux(
+        class_input: type[FifoInput | UnixSocketInput],
+        class_output: type[FifoOutput | UnixSocketOutput],
+    ) -> None:
+        """Both inputs should be muxed into output and paths should be removed."""
+        collector = Collector()
+        input1 = class_input(generate_sine_wave)
+        input2 = FifoInput(generate_sine_wave)
+        output = class_output(collector.sink)
+        create_stream_spec = CreateStreamSpecCoroutineMux(input1, input2, output).create
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create()
+        asyncio.run(ffmpeg_coroutine.execute(create_stream_spec, io_channels=[input1, input2, output]))
+        output_bytes = b"".join(collector.chunks)
+        minimum_size_two_streams = 2 * 2 * SAMPLE_RATE
+        assert output_bytes.startswith(b"nut/multimedia container")
+        assert len(output_bytes) > minimum_size_two_streams
+        assert not any(channel.directory.exists() for channel in [input1, input2, output])
+
+    @staticmethod
+    def test_error(tmp_path: Path) -> None:
+        """Paths should be removed even when FFmpeg fails."""
+        input1 = FifoInput(generate_sine_wave)
+        input2 = UnixSocketInput(generate_sine_wave)
+        output = tmp_path / "not_exist" / "out.nut"
+        create_stream_spec = CreateStreamSpecCoroutineMux(input1, input2, output).create
+        with pytest.raises(FFmpegProcessError):
+            asyncio.run(FFmpegCoroutineFactory.create().execute(create_stream_spec, io_channels=[input1, input2]))
+        assert not input1.directory.exists()
+        assert not input2.directory.exists()
+
+    @staticmethod
+    @pytest.mark.parametrize("class_input", [FifoInput, UnixSocketInput])
+    def test_closed_early(class_input: type[FifoInput | UnixSocketInput], path_file_output: Path) -> None:
+        """Input which FFmpeg closes before the end should be finished normally when FFmpeg succeeds."""
+        channel = class_input(generate_large)
+
+        async def create_stream_spec() -> StreamSpec:
+            stream = ffmpeg.input(channel.url, format="s16le", ar=SAMPLE_RATE, ac=1)
+            return stream.output(str(path_file_output), t=0.5)
+
+        result = asyncio.run(FFmpegCoroutineFactory.create().execute(create_stream_spec, io_channels=[channel]))
+        assert result.return_code == 0
+        assert path_file_output.stat().st_size > 0
+        assert not channel.directory.exists()
+
+
+class TestIOChannels:
+    """Tests for IOChannels."""
+
+    @staticmethod
+    @pytest.mark.parametrize(("return_code", "expected_raised"), [(0, False), (1, True)])
+    def test_join_closed_early(return_code: int, expected_raised: bool) -> None:  # noqa: FBT001
+        """Input closed before the end is the normal end only when FFmpeg exited successfully."""
+        io_channels = IOChannels([FifoInput(generate_large)])
+
+        async def join() -> None:
+            future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            future.set_exception(BrokenPipeError())
+            io_channels.tasks = [future]
+            await io_channels.join(FFmpegResult(return_code))
+
+        if expected_raised:
+            with pytest.raises(BrokenPipeError):
+                asyncio.run(join())
+        else:
+            asyncio.run(join())
+
+
+class TestStagedOutput:
+    """Tests for StagedOutput."""
+
+    @staticmethod
+    @pytest.mark.parametrize("directory_scratch", [None, Path("/dev/shm")])  # noqa: S108
+    def test(path_file_input: Path, path_file_output: Path, directory_scratch: Path | None) -> None:
+        """Output should be moved into destination, including across file systems."""
+        if directory_scratch is not None and not directory_scratch.is_dir():
+            pytest.skip("tmpfs isn't available")
+        output = StagedOutput(path_file_output, directory_scratch=directory_scratch)
+
+        async def create_stream_spec() -> StreamSpec:
+            return ffmpeg.input(str(path_file_input)).output(output.url, t=1)
+
+        asyncio.run(FFmpegCoroutineFactory.create().execute(create_stream_spec, io_channels=[output]))
+        assert path_file_output.stat().st_size > 0
+        assert [path.name for path in path_file_output.parent.iterdir()] == [path_file_output.name]
+        assert not output.directory.exists()
+
+    @staticmethod
+    def test_cancel(path_file_output: Path) -> None:
+        """Partial output should be removed and destination shouldn't be created on cancellation."""
+        output = StagedOutput(path_file_output)
+
+        async def create_stream_spec() -> StreamSpec:
+            return ffmpeg.input("testsrc=duration=60:rate=30", f="lavfi", re=None).output(output.url)
+
+        async def execute() -> None:
+            ffmpeg_coroutine = FFmpegCoroutineFactory.create()
+            task = asyncio.ensure_future(ffmpeg_coroutine.execute(create_stream_spec, io_channels=[output]))
+            await asyncio.sleep(1)
+            assert output.path.exists()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(execute())
+        assert not path_file_output.exists()
+        assert not output.directory.exists()
+
+    @staticmethod
+    def test_max_transfers(path_file_input: Path, path_file_output: Path) -> None:
+        """Maximum number of transfers is set per output, which can still be pickled into worker process."""
+        output = pickle.loads(pickle.dumps(StagedOutput(path_file_output, max_transfers=1)))  # noqa: S301  # nosec
+
+        async def create_stream_spec() -> StreamSpec:
+            return ffmpeg.input(str(path_file_input)).output(output.url, t=1)
+
+        asyncio.run(FFmpegCoroutineFactory.create().execute(create_stream_spec, io_channels=[output]))
+        assert output.max_transfers == 1
+        assert path_file_output.stat().st_size > 0
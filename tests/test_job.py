@@ -0,0 +1,54 @@
+"""Tests for FFmpeg job."""
+
+from __future__ import annotations
+
+import asyncio
+import pickle
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegJob
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class TestFFmpegJob:
+    """Tests for FFmpegJob."""
+
+    @staticmethod
+    def test_serialize(path_file_input: Path, path_file_output: Path) -> None:
+        """Job is restored from JSON and pickle."""
+        stream_spec = ffmpeg.input(str(path_file_input)).output(str(path_file_output), vcodec="libx264")
+        job = FFmpegJob.from_stream_spec(stream_spec)
+        assert list(job.arguments) == ffmpeg.compile(stream_spec)
+        assert FFmpegJob.from_json(job.to_json()) == job
+        # Reason: The job is pickled by this test itself.
+        assert pickle.loads(pickle.dumps(job)) == job  # noqa: S301  # nosec
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "text",
+        [
+            '{"arguments": []}',
+            '{"arguments": ["rm", "-rf", "/"]}',
+            '{"arguments": "ffmpeg -i input.mp4 output.mp4"}',
+            '{"arguments": ["ffmpeg", 1]}',
+            '["ffmpeg"]',
+        ],
+    )
+    def test_invalid(text: str) -> None:
+        """Job which isn't list of string arguments of FFmpeg is rejected."""
+        with pytest.raises(ValueError, match=r"Job has to be|Arguments have to"):
+            FFmpegJob.from_json(text)
+
+    @staticmethod
+    def test_execute_job(path_file_input: Path, path_file_output: Path) -> None:
+        """FFmpeg coroutine executes job without stream spec."""
+        text = FFmpegJob(("ffmpeg", "-i", str(path_file_input), "-t", "1", str(path_file_output))).to_json()
+        result = asyncio.run(FFmpegCoroutineFactory.create().execute_job(FFmpegJob.from_json(text)))
+        assert result.return_code == 0
+        assert path_file_output.exists()
@@ -0,0 +1,98 @@
+"""Tests for KeyframeIndexer."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+from typing import TYPE_CHECKING
+
+import pytest
+
+from asyncffmpeg import KeyframeIndex
+from asyncffmpeg import KeyframeIndexer
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# sample.mp4 has keyframes at 0 and 250250 / 60000 seconds.
+SECOND_SECOND_KEYFRAME = 250250 / 60000
+NUMBER_OF_FRAMES = 449
+
+
+class TestKeyframeIndexer:
+    """Tests for KeyframeIndexer."""
+
+    @staticmethod
+    def test(path_file_input: Path, tmp_path: Path) -> None:
+        """Concurrent requests share a build and the index is loaded from cache afterwards."""
+        directory_cache = tmp_path / "cache"
+        indexer = KeyframeIndexer(directory_cache)
+
+        async def index_concurrently() -> tuple[KeyframeIndex, KeyframeIndex]:
+            return await asyncio.gather(indexer.index(path_file_input), indexer.index(path_file_input))
+
+        index, index_shared = asyncio.run(index_concurrently())
+        assert index is index_shared
+        assert list(index.keyframes) == [0.0, SECOND_SECOND_KEYFRAME]
+        assert len(index.timestamps) == NUMBER_OF_FRAMES
+        assert [path.suffix for path in directory_cache.iterdir()] == [".kfidx"]
+
+        index_cached = asyncio.run(KeyframeIndexer(directory_cache).index(path_file_input))
+        assert isinstance(index_cached.keyframes, memoryview)
+        assert list(index_cached.keyframes) == list(index.keyframes)
+        assert list(index_cached.timestamps) == list(index.timestamps)
+
+    @staticmethod
+    def test_modified(path_file_input: Path, tmp_path: Path) -> None:
+        """Index is rebuilt when the input is modified."""
+        path_file_input_copy = tmp_path / "copy.mp4"
+        shutil.copy(path_file_input, path_file_input_copy)
+        directory_cache = tmp_path / "cache"
+        indexer = KeyframeIndexer(directory_cache)
+        asyncio.run(indexer.index(path_file_input_copy))
+        stat = path_file_input_copy.stat()
+        os.utime(path_file_input_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        asyncio.run(indexer.index(path_file_input_copy))
+        assert len(list(directory_cache.iterdir())) == 2  # noqa: PLR2004
+
+
+class TestKeyframeIndex:
+    """Tests for KeyframeIndex."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("second", "expected_before", "expected_after"),
+        [
+            (-1.0, 0.0, 0.0),
+            (0.0, 0.0, 0.0),
+            (2.0, 0.0, 4.0),
+            (4.0, 4.0, 4.0),
+            (5.0, 4.0, None),
+        ],
+    )
+    def test_keyframe(second: float, expected_before: float, expected_after: float | None) -> None:
+        """Nearest keyframes are resolved around the second."""
+        index = KeyframeIndex([0.0, 4.0], [0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+        assert index.keyframe_before(second) == expected_before
+        assert index.keyframe_after(second) == expected_after
+
+    @staticmethod
+    def test_frame_at() -> None:
+        """Frame displayed at the second is resolved."""
+        index = KeyframeIndex([0.0], [0.0, 0.5, 1.0])
+        assert index.frame_at(0.7) == 0.5  # noqa: PLR2004
+        assert index.frame_at(1.0) == 1.0
+
+    @staticmethod
+    def test_save_load(tmp_path: Path) -> None:
+        """Saved index is loaded and file other than index is rejected."""
+        path = tmp_path / "index.kfidx"
+        KeyframeIndex([0.0, 4.0], [0.0, 2.0, 4.0]).save(path)
+        index = KeyframeIndex.load(path)
+        assert list(index.keyframes) == [0.0, 4.0]
+        assert list(index.timestamps) == [0.0, 2.0, 4.0]
+        path_invalid = tmp_path / "invalid.kfidx"
+        path_invalid.write_bytes(b"\0" * 64)
+        with pytest.raises(ValueError, match="Not a keyframe index"):
+            KeyframeIndex.load(path_invalid)
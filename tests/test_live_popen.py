@@ -0,0 +1,37 @@
+"""Tests for LivePopenPosix."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess  # nosec
+import sys
+
+import pytest
+
+from asyncffmpeg.ffmpegprocess.live_popen import LivePopenPosix
+
+# Writes numbered lines into stderr and stdout.
+CODE = "import sys\nfor i in range(1000):\n    print(f'line {i}', file=sys.stderr)\n    print(f'out {i}')\n"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="test for POSIX only")
+class TestLivePopenPosix:
+    """Tests for LivePopenPosix."""
+
+    @staticmethod
+    def test_last_lines_kept(capfd: pytest.CaptureFixture[str]) -> None:
+        """All lines are notified, only the last lines of stderr are kept, and nothing is echoed into stdout."""
+        # Reason: Runs the same Python interpreter as a process which writes many lines.
+        popen = subprocess.Popen(  # noqa: S603  # nosec
+            [sys.executable, "-c", CODE],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        live_popen = LivePopenPosix(popen, max_lines_kept=3)
+        lines: list[str] = []
+        live_popen.listeners.append(lines.append)
+        output, return_code = asyncio.run(live_popen.wait())
+        assert return_code == 0
+        assert lines == [f"line {index}" for index in range(1000)]
+        assert output == "line 997\nline 998\nline 999"
+        assert capfd.readouterr().out == ""
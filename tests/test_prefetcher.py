@@ -0,0 +1,112 @@
+"""Tests for InputPrefetcher."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+from asyncffmpeg import FFmpegJob
+from asyncffmpeg import InputPrefetcher
+from asyncffmpeg import PrefetchStatistics
+from asyncffmpeg.prefetcher import is_resident
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def create_job(path_file_input: Path, path_file_output: Path) -> FFmpegJob:
+    return FFmpegJob(("ffmpeg", "-y", "-i", str(path_file_input), "-t", "1", str(path_file_output)))
+
+
+def evict(path: Path) -> None:
+    """Evict the file from page cache."""
+    with path.open("rb") as file:
+        os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+async def wait_resident(path: Path) -> None:
+    while not await asyncio.to_thread(is_resident, path):  # noqa: ASYNC110
+        await asyncio.sleep(0.1)
+
+
+@pytest.fixture
+def path_file_input_copy(path_file_input: Path, tmp_path: Path) -> Path:
+    """Copy of the input which is evicted from page cache."""
+    path = tmp_path / "copy.mp4"
+    shutil.copy(path_file_input, path)
+    # Dirty pages can't be evicted.
+    os.sync()
+    evict(path)
+    return path
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="test for POSIX only")
+class TestInputPrefetcher:
+    """Tests for InputPrefetcher."""
+
+    @staticmethod
+    def test(path_file_input_copy: Path, path_file_input: Path, tmp_path: Path) -> None:
+        """Inputs should be prefetched within the budget and counted as hits when they are in page cache."""
+        size = path_file_input_copy.stat().st_size
+        jobs = [
+            create_job(path_file_input_copy, tmp_path / "0.mp4"),
+            create_job(path_file_input, tmp_path / "1.mp4"),
+            # Input which doesn't exist isn't prefetched.
+            create_job(tmp_path / "not_exist.mp4", tmp_path / "2.mp4"),
+        ]
+        prefetcher = InputPrefetcher(budget=size)
+
+        async def execute() -> None:
+            assert not await asyncio.to_thread(is_resident, path_file_input_copy)
+            for job in jobs:
+                await prefetcher.prefetch(job)
+            assert prefetcher.bytes_in_budget == size
+            await asyncio.wait_for(wait_resident(path_file_input_copy), 10)
+            for job in jobs[:2]:
+                await prefetcher.execute_job(job)
+            await prefetcher.consume(jobs[2])
+
+        asyncio.run(execute())
+        assert prefetcher.statistics == PrefetchStatistics(hits=1, misses=0, skipped=1, bytes_prefetched=size)
+        assert prefetcher.bytes_in_budget == 0
+        assert not prefetcher.reservations
+        assert (tmp_path / "1.mp4").exists()
+
+    @staticmethod
+    def test_evicted(path_file_input_copy: Path, tmp_path: Path) -> None:
+        """Input evicted before the job starts is counted as miss."""
+        job = create_job(path_file_input_copy, tmp_path / "0.mp4")
+        prefetcher = InputPrefetcher()
+
+        async def execute() -> None:
+            await prefetcher.prefetch(job)
+            await asyncio.wait_for(wait_resident(path_file_input_copy), 10)
+            await asyncio.to_thread(evict, path_file_input_copy)
+            await prefetcher.consume(job)
+
+        asyncio.run(execute())
+        assert prefetcher.statistics.hits == 0
+        assert prefetcher.statistics.misses == 1
+
+    @staticmethod
+    def test_discard(path_file_input_copy: Path, path_file_input: Path, tmp_path: Path) -> None:
+        """Discarded job releases the budget for the next job."""
+        size = path_file_input_copy.stat().st_size
+        prefetcher = InputPrefetcher(budget=size)
+        job_discarded = create_job(path_file_input_copy, tmp_path / "0.mp4")
+        job = create_job(path_file_input, tmp_path / "1.mp4")
+
+        async def execute() -> None:
+            await prefetcher.prefetch(job_discarded)
+            prefetcher.discard(job_discarded)
+            assert prefetcher.bytes_in_budget == 0
+            await prefetcher.prefetch(job)
+
+        asyncio.run(execute())
+        assert prefetcher.statistics.skipped == 0
+        assert prefetcher.bytes_in_budget == size
@@ -0,0 +1,173 @@
+"""Tests for PreflightValidator."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegEncoderNotFoundError
+from asyncffmpeg import FFmpegInvalidFilterGraphError
+from asyncffmpeg import FFmpegInvalidOptionError
+from asyncffmpeg import FFmpegJob
+from asyncffmpeg import PreflightValidator
+from asyncffmpeg.preflight import create_arguments_dry_run
+from asyncffmpeg.preflight import read_arities
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from asyncffmpeg import FFmpegProcessError
+    from asyncffmpeg import StreamSpec
+
+
+def create_stream_spec(name: str, **options: object) -> StreamSpec:
+    """Stream spec of inputs and output which don't exist, since the dry run doesn't touch them."""
+    stream = ffmpeg.input(f"/not_exist/{name}.mp4", ss=10)
+    return stream.video.filter("scale", 640, -2).output(stream.audio, f"/not_exist/{name}.out.mp4", **options)
+
+
+class TestPreflightValidator:
+    """Tests for PreflightValidator."""
+
+    @staticmethod
+    def test() -> None:
+        """Valid jobs pass, and jobs of the same template are judged by the cached verdict."""
+        validator = PreflightValidator()
+
+        async def validate() -> None:
+            await asyncio.gather(*(validator.validate(create_stream_spec("a", vcodec="libx264")) for _ in range(3)))
+            await validator.validate(FFmpegJob.from_stream_spec(create_stream_spec("b", vcodec="libx264")))
+
+        asyncio.run(validate())
+        assert validator.number_of_dry_runs == 1
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("options", "expected"),
+        [
+            ({"vcodec": "not_exist"}, FFmpegEncoderNotFoundError),
+            ({"filter:a": "not_exist"}, FFmpegInvalidFilterGraphError),
+            ({"vcodec": "libx264", "preset": "not_exist"}, FFmpegInvalidOptionError),
+        ],
+    )
+    def test_rejected(options: dict[str, object], expected: type[FFmpegProcessError]) -> None:
+        """Invalid jobs are rejected, and repeated submissions are rejected without FFmpeg."""
+        validator = PreflightValidator()
+        with pytest.raises(expected):
+            asyncio.run(validator.validate(create_stream_spec("a", **options)))
+        time_start = time.monotonic()
+        with pytest.raises(expected):
+            asyncio.run(validator.validate(create_stream_spec("b", **options)))
+        assert time.monotonic() - time_start < 0.1  # noqa: PLR2004
+        assert validator.number_of_dry_runs == 1
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "stream_spec",
+        [
+            # The stand-in doesn't have subtitle stream.
+            ffmpeg.input("/not_exist/a.mkv")["s"].output("/not_exist/a.srt"),
+            # H.263 doesn't support the size of the stand-in, while it supports CIF of actual input.
+            ffmpeg.input("/not_exist/cif.mp4").output("/not_exist/cif.3gp", vcodec="h263"),
+        ],
+    )
+    def test_inconclusive(stream_spec: StreamSpec) -> None:
+        """Failure which the stand-in causes passes the job, and it isn't cached."""
+        validator = PreflightValidator()
+
+        async def validate() -> None:
+            await validator.validate(stream_spec)
+            await validator.validate(stream_spec)
+
+        asyncio.run(validate())
+        assert validator.number_of_dry_runs == 2  # noqa: PLR2004
+        assert not validator.verdicts
+
+    @staticmethod
+    def test_unknown_option() -> None:
+        """Job which has an option FFmpeg doesn't know passes without dry run."""
+        validator = PreflightValidator()
+        asyncio.run(validator.validate(create_stream_spec("a", not_exist=1)))
+        assert validator.number_of_dry_runs == 0
+        assert not validator.verdicts
+
+    @staticmethod
+    @pytest.mark.skipif(sys.platform == "win32", reason="test for POSIX only")
+    def test_arities_timeout(tmp_path: Path) -> None:
+        """Job passes without dry run when FFmpeg doesn't tell arities of options in time."""
+        path_executable = tmp_path / "ffmpeg"
+        path_executable.write_text("#!/bin/sh\nexec sleep 600\n")
+        path_executable.chmod(0o755)
+        validator = PreflightValidator(time_to_force_termination=1)
+        job = FFmpegJob((str(path_executable), "-i", "/not_exist/a.mp4", "-vcodec", "libx264", "/not_exist/a.out.mp4"))
+        time_start = time.monotonic()
+        asyncio.run(validator.validate(job))
+        assert time.monotonic() - time_start < 10  # noqa: PLR2004
+        assert validator.number_of_dry_runs == 0
+        assert not validator.verdicts
+
+    @staticmethod
+    def test_max_verdicts() -> None:
+        """The least recently used verdict is evicted."""
+        validator = PreflightValidator(max_verdicts=1)
+
+        async def validate() -> None:
+            await validator.validate(create_stream_spec("a"))
+            await validator.validate(create_stream_spec("a", vcodec="libx264"))
+            await validator.validate(create_stream_spec("a"))
+
+        asyncio.run(validate())
+        assert validator.number_of_dry_runs == 3  # noqa: PLR2004
+        assert len(validator.verdicts) == 1
+
+
+class TestCreateArgumentsDryRun:
+    """Tests for create_arguments_dry_run()."""
+
+    @staticmethod
+    def test() -> None:
+        """Inputs are replaced with the stand-in and outputs with the null muxer, keeping options and flags."""
+        stream_a = ffmpeg.input("a.mp4", ss=3, re=None)
+        stream_b = ffmpeg.input("b.png", f="image2", loop=1)
+        video = ffmpeg.overlay(stream_a.video, stream_b)
+        output_a = ffmpeg.output(video, stream_a.audio, "out.mp4", vcodec="libx264", an=None, shortest=None)
+        output_b = ffmpeg.output(stream_a.audio, "out.m4a", f="mp4", **{"b:a": "128k"})
+        stream_spec = ffmpeg.merge_outputs(output_a, output_b).global_args("-hide_banner").overwrite_output()
+        arguments = ffmpeg.compile(stream_spec)
+        arguments = create_arguments_dry_run(arguments, "stand-in", read_arities(arguments))
+        filter_complex = "[0:v][1]overlay=eof_action=repeat[s0]"
+        assert arguments == (
+            "ffmpeg",
+            *("-f", "lavfi", "-i", "stand-in", "-f", "lavfi", "-i", "stand-in"),
+            *("-filter_complex", filter_complex),
+            *("-map", "[s0]", "-map", "0:a", "-an", "-shortest", "-vcodec", "libx264", "-f", "null", "-"),
+            *("-map", "0:a", "-f", "mp4", "-b:a", "128k", "-f", "null", "-"),
+            *("-hide_banner", "-y"),
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("options", "expected"),
+        [
+            # Flag which is missing in help of argument names.
+            ({"copyinkf": None}, ("-copyinkf",)),
+            # Option which help doesn't tell that takes value.
+            ({"fps_mode": "cfr"}, ("-fps_mode", "cfr")),
+        ],
+    )
+    def test_arity(options: dict[str, object], expected: tuple[str, ...]) -> None:
+        """Arity of options is read from how FFmpeg splits the command line."""
+        arguments = ffmpeg.compile(ffmpeg.input("a.mp4").output("out.mp4", **options))
+        arguments_dry_run = create_arguments_dry_run(arguments, "stand-in", read_arities(arguments))
+        assert arguments_dry_run == ("ffmpeg", "-f", "lavfi", "-i", "stand-in", *expected, "-f", "null", "-")
+
+    @staticmethod
+    def test_unknown_option() -> None:
+        """Arguments of dry run can't be created when arity of some option is unknown."""
+        arguments = ffmpeg.compile(ffmpeg.input("a.mp4").output("out.mp4", not_exist=1))
+        assert create_arguments_dry_run(arguments, "stand-in", read_arities(arguments)) is None
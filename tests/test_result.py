@@ -0,0 +1,85 @@
+"""Tests for FFmpegResult."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegResult
+from asyncffmpeg.result import StatisticsParser
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from asyncffmpeg import StreamSpec
+
+
+class TestStatisticsParser:
+    """Tests for StatisticsParser."""
+
+    @staticmethod
+    def test() -> None:
+        """The last progress line and muxing overhead should be parsed."""
+        parser = StatisticsParser()
+        lines = [
+            "frame=   60 fps=0.0 q=28.0 size=       0KiB time=00:00:00.96 bitrate=   0.4kbits/s speed=1.91x",
+            (
+                "[out#0/mp4 @ 0x55d0c0] video:410KiB audio:118KiB subtitle:0KiB other streams:0KiB global headers:0KiB"
+                " muxing overhead: 1.160985%"
+            ),
+            (
+                "frame=  449 fps=270 q=-1.0 Lsize=     534KiB time=00:00:07.44 bitrate= 587.5kbits/s dup=2 drop=1"
+                " speed=4.47x"
+            ),
+            "[libx264 @ 0x55d0c1] kb/s:447.42",
+        ]
+        for line in lines:
+            parser.feed(line)
+        assert parser.create_result(0) == FFmpegResult(
+            return_code=0,
+            frames=449,
+            fps=270.0,
+            size=534 * 1024,
+            time=7.44,
+            bitrate=587.5,
+            speed=4.47,
+            duplicated_frames=2,
+            dropped_frames=1,
+            size_video=410 * 1024,
+            size_audio=118 * 1024,
+            muxing_overhead=1.160985,
+        )
+
+    @staticmethod
+    def test_not_available() -> None:
+        """Statistics which FFmpeg doesn't report should be None."""
+        parser = StatisticsParser()
+        parser.feed("size=N/A time=-00:00:00.02 bitrate=N/A speed=N/A")
+        assert parser.create_result(1) == FFmpegResult(return_code=1, time=-0.02)
+
+
+class TestFFmpegResult:
+    """Tests for result of FFmpegCoroutine.execute()."""
+
+    @staticmethod
+    @pytest.mark.parametrize("pipe_stdout", [False, True])
+    def test(path_file_input: Path, path_file_output: Path, *, pipe_stdout: bool) -> None:
+        """Result should have statistics of the whole encode."""
+
+        async def create_stream_spec() -> StreamSpec:
+            return ffmpeg.input(path_file_input).output(str(path_file_output))
+
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(pipe_stdout=pipe_stdout)
+        result = asyncio.run(ffmpeg_coroutine.execute(create_stream_spec))
+        assert result.return_code == 0
+        expected_frames = 449
+        assert result.frames == expected_frames
+        assert result.size == pytest.approx(path_file_output.stat().st_size, rel=0.01)
+        assert result.time == pytest.approx(7.49, abs=0.1)
+        assert result.size_video is not None
+        assert result.size_audio is not None
+        assert result.muxing_overhead is not None
@@ -0,0 +1,108 @@
+"""Tests for ResumableEncoder."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+
+# Reason: To check output by FFmpeg.
+import subprocess  # nosec
+from typing import TYPE_CHECKING
+from typing import Any
+
+import pytest
+
+from asyncffmpeg import ResumableEncoder
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from asyncffmpeg import StreamSpec
+
+SECOND_CHUNK = 3
+DURATION_SAMPLE = 7.49
+
+
+class CreateOutput:
+    """Creates output of chunk and crashes on the specified call."""
+
+    def __init__(self, index_crash: int | None = None, preset: str = "medium") -> None:
+        self.index_crash = index_crash
+        self.preset = preset
+        self.number_of_calls = 0
+
+    def __call__(self, stream: Any, path: str) -> StreamSpec:  # noqa: ANN401
+        if self.number_of_calls == self.index_crash:
+            msg = "Crash"
+            raise RuntimeError(msg)
+        self.number_of_calls += 1
+        return stream.output(path, vcodec="libx264", preset=self.preset, acodec="aac")
+
+
+def get_duration(path: Path) -> float:
+    # Reason: Arguments are fixed. pylint: disable=subprocess-run-check
+    completed = subprocess.run(["ffmpeg", "-i", str(path)], check=False, capture_output=True, text=True)  # noqa: S603 S607  # nosec
+    match = re.search(r"Duration: (\d+):(\d+):(\d+\.\d+)", completed.stderr)
+    assert match is not None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+class TestResumableEncoder:
+    """Tests for ResumableEncoder."""
+
+    @staticmethod
+    def test_resume(path_file_input: Path, path_file_output: Path) -> None:
+        """Restarted job should encode only the remaining chunks and concatenate all chunks."""
+        # The first call creates arguments to hash into the manifest.
+        create_output_crash = CreateOutput(index_crash=2)
+        encoder = ResumableEncoder(
+            path_file_input,
+            path_file_output,
+            create_output_crash,
+            second_chunk=SECOND_CHUNK,
+        )
+        with pytest.raises(RuntimeError, match="Crash"):
+            asyncio.run(encoder.encode(duration=DURATION_SAMPLE))
+        manifest = json.loads((encoder.directory_work / "manifest.json").read_text(encoding="utf-8"))
+        assert manifest["chunks"] == ["chunk_000000.mp4"]
+
+        create_output = CreateOutput()
+        encoder = ResumableEncoder(
+            path_file_input,
+            path_file_output,
+            create_output,
+            second_chunk=SECOND_CHUNK,
+        )
+        asyncio.run(encoder.encode(duration=DURATION_SAMPLE))
+        expected_number_of_calls = 3
+        assert create_output.number_of_calls == expected_number_of_calls
+        assert get_duration(path_file_output) == pytest.approx(DURATION_SAMPLE, abs=0.2)
+        assert not encoder.directory_work.exists()
+
+    @staticmethod
+    def test_manifest_mismatch(path_file_input: Path, path_file_output: Path) -> None:
+        """Manifest of other job shouldn't be resumed, and the job starts over."""
+        create_output = CreateOutput()
+        encoder = ResumableEncoder(path_file_input, path_file_output, create_output, second_chunk=SECOND_CHUNK)
+        encoder.directory_work.mkdir()
+        manifest = {"job": {"input": "other.mp4"}, "chunks": ["chunk_000000.mp4"]}
+        (encoder.directory_work / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        asyncio.run(encoder.encode(duration=DURATION_SAMPLE))
+        expected_number_of_calls = 4
+        assert create_output.number_of_calls == expected_number_of_calls
+        assert get_duration(path_file_output) == pytest.approx(DURATION_SAMPLE, abs=0.2)
+
+    @staticmethod
+    def test_output_options_changed(path_file_input: Path, path_file_output: Path) -> None:
+        """Restarted job with other output options should encode all chunks again."""
+        create_output_crash = CreateOutput(index_crash=2)
+        encoder = ResumableEncoder(path_file_input, path_file_output, create_output_crash, second_chunk=SECOND_CHUNK)
+        with pytest.raises(RuntimeError, match="Crash"):
+            asyncio.run(encoder.encode(duration=DURATION_SAMPLE))
+        create_output = CreateOutput(preset="ultrafast")
+        encoder = ResumableEncoder(path_file_input, path_file_output, create_output, second_chunk=SECOND_CHUNK)
+        asyncio.run(encoder.encode(duration=DURATION_SAMPLE))
+        expected_number_of_calls = 4
+        assert create_output.number_of_calls == expected_number_of_calls
@@ -0,0 +1,81 @@
+"""Tests for ResourceSampler."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import ResourceSampler
+from asyncffmpeg import ResourceSeries
+from asyncffmpeg import ResourceUsage
+
+if TYPE_CHECKING:
+    from asyncffmpeg import StreamSpec
+    from asyncffmpeg.ffmpegprocess.interface import FFmpegProcess
+
+
+class TestResourceSeries:
+    """Tests for ResourceSeries."""
+
+    @staticmethod
+    def test_ring_buffer() -> None:
+        """The oldest samples should be overwritten and values should be ordered chronologically."""
+        series = ResourceSeries(capacity=3)
+        assert series.latest(series.rss) is None
+        for index in range(5):
+            series.append(float(index), 0, index * 100, 1, (0, 0))
+        assert len(series) == 3  # noqa: PLR2004
+        assert series.ordered(series.rss) == [200, 300, 400]
+        assert series.latest(series.rss) == 400  # noqa: PLR2004
+        assert series.peak_rss == 400  # noqa: PLR2004
+        assert series.usage() == ResourceUsage(0.0, 400, 400, 1, 0, 0)
+
+
+@pytest.mark.skipif(not Path("/proc/self/stat").exists(), reason="procfs is required")
+class TestResourceSampler:
+    """Tests for ResourceSampler."""
+
+    @staticmethod
+    def test() -> None:
+        """Resource usage of FFmpeg process should be sampled until it finishes."""
+        sampler = ResourceSampler(second_interval=0.1)
+        pids: list[int] = []
+
+        async def create_stream_spec() -> StreamSpec:
+            stream = ffmpeg.input("testsrc2=duration=3:size=640x360", f="lavfi")
+            return stream.output("-", f="null", vcodec="libx264", preset="slow")
+
+        async def after_start(ffmpeg_process: FFmpegProcess) -> None:
+            pids.append(ffmpeg_process.popen.pid)
+            sampler.register(ffmpeg_process.popen.pid)
+
+        async def execute() -> None:
+            task = asyncio.ensure_future(sampler.run())
+            try:
+                await FFmpegCoroutineFactory.create().execute(create_stream_spec, after_start=after_start)
+                await asyncio.sleep(0.3)
+            finally:
+                task.cancel()
+
+        asyncio.run(execute())
+        series = sampler.series[pids[0]]
+        assert series.finished
+        assert len(series) > 1
+        # CPU percent of each interval can be 0 when FFmpeg waits, but CPU time accumulates.
+        assert series.ticks_last > 0
+        assert series.peak_rss >= max(series.ordered(series.rss)) > 0
+        # libx264 runs threads.
+        assert max(series.ordered(series.threads)) > 1
+        usage = sampler.query(pids[0])
+        assert usage is not None
+        assert usage.peak_rss == series.peak_rss
+        # Finished process doesn't count.
+        assert sampler.total_rss(pids) == 0
+        sampler.discard(pids[0])
+        assert not sampler.series
+        assert sampler.query(pids[0]) is None
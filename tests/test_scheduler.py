@@ -0,0 +1,135 @@
+"""Tests for PriorityScheduler."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegJob
+from asyncffmpeg import PriorityScheduler
+from asyncffmpeg import ResourceSampler
+
+FRAME_RATE = 10
+
+
+def create_job(second_duration: int) -> FFmpegJob:
+    """Job which takes about the duration except for initial burst since the input is read at native frame rate."""
+    source = f"testsrc=duration={second_duration}:size=160x120:rate={FRAME_RATE}"
+    stream = ffmpeg.input(source, f="lavfi", re=None)
+    return FFmpegJob.from_stream_spec(stream.output("-", f="null"))
+
+
+async def wait_suspended(scheduler: PriorityScheduler) -> None:
+    """Wait until the preempted FFmpeg is suspended, which may start after preemption."""
+    entries = scheduler.suspended
+    while not any(entry.ffmpeg_process is not None and entry.ffmpeg_process.suspended for entry in entries):  # noqa: ASYNC110
+        await asyncio.sleep(0.1)
+
+
+async def wait_sampled(scheduler: PriorityScheduler, sampler: ResourceSampler) -> None:
+    """Wait until FFmpeg of a running job is sampled."""
+    entries = scheduler.running
+    while not any(entry.ffmpeg_process and sampler.query(entry.ffmpeg_process.popen.pid) for entry in entries):  # noqa: ASYNC110
+        await asyncio.sleep(0.1)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="test for POSIX only")
+class TestPriorityScheduler:
+    """Tests for PriorityScheduler."""
+
+    @staticmethod
+    def test() -> None:
+        """Job of higher priority preempts running job, which resumes with its progress before jobs submitted later."""
+        finished: list[str] = []
+
+        async def execute(scheduler: PriorityScheduler, name: str, second_duration: int, priority: int) -> int | None:
+            result = await scheduler.execute_job(create_job(second_duration), priority=priority)
+            finished.append(name)
+            return result.frames
+
+        async def run() -> list[int | None]:
+            scheduler = PriorityScheduler()
+            low = asyncio.create_task(execute(scheduler, "low", 3, 0))
+            await asyncio.sleep(1)
+            later = asyncio.create_task(execute(scheduler, "later", 1, 0))
+            high = asyncio.create_task(execute(scheduler, "high", 2, 1))
+            await asyncio.wait_for(wait_suspended(scheduler), 5)
+            (entry,) = scheduler.suspended
+            # Reason: Checked by wait_suspended().
+            values = dict(entry.ffmpeg_process.progress.values)  # type: ignore[union-attr]
+            await asyncio.sleep(0.5)
+            assert entry.ffmpeg_process.progress.values == values  # type: ignore[union-attr]
+            return list(await asyncio.gather(low, later, high))
+
+        frames = asyncio.run(run())
+        assert finished == ["high", "low", "later"]
+        assert frames == [3 * FRAME_RATE, FRAME_RATE, 2 * FRAME_RATE]
+
+    @staticmethod
+    def test_same_priority() -> None:
+        """Jobs of the same priority don't preempt each other."""
+
+        async def run() -> None:
+            scheduler = PriorityScheduler(2)
+            tasks = [asyncio.create_task(scheduler.execute_job(create_job(2))) for _ in range(3)]
+            await asyncio.sleep(0.3)
+            assert len(scheduler.running) == 2  # noqa: PLR2004
+            assert len(scheduler.waiting) == 1
+            assert not scheduler.suspended
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+    @staticmethod
+    def test_cancel_suspended() -> None:
+        """Suspended FFmpeg is resumed to quit by key Q without waiting time to force termination."""
+        time_to_force_termination = 4
+
+        async def run() -> float:
+            scheduler = PriorityScheduler(time_to_force_termination=time_to_force_termination)
+            low = asyncio.create_task(scheduler.execute_job(create_job(5)))
+            await asyncio.sleep(0.5)
+            high = asyncio.create_task(scheduler.execute_job(create_job(3), priority=1))
+            await asyncio.wait_for(wait_suspended(scheduler), 5)
+            (entry,) = scheduler.suspended
+            time_start = time.monotonic()
+            low.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await low
+            second_quit = time.monotonic() - time_start
+            # Reason: Checked by wait_suspended().
+            assert entry.ffmpeg_process.popen.poll() is not None  # type: ignore[union-attr]
+            high.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await high
+            return second_quit
+
+        assert asyncio.run(run()) < time_to_force_termination
+
+    @staticmethod
+    @pytest.mark.skipif(not Path("/proc/self/stat").exists(), reason="procfs is required")
+    def test_max_rss() -> None:
+        """Waiting job doesn't start in free slot while RSS of running jobs exceeds the budget."""
+        sampler = ResourceSampler(second_interval=0.1)
+
+        async def run() -> None:
+            scheduler = PriorityScheduler(2, sampler=sampler, max_rss=1)
+            task_sampler = asyncio.create_task(sampler.run())
+            try:
+                first = asyncio.create_task(scheduler.execute_job(create_job(2)))
+                await asyncio.wait_for(wait_sampled(scheduler, sampler), 5)
+                second = asyncio.create_task(scheduler.execute_job(create_job(1)))
+                await asyncio.sleep(0.3)
+                assert len(scheduler.running) == 1
+                assert len(scheduler.waiting) == 1
+                await asyncio.gather(first, second)
+            finally:
+                task_sampler.cancel()
+
+        asyncio.run(run())
+        assert not sampler.series
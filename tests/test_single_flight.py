@@ -0,0 +1,132 @@
+"""Tests for FFmpegSingleFlight."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegInputNotFoundError
+from asyncffmpeg import FFmpegJob
+from asyncffmpeg import FFmpegSingleFlight
+from asyncffmpeg.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def create_job_long(path_file_output: Path) -> FFmpegJob:
+    """Job which takes 60 seconds since it reads input at native frame rate."""
+    stream = ffmpeg.input("testsrc=duration=60:rate=30", f="lavfi", re=None)
+    return FFmpegJob.from_stream_spec(stream.output(str(path_file_output)).overwrite_output())
+
+
+class Work:
+    """Work which takes time to quit as FFmpeg does, and returns the number of invocations."""
+
+    def __init__(self) -> None:
+        self.number_of_invocations = 0
+
+    async def run(self, second: float) -> int:
+        self.number_of_invocations += 1
+        try:
+            await asyncio.sleep(second)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0.5)
+            raise
+        return self.number_of_invocations
+
+
+class TestFFmpegSingleFlight:
+    """Tests for FFmpegSingleFlight."""
+
+    @staticmethod
+    def test(path_file_input: Path, tmp_path: Path) -> None:
+        """Identical jobs in flight share a single invocation and different jobs don't."""
+        stream = ffmpeg.input(str(path_file_input))
+        jobs = [
+            FFmpegJob.from_stream_spec(stream.output(str(tmp_path / name)).overwrite_output())
+            for name in ("0.mp4", "0.mp4", "1.mp4")
+        ]
+        single_flight = FFmpegSingleFlight()
+
+        async def execute_all() -> list[object]:
+            return await asyncio.gather(*(single_flight.execute_job(job) for job in jobs))
+
+        results = asyncio.run(execute_all())
+        assert results[0] is results[1]
+        expected_number_of_invocations = 2
+        assert single_flight.number_of_invocations == expected_number_of_invocations
+        assert not single_flight.flights
+        # Job submitted after the job finished starts FFmpeg again.
+        asyncio.run(single_flight.execute_job(jobs[0]))
+        assert single_flight.number_of_invocations == expected_number_of_invocations + 1
+
+    @staticmethod
+    def test_error(path_file_input: Path, path_file_output: Path) -> None:
+        """Error is raised to all awaiters."""
+        stream_spec = ffmpeg.input(str(path_file_input.with_name("not_exist.mp4"))).output(str(path_file_output))
+        job = FFmpegJob.from_stream_spec(stream_spec)
+        single_flight = FFmpegSingleFlight()
+
+        async def execute_all() -> list[object]:
+            return await asyncio.gather(*(single_flight.execute_job(job) for _ in range(2)), return_exceptions=True)
+
+        results = asyncio.run(execute_all())
+        assert all(isinstance(result, FFmpegInputNotFoundError) for result in results)
+        assert single_flight.number_of_invocations == 1
+
+    @staticmethod
+    def test_cancel_some(path_file_output: Path) -> None:
+        """Cancellation of some awaiters doesn't quit FFmpeg for the others."""
+        job = create_job_long(path_file_output)
+        single_flight = FFmpegSingleFlight()
+
+        async def execute() -> None:
+            task_cancelled = asyncio.ensure_future(single_flight.execute_job(job))
+            task_kept = asyncio.ensure_future(single_flight.execute_job(job))
+            await asyncio.sleep(1)
+            task_cancelled.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task_cancelled
+            await asyncio.sleep(1)
+            flight = single_flight.flights[job.arguments]
+            assert not flight.task.done()
+            assert flight.number_of_awaiters == 1
+            task_kept.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task_kept
+            assert flight.task.cancelled()
+
+        asyncio.run(asyncio.wait_for(execute(), 30))
+        assert single_flight.number_of_invocations == 1
+        assert not single_flight.flights
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+
+    @staticmethod
+    def test_join_while_quitting() -> None:
+        """Awaiter arriving while the task quits starts a new task instead of receiving its cancellation."""
+        work = Work()
+        single_flight: SingleFlight[str, int] = SingleFlight()
+
+        async def execute() -> int:
+            task_cancelled = asyncio.ensure_future(single_flight.share("key", lambda: work.run(60)))
+            await asyncio.sleep(0.1)
+            flight = single_flight.flights["key"]
+            task_cancelled.cancel()
+            while not flight.quitting:  # noqa: ASYNC110
+                await asyncio.sleep(0)
+            task_joined = asyncio.ensure_future(single_flight.share("key", lambda: work.run(0)))
+            await asyncio.sleep(0.1)
+            assert not flight.task.done()
+            with pytest.raises(asyncio.CancelledError):
+                await task_cancelled
+            return await task_joined
+
+        assert asyncio.run(asyncio.wait_for(execute(), 5)) == 2  # noqa: PLR2004
+        assert not single_flight.flights
@@ -0,0 +1,208 @@
+"""Tests for SmartCutter."""
+
+from __future__ import annotations
+
+import asyncio
+import resource
+import subprocess  # nosec
+import sys
+from logging import getLogger
+from typing import TYPE_CHECKING
+from typing import Any
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegJob
+from asyncffmpeg import KeyframeIndex
+from asyncffmpeg import KeyframeIndexer
+from asyncffmpeg import SmartCutter
+from asyncffmpeg.smart_cut import ParameterSets
+from asyncffmpeg.smart_cut import Segment
+from asyncffmpeg.smart_cut import create_concat_list
+from asyncffmpeg.smart_cut import plan
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Coroutine
+    from pathlib import Path
+
+    from asyncffmpeg import FFmpegResult
+
+SECOND_FRAME = 1 / 30
+
+
+def create_input(path: Path, duration: int, size: str = "320x240", preset: str = "medium") -> Path:
+    """Create input which has keyframe every second."""
+    video = ffmpeg.input(f"testsrc=duration={duration}:rate=30:size={size}", f="lavfi")
+    audio = ffmpeg.input(f"sine=duration={duration}", f="lavfi")
+    stream_spec = ffmpeg.output(video, audio, str(path), vcodec="libx264", preset=preset, g=30, acodec="aac")
+    asyncio.run(FFmpegCoroutineFactory.create().execute_job(FFmpegJob.from_stream_spec(stream_spec)))
+    return path
+
+
+@pytest.fixture
+def path_file_input_gop(tmp_path: Path) -> Path:
+    return create_input(tmp_path / "input.mp4", 10)
+
+
+def decode(path: Path) -> str:
+    """Decode the whole file; return errors which FFmpeg reported."""
+    completed_process = subprocess.run(  # noqa: S603  # nosec
+        ["ffmpeg", "-v", "error", "-i", str(path), "-f", "null", "-"],  # noqa: S607
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return completed_process.stderr
+
+
+def measure_cpu_time_of_children(execute: Callable[[], Coroutine[Any, Any, FFmpegResult]]) -> float:
+    """Measure CPU time (second) which child processes spent."""
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    asyncio.run(execute())
+    usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (usage_after.ru_utime + usage_after.ru_stime) - (usage_before.ru_utime + usage_before.ru_stime)
+
+
+def assert_continuous(index: KeyframeIndex, expected_number_of_frames: int) -> None:
+    """Frames of the clip start at 0 without gaps or duplicates."""
+    timestamps = list(index.timestamps)
+    assert len(timestamps) == expected_number_of_frames
+    assert timestamps[0] == 0.0
+    assert all(0 < after - before < SECOND_FRAME * 1.5 for before, after in zip(timestamps, timestamps[1:]))
+
+
+class TestSmartCutter:
+    """Tests for SmartCutter."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("second_start", "second_end", "expected_copy"),
+        [
+            (1.5, 7.5, True),
+            # Clip starts at keyframe.
+            (2.0, 4.5, True),
+            # Within a GOP.
+            (1.2, 1.8, False),
+        ],
+    )
+    def test_cut(
+        path_file_input_gop: Path,
+        tmp_path: Path,
+        second_start: float,
+        second_end: float,
+        expected_copy: bool,  # noqa: FBT001
+    ) -> None:
+        """Clip has the frames presented in [start, end) on continuous timestamps."""
+        indexer = KeyframeIndexer(tmp_path / "cache")
+        path_file_output = tmp_path / "clip.mp4"
+
+        async def cut() -> tuple[KeyframeIndex, KeyframeIndex]:
+            await SmartCutter(path_file_input_gop, indexer).cut(second_start, second_end, path_file_output)
+            return await indexer.index(path_file_input_gop), await indexer.index(path_file_output)
+
+        index_input, index_output = asyncio.run(cut())
+        segments = plan(index_input, second_start, second_end)
+        assert any(segment.copy for segment in segments) == expected_copy
+        expected_number_of_frames = sum(segment.number_of_frames for segment in segments)
+        assert_continuous(index_output, expected_number_of_frames)
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["cache", "clip.mp4", "input.mp4"]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("video_options", "expected_copy"),
+        [
+            (None, True),
+            # Parameter sets can't match the input, then the entire clip is re-encoded.
+            ({"vcodec": "libx264", "x264-params": "ref=1"}, False),
+        ],
+    )
+    def test_cut_parameter_sets(
+        tmp_path: Path,
+        caplog: pytest.LogCaptureFixture,
+        video_options: dict[str, Any] | None,
+        expected_copy: bool,  # noqa: FBT001
+    ) -> None:
+        """Clip of input encoded by other options than the default decodes without errors."""
+        path_file_input = create_input(tmp_path / "input.mp4", 10, preset="slow")
+        path_file_output = tmp_path / "clip.mp4"
+        cutter = SmartCutter(path_file_input, KeyframeIndexer(tmp_path / "cache"), video_options=video_options)
+        asyncio.run(cutter.cut(1.5, 7.5, path_file_output))
+        assert decode(path_file_output) == ""
+        assert ("re-encode entire clip" not in caplog.text) == expected_copy
+
+    @staticmethod
+    def test_cut_all(path_file_input_gop: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Clips are cut with a single index and a single read of parameter sets of the input."""
+        paths_read = []
+        read_parameter_sets = SmartCutter.read_parameter_sets
+
+        async def spy(self: SmartCutter, path: Path, directory: Path) -> ParameterSets:
+            paths_read.append(path)
+            return await read_parameter_sets(self, path, directory)
+
+        monkeypatch.setattr(SmartCutter, "read_parameter_sets", spy)
+        directory_cache = tmp_path / "cache"
+        clips = [(0.5, 5.0, tmp_path / "0.mp4"), (4.0, 6.0, tmp_path / "1.mp4")]
+        results = asyncio.run(SmartCutter(path_file_input_gop, KeyframeIndexer(directory_cache)).cut_all(clips))
+        assert [result.return_code for result in results] == [0, 0]
+        assert all(path.exists() for _start, _end, path in clips)
+        assert len(list(directory_cache.iterdir())) == 1
+        assert paths_read.count(path_file_input_gop) == 1
+
+    @staticmethod
+    @pytest.mark.slow
+    @pytest.mark.skipif(sys.platform == "win32", reason="test for POSIX only")
+    def test_benchmark_cpu_time(tmp_path: Path) -> None:
+        """Benchmark encode CPU time of smart cut against full re-encode of a long clip."""
+        path_file_input = create_input(tmp_path / "input.mp4", 30, "640x360")
+        indexer = KeyframeIndexer(tmp_path / "cache")
+        asyncio.run(indexer.index(path_file_input))
+        second_start, second_end = 2.5, 27.5
+
+        async def re_encode() -> FFmpegResult:
+            stream = ffmpeg.input(str(path_file_input), ss=second_start, t=second_end - second_start)
+            stream_spec = stream.output(str(tmp_path / "full.mp4"), vcodec="libx264", acodec="aac")
+            return await FFmpegCoroutineFactory.create().execute_job(FFmpegJob.from_stream_spec(stream_spec))
+
+        async def smart_cut() -> FFmpegResult:
+            return await SmartCutter(path_file_input, indexer).cut(second_start, second_end, tmp_path / "smart.mp4")
+
+        cpu_time_re_encode = measure_cpu_time_of_children(re_encode)
+        cpu_time_smart_cut = measure_cpu_time_of_children(smart_cut)
+        getLogger(__name__).info("re-encode: %.2f s, smart cut: %.2f s", cpu_time_re_encode, cpu_time_smart_cut)
+        assert cpu_time_smart_cut < cpu_time_re_encode
+
+
+class TestPlan:
+    """Tests for plan()."""
+
+    @staticmethod
+    def test() -> None:
+        """Partial GOPs are re-encoded and GOPs between keyframes are copied."""
+        index = KeyframeIndex([0.0, 2.0, 4.0, 6.0], [float(second) for second in range(8)])
+        assert plan(index, 1.0, 5.0) == [
+            Segment(1.0, 1, 1.0, copy=False, from_keyframe=False),
+            Segment(2.5, 2, 2.0, copy=True, from_keyframe=True),
+            Segment(4.5, 1, 1.0, copy=False, from_keyframe=True),
+        ]
+        # Clip starts at keyframe and ends at keyframe.
+        assert plan(index, 2.0, 6.0) == [
+            Segment(2.5, 2, 2.0, copy=True, from_keyframe=True),
+            Segment(4.5, 2, 2.0, copy=False, from_keyframe=True),
+        ]
+        assert plan(index, 0.5, 1.5) == [Segment(0.5, 1, 1.0, copy=False, from_keyframe=False)]
+        # Duration of the last frame of the input is unknown.
+        assert plan(index, 6.5, 8.0) == [Segment(6.5, 1, None, copy=False, from_keyframe=False)]
+
+    @staticmethod
+    def test_create_concat_list(tmp_path: Path) -> None:
+        """Single quotes in paths are escaped and durations are given if they are known."""
+        segments = [
+            (tmp_path / "it's.nut", Segment(1.0, 30, 1.0, copy=False, from_keyframe=False)),
+            (tmp_path / "1.nut", Segment(2.5, 30, None, copy=True, from_keyframe=True)),
+        ]
+        expected = f"file '{tmp_path}/it'\\''s.nut'\nduration 1.0\nfile '{tmp_path}/1.nut'\n"
+        assert create_concat_list(segments) == expected
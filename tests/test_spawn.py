@@ -0,0 +1,140 @@
+"""Tests for SpawnOptions."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegResourceLimitError
+from asyncffmpeg import ResourceLimits
+from asyncffmpeg import SpawnMode
+from asyncffmpeg import SpawnOptions
+from asyncffmpeg.ffmpegprocess.posix import FFmpegProcessPosix
+from tests.testlibraries.create_stream_spec_croutine import CreateStreamSpecCoroutineCopy
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from asyncffmpeg import StreamSpec
+
+NUMBER_OF_OPEN_PIPES = 1000
+NUMBER_OF_SPAWNS = 10
+
+
+@contextmanager
+def open_many_pipes() -> Generator[None, None, None]:
+    """Simulate worker process which has many open file descriptors."""
+    pipes = [os.pipe() for _ in range(NUMBER_OF_OPEN_PIPES)]
+    try:
+        yield
+    finally:
+        for read_fd, write_fd in pipes:
+            os.close(read_fd)
+            os.close(write_fd)
+
+
+def measure_spawn_to_first_byte(mode: SpawnMode) -> float:
+    """Measure seconds from spawn to the first byte of stderr."""
+    stream_spec = ffmpeg.input("anullsrc", format="lavfi", t=0.01).output("-", format="null")
+    start = time.perf_counter()
+    ffmpeg_process = FFmpegProcessPosix(1, stream_spec, SpawnOptions(mode=mode))
+    # Reason: Created with stderr pipe.
+    os.read(ffmpeg_process.popen.stderr.fileno(), 1)  # type: ignore[union-attr]
+    elapsed = time.perf_counter() - start
+    ffmpeg_process.popen.communicate()
+    return elapsed
+
+
+def create_heavy_encode(path_file_output: Path) -> StreamSpec:
+    """Encode which takes several CPU seconds and writes several megabytes."""
+    stream = ffmpeg.input("testsrc=duration=30:size=1920x1080", f="lavfi")
+    return stream.output(str(path_file_output), vcodec="libx264").overwrite_output()
+
+
+class TestSpawnOptions:
+    """Tests for SpawnOptions."""
+
+    @staticmethod
+    @pytest.mark.skipif(sys.platform == "win32", reason="test for POSIX only")
+    @pytest.mark.parametrize("limits", [None, ResourceLimits(cpu_time=60, open_files=256)])
+    def test_posix_spawn(
+        path_file_input: Path,
+        path_file_output: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        limits: ResourceLimits | None,
+    ) -> None:
+        """FFmpeg should be spawned by posix_spawn() even with limits, and work as same as default."""
+        paths_spawned: list[str] = []
+        posix_spawn = os.posix_spawn
+
+        def record_posix_spawn(path: str, *args: Any, **kwargs: Any) -> int:  # noqa: ANN401
+            paths_spawned.append(path)
+            return posix_spawn(path, *args, **kwargs)
+
+        monkeypatch.setattr(os, "posix_spawn", record_posix_spawn)
+        spawn_options = SpawnOptions(mode=SpawnMode.POSIX_SPAWN, limits=limits)
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(spawn_options=spawn_options)
+        coroutine_create_stream_spec_copy = CreateStreamSpecCoroutineCopy(path_file_input, path_file_output)
+        asyncio.run(ffmpeg_coroutine.execute(coroutine_create_stream_spec_copy.create))
+        assert path_file_output.exists()
+        assert [Path(path).name for path in paths_spawned] == ["ffmpeg"]
+
+    @staticmethod
+    @pytest.mark.skipif(sys.platform == "win32", reason="test for POSIX only")
+    @pytest.mark.parametrize("mode", list(SpawnMode))
+    @pytest.mark.parametrize(
+        "limits",
+        [
+            ResourceLimits(cpu_time=1),
+            ResourceLimits(file_size=100 * 1024),
+            ResourceLimits(address_space=150 * 1024 * 1024),
+        ],
+    )
+    def test_resource_limits(path_file_output: Path, limits: ResourceLimits, mode: SpawnMode) -> None:
+        """FFmpeg which exceeds resource limit should fail with FFmpegResourceLimitError."""
+
+        async def create_stream_spec() -> StreamSpec:
+            return create_heavy_encode(path_file_output)
+
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(spawn_options=SpawnOptions(mode=mode, limits=limits))
+        with pytest.raises(FFmpegResourceLimitError):
+            asyncio.run(asyncio.wait_for(ffmpeg_coroutine.execute(create_stream_spec), 60))
+
+    @staticmethod
+    def test_resource_limits_not_exceeded(path_file_input: Path, path_file_output: Path) -> None:
+        """FFmpeg within resource limits should work as same as default."""
+        limits = ResourceLimits(cpu_time=60, open_files=256, file_size=1024 * 1024 * 1024)
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(spawn_options=SpawnOptions(limits=limits))
+        coroutine_create_stream_spec_copy = CreateStreamSpecCoroutineCopy(path_file_input, path_file_output)
+        asyncio.run(ffmpeg_coroutine.execute(coroutine_create_stream_spec_copy.create))
+        assert path_file_output.exists()
+
+    @staticmethod
+    def test_executable_not_found() -> None:
+        """FileNotFoundError should be raised when executable is not found."""
+        spawn_options = SpawnOptions(mode=SpawnMode.POSIX_SPAWN)
+        with pytest.raises(FileNotFoundError):
+            spawn_options.create_popen(["not-exist-ffmpeg", "-version"])
+
+    @staticmethod
+    @pytest.mark.slow
+    def test_benchmark_spawn_to_first_byte() -> None:
+        """Benchmark latency from spawn to the first byte in worker process which has many open file descriptors."""
+        logger = getLogger(__name__)
+        with open_many_pipes():
+            for mode in SpawnMode:
+                latencies = [measure_spawn_to_first_byte(mode) for _ in range(NUMBER_OF_SPAWNS)]
+                logger.info("%s: median %.2f ms", mode.value, statistics.median(latencies) * 1000)
+                assert all(latency > 0 for latency in latencies)
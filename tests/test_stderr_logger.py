@@ -0,0 +1,94 @@
+"""Tests for per-line logging of FFmpeg stderr."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg.ffmpegprocess.stderr_logger import StderrLogger
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from asyncffmpeg import StreamSpec
+
+NAME_LOGGER = "asyncffmpeg.ffmpegprocess.stderr_logger"
+
+
+class TestStderrLogger:
+    """Tests for StderrLogger."""
+
+    @staticmethod
+    def test_progress_sampled(caplog: pytest.LogCaptureFixture) -> None:
+        """Repeated progress lines are sampled and the last one is logged at the end."""
+        caplog.set_level(logging.INFO, NAME_LOGGER)
+        stderr_logger = StderrLogger(1234, second_interval_progress=60)
+        stderr_logger.feed("Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'sample.mp4':")
+        for frame in range(1, 4):
+            stderr_logger.feed(f"frame={frame} fps=0.0 q=-1.0 size=0KiB time=00:00:00.00 bitrate=N/A speed=0x")
+        stderr_logger.feed("video:1KiB audio:0KiB subtitle:0KiB other streams:0KiB global headers:0KiB")
+        stderr_logger.finish()
+        assert [record.getMessage() for record in caplog.records] == [
+            "Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'sample.mp4':",
+            "frame=1 fps=0.0 q=-1.0 size=0KiB time=00:00:00.00 bitrate=N/A speed=0x",
+            "video:1KiB audio:0KiB subtitle:0KiB other streams:0KiB global headers:0KiB",
+            "frame=3 fps=0.0 q=-1.0 size=0KiB time=00:00:00.00 bitrate=N/A speed=0x",
+        ]
+        assert all(record.ffmpeg_pid == 1234 for record in caplog.records)  # type: ignore[attr-defined]  # noqa: PLR2004
+
+    @staticmethod
+    def test_level_filtered(caplog: pytest.LogCaptureFixture) -> None:
+        """Nothing is kept when the level is disabled."""
+        caplog.set_level(logging.WARNING, NAME_LOGGER)
+        stderr_logger = StderrLogger(1234)
+        stderr_logger.feed("frame=1 fps=0.0 q=-1.0 size=0KiB time=00:00:00.00 bitrate=N/A speed=0x")
+        stderr_logger.finish()
+        assert not caplog.records
+        assert stderr_logger.progress_skipped is None
+
+    @staticmethod
+    def test_ffmpeg_process(
+        path_file_input: Path,
+        path_file_output: Path,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Each line of stderr is logged as its own record instead of whole stderr."""
+        caplog.set_level(logging.INFO)
+
+        async def create_stream_spec() -> StreamSpec:
+            return ffmpeg.input(str(path_file_input)).output(str(path_file_output))
+
+        asyncio.run(FFmpegCoroutineFactory.create().execute(create_stream_spec))
+        records = [record for record in caplog.records if record.name == NAME_LOGGER]
+        assert records
+        assert all("\n" not in record.getMessage() for record in records)
+        # The final progress line is never dropped by sampling.
+        assert any("Lsize=" in record.getMessage() for record in records)
+        assert not [record for record in caplog.records if record.name == "asyncffmpeg.ffmpegprocess.interface"]
+
+    @staticmethod
+    def test_quit(path_file_output: Path, caplog: pytest.LogCaptureFixture) -> None:
+        """The rest of stderr which FFmpeg writes until it quits is logged line by line as well."""
+        caplog.set_level(logging.INFO)
+
+        async def create_stream_spec() -> StreamSpec:
+            return ffmpeg.input("sine=duration=60", f="lavfi", re=None).output(str(path_file_output))
+
+        async def execute_and_cancel() -> None:
+            task = asyncio.create_task(FFmpegCoroutineFactory.create().execute(create_stream_spec))
+            await asyncio.sleep(1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(execute_and_cancel())
+        records = [record for record in caplog.records if record.name == NAME_LOGGER]
+        assert all("\n" not in record.getMessage() for record in records)
+        # FFmpeg writes the final summary after it reads key Q.
+        assert any("muxing overhead" in record.getMessage() for record in records)
+        assert not [record for record in caplog.records if record.name == "asyncffmpeg.ffmpegprocess.interface"]
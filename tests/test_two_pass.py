@@ -0,0 +1,132 @@
+"""Tests for TwoPassEncoder."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegProcessError
+from asyncffmpeg import TwoPassEncoder
+from asyncffmpeg import TwoPassJob
+from asyncffmpeg.two_pass import Passes
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from asyncffmpeg import FFmpegResult
+    from asyncffmpeg.type_alias import StreamSpec
+
+OPTIONS = {"vcodec": "libx264", "video_bitrate": "100k", "preset": "ultrafast"}
+
+
+@pytest.fixture
+def directory_temporary(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Temporary directory which passlogs are created in."""
+    directory = tmp_path / "temporary"
+    directory.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(directory))
+    return directory
+
+
+def create_job(path_file_input: Path, path_file_output: Path, **options_input: object) -> TwoPassJob:
+    stream = ffmpeg.input(str(path_file_input), **options_input)
+    return TwoPassJob((stream.video, stream.audio), path_file_output, OPTIONS)
+
+
+def create_job_realtime(tmp_path: Path, second_duration: int) -> TwoPassJob:
+    """Job whose each pass takes about the duration since the input is read at native frame rate."""
+    stream = ffmpeg.input(f"testsrc=duration={second_duration}:size=160x120:rate=10", f="lavfi", re=None)
+    return TwoPassJob((stream,), tmp_path / "realtime.mp4", OPTIONS)
+
+
+async def wait_created(path: Path) -> None:
+    while not await asyncio.to_thread(path.exists):  # noqa: ASYNC110
+        await asyncio.sleep(0.1)
+
+
+class TestTwoPassEncoder:
+    """Tests for TwoPassEncoder."""
+
+    @staticmethod
+    def test(path_file_input: Path, tmp_path: Path, directory_temporary: Path) -> None:
+        """Passes of jobs sharing a working directory don't collide and passlogs are removed."""
+        jobs = [create_job(path_file_input, tmp_path / f"output{number}.mp4") for number in range(3)]
+        results = asyncio.run(TwoPassEncoder().encode_all(jobs))
+        assert [result.return_code for result in results] == [0, 0, 0]
+        for job in jobs:
+            assert job.path_file_output.stat().st_size > 0
+        assert not list(directory_temporary.iterdir())
+
+    @staticmethod
+    def test_pipelined(path_file_input: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The first pass of the next job starts before the second pass of the job."""
+        jobs = [create_job(path_file_input, tmp_path / f"output{number}.mp4") for number in range(2)]
+        events: list[str] = []
+        create_stream_spec = Passes.create_stream_spec
+        execute = TwoPassEncoder.execute
+
+        def record_stream_spec(self: Passes, number: int) -> StreamSpec:
+            events.append(f"start pass {number} of {self.job.path_file_output.name}")
+            return create_stream_spec(self, number)
+
+        async def record_execute(self: TwoPassEncoder, stream_spec: StreamSpec) -> FFmpegResult:
+            result = await execute(self, stream_spec)
+            events.append("finish")
+            return result
+
+        monkeypatch.setattr(Passes, "create_stream_spec", record_stream_spec)
+        monkeypatch.setattr(TwoPassEncoder, "execute", record_execute)
+        asyncio.run(TwoPassEncoder().encode_all(jobs))
+        assert events[:4] == [
+            "start pass 1 of output0.mp4",
+            "finish",
+            "start pass 1 of output1.mp4",
+            "start pass 2 of output0.mp4",
+        ]
+
+    @staticmethod
+    def test_encode(path_file_input: Path, path_file_output: Path, directory_temporary: Path) -> None:
+        """Single job is encoded in two passes and the passlog is removed."""
+        result = asyncio.run(TwoPassEncoder().encode(create_job(path_file_input, path_file_output)))
+        assert result.return_code == 0
+        assert path_file_output.stat().st_size > 0
+        assert not list(directory_temporary.iterdir())
+
+    @staticmethod
+    def test_error(path_file_input: Path, tmp_path: Path, directory_temporary: Path) -> None:
+        """Failed job cancels the first pass in flight and removes passlogs."""
+        jobs = [
+            create_job(tmp_path / "not_exist.mp4", tmp_path / "output0.mp4"),
+            create_job(path_file_input, tmp_path / "output1.mp4"),
+        ]
+        with pytest.raises(FFmpegProcessError):
+            asyncio.run(TwoPassEncoder().encode_all(jobs))
+        assert not (tmp_path / "output1.mp4").exists()
+        assert not list(directory_temporary.iterdir())
+
+    @staticmethod
+    @pytest.mark.parametrize("second_pass", [False, True])
+    def test_cancel(tmp_path: Path, directory_temporary: Path, *, second_pass: bool) -> None:
+        """Cancelling during the first or the second pass quits FFmpeg and removes the passlog."""
+        job = create_job_realtime(tmp_path, 4)
+
+        async def encode_and_cancel() -> None:
+            task = asyncio.create_task(TwoPassEncoder(time_to_force_termination=2).encode(job))
+            await asyncio.sleep(1)
+            if second_pass:
+                await wait_created(job.path_file_output)
+            assert not task.done()
+            assert await asyncio.to_thread(os.listdir, directory_temporary)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(encode_and_cancel())
+        # The second pass creates the output.
+        assert job.path_file_output.exists() is second_pass
+        assert not list(directory_temporary.iterdir())
@@ -0,0 +1,103 @@
+"""Tests for Watchdog."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+import ffmpeg
+import pytest
+
+from asyncffmpeg import FFmpegCoroutineFactory
+from asyncffmpeg import FFmpegDeadlineExceededError
+from asyncffmpeg import FFmpegStalledError
+from asyncffmpeg import FifoInput
+from asyncffmpeg import Watchdog
+from asyncffmpeg.ffmpegprocess.progress import Progress
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
+    from asyncffmpeg import StreamSpec
+
+
+async def source_stalled() -> AsyncIterator[bytes]:
+    """Source which never feeds like stalled NFS read."""
+    await asyncio.sleep(3600)
+    yield b""
+
+
+class TestProgress:
+    """Tests for Progress."""
+
+    @staticmethod
+    def test() -> None:
+        """Progress should advance only when frame, size or time changes."""
+        progress = Progress()
+        line = "frame=   10 fps=0.0 q=28.0 size=       0KiB time=00:00:00.16 bitrate=   0.0kbits/s speed=0.3x"
+        progress.feed(line)
+        time_advanced = progress.time_advanced
+        progress.feed(line.replace("speed=0.3x", "speed=0.2x"))
+        progress.feed("Press [q] to stop, [?] for help")
+        assert progress.time_advanced == time_advanced
+        progress.feed(line.replace("frame=   10", "frame=   11"))
+        assert progress.values == {"frame": "11", "size": "0KiB", "time": "00:00:00.16"}
+        assert progress.time_advanced >= time_advanced
+
+    @staticmethod
+    def test_suspend() -> None:
+        """Progress shouldn't stall while FFmpeg is suspended."""
+        progress = Progress()
+        progress.time_advanced -= 10
+        progress.suspend()
+        assert progress.second_since_advanced == 0.0
+        progress.resume()
+        assert progress.second_since_advanced < 1
+
+
+class TestWatchdog:
+    """Tests for Watchdog."""
+
+    @staticmethod
+    def test(path_file_input: Path, path_file_output: Path) -> None:
+        """FFmpeg which keeps progress should finish normally."""
+
+        async def create_stream_spec() -> StreamSpec:
+            return ffmpeg.input(path_file_input).output(str(path_file_output))
+
+        watchdog = Watchdog(second_stall=5, second_deadline=60, second_poll=0.1)
+        asyncio.run(FFmpegCoroutineFactory.create(watchdog=watchdog).execute(create_stream_spec))
+        assert path_file_output.exists()
+
+    @staticmethod
+    def test_stall(path_file_output: Path) -> None:
+        """FFmpeg blocked by stalled input should be quitted."""
+        fifo_input = FifoInput(source_stalled)
+
+        async def create_stream_spec() -> StreamSpec:
+            stream = ffmpeg.input(fifo_input.url, f="s16le", ar=44100, ac=1)
+            return stream.output(str(path_file_output))
+
+        watchdog = Watchdog(second_stall=0.5, second_poll=0.1)
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(time_to_force_termination=1, watchdog=watchdog)
+        time_start = time.monotonic()
+        with pytest.raises(FFmpegStalledError):
+            asyncio.run(ffmpeg_coroutine.execute(create_stream_spec, io_channels=[fifo_input]))
+        assert time.monotonic() - time_start < 10  # noqa: PLR2004
+        assert not fifo_input.directory.exists()
+
+    @staticmethod
+    def test_deadline(path_file_output: Path) -> None:
+        """FFmpeg which keeps progress but doesn't finish by deadline should be quitted."""
+
+        async def create_stream_spec() -> StreamSpec:
+            return ffmpeg.input("sine=duration=60", f="lavfi", re=None).output(str(path_file_output))
+
+        watchdog = Watchdog(second_stall=0.8, second_deadline=1.5, second_poll=0.1)
+        ffmpeg_coroutine = FFmpegCoroutineFactory.create(watchdog=watchdog)
+        with pytest.raises(FFmpegDeadlineExceededError):
+            asyncio.run(ffmpeg_coroutine.execute(create_stream_spec))
+        assert ffmpeg_coroutine.ffmpeg_process is not None
+        assert ffmpeg_coroutine.ffmpeg_process.popen.returncode is not None